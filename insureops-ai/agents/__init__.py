@@ -1,14 +1,27 @@
 """
 InsureOps AI — Insurance AI Agents Package
-Exports agent runner functions for Claims, Underwriting, and Fraud agents.
+Exports agent runner functions for Claims, Underwriting, and Fraud agents,
+their asyncio variants, arun_many for running them concurrently,
+run_*_agent_batch for worker-pool batches (agents.batch_runner), and
+resume_run / aresume_run to pick a failed run up from its last checkpoint.
 """
 
-from agents.claims_agent import run_claims_agent
-from agents.underwriting_agent import run_underwriting_agent
-from agents.fraud_agent import run_fraud_agent
+from agents.claims_agent import run_claims_agent, arun_claims_agent, run_claims_agent_batch
+from agents.underwriting_agent import run_underwriting_agent, arun_underwriting_agent, run_underwriting_agent_batch
+from agents.fraud_agent import run_fraud_agent, arun_fraud_agent, run_fraud_agent_batch
+from agents.workflow import arun_many, resume_run, aresume_run
 
 __all__ = [
     'run_claims_agent',
     'run_underwriting_agent',
-    'run_fraud_agent'
+    'run_fraud_agent',
+    'arun_claims_agent',
+    'arun_underwriting_agent',
+    'arun_fraud_agent',
+    'run_claims_agent_batch',
+    'run_underwriting_agent_batch',
+    'run_fraud_agent_batch',
+    'arun_many',
+    'resume_run',
+    'aresume_run'
 ]
@@ -26,6 +26,12 @@ class LLMCallRecord(BaseModel):
     prompt_quality: float = 0.85
     prompt_text: Optional[str] = None
     response_text: Optional[str] = None
+    cache_hit: bool = False
+    time_to_first_token_ms: Optional[int] = None
+    time_to_decision_ms: Optional[int] = None
+    prompt_tokens_saved: int = 0
+    cached_prompt_tokens: int = 0
+    cascade_escalation: Optional[str] = None  # why this hop was re-run on a stronger model
 
 
 class ToolCallRecord(BaseModel):
@@ -35,6 +41,8 @@ class ToolCallRecord(BaseModel):
     result_summary: str = ""
     duration_ms: int = 0
     success: bool = True
+    started_at: Optional[str] = None  # wall-clock window of the step that made the call
+    ended_at: Optional[str] = None
 
 
 class GuardrailResult(BaseModel):
@@ -72,21 +80,29 @@ class TraceRecord(BaseModel):
 
 # ─── Telemetry Helpers ───────────────────────────────────
 
-def calculate_cost(prompt_tokens: int, completion_tokens: int, model: str = "openai/gpt-4o-mini") -> float:
-    """Calculate cost based on token usage and model pricing."""
+def calculate_cost(prompt_tokens: int, completion_tokens: int, model: str = "openai/gpt-4o-mini",
+                   cached_prompt_tokens: int = 0) -> float:
+    """
+    Calculate cost based on token usage and model pricing. cached_prompt_tokens
+    (the part of prompt_tokens served from the provider's prompt cache) are
+    billed at the discounted cached-input rate.
+    """
     # Strip provider prefix from OpenRouter model names (e.g. "openai/gpt-4o-mini" -> "gpt-4o-mini")
     model_key = model.split("/")[-1] if "/" in model else model
 
     pricing = {
-        "gpt-4o-mini": {"input": 0.00000015, "output": 0.0000006},
-        "gpt-4o": {"input": 0.0000025, "output": 0.00001},
-        "gpt-4.1-mini": {"input": 0.0000004, "output": 0.0000016},
-        "gpt-4.1-nano": {"input": 0.0000001, "output": 0.0000004},
-        "gemini-1.5-flash": {"input": 0.000000075, "output": 0.0000003},
-        "gemini-1.5-pro": {"input": 0.00000125, "output": 0.000005},
+        "gpt-4o-mini": {"input": 0.00000015, "cached_input": 0.000000075, "output": 0.0000006},
+        "gpt-4o": {"input": 0.0000025, "cached_input": 0.00000125, "output": 0.00001},
+        "gpt-4.1-mini": {"input": 0.0000004, "cached_input": 0.0000001, "output": 0.0000016},
+        "gpt-4.1-nano": {"input": 0.0000001, "cached_input": 0.000000025, "output": 0.0000004},
+        "gemini-1.5-flash": {"input": 0.000000075, "cached_input": 0.00000001875, "output": 0.0000003},
+        "gemini-1.5-pro": {"input": 0.00000125, "cached_input": 0.0000003125, "output": 0.000005},
     }
     rates = pricing.get(model_key, pricing["gpt-4o-mini"])
-    return (prompt_tokens * rates["input"]) + (completion_tokens * rates["output"])
+    cached_prompt_tokens = min(cached_prompt_tokens, prompt_tokens)
+    return ((prompt_tokens - cached_prompt_tokens) * rates["input"]
+            + cached_prompt_tokens * rates["cached_input"]
+            + completion_tokens * rates["output"])
 
 
 def calculate_prompt_quality(prompt_text: str) -> float:
@@ -113,6 +129,40 @@ def calculate_prompt_quality(prompt_text: str) -> float:
     return min(score, 1.0)
 
 
+def parse_llm_json(response_text: str) -> Optional[dict]:
+    """The JSON object in an LLM response (optionally in a ``` fence), or None if it doesn't parse."""
+    try:
+        json_match = response_text
+        if "```json" in response_text:
+            json_match = response_text.split("```json")[1].split("```")[0]
+        elif "```" in response_text:
+            json_match = response_text.split("```")[1].split("```")[0]
+        parsed = json.loads(json_match.strip())
+    except (json.JSONDecodeError, IndexError, TypeError):
+        return None
+    return parsed if isinstance(parsed, dict) else None
+
+
+def round_values(values, ndigits: int):
+    """
+    Round like Python's round(), so batch (NumPy) paths match the scalar
+    tools exactly. NumPy arrays take np.round and only re-round the values
+    that sit near a .5 boundary, where np.round can differ from round().
+    """
+    if not hasattr(values, "dtype"):
+        return [round(v, ndigits) for v in values]
+
+    import numpy as np
+
+    values = np.asarray(values, dtype=float)
+    rounded = np.round(values, ndigits)
+    scaled = values * (10.0 ** ndigits)
+    near_half = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    for i in np.flatnonzero(near_half):
+        rounded[i] = round(float(values[i]), ndigits)
+    return rounded
+
+
 class Timer:
     """Simple context manager for timing operations."""
 
@@ -157,7 +207,13 @@ def send_telemetry_to_backend(trace: TraceRecord, backend_url: str = None):
                 "status": c.status,
                 "prompt_quality": c.prompt_quality,
                 "prompt_text": c.prompt_text,
-                "response_text": c.response_text
+                "response_text": c.response_text,
+                "cache_hit": c.cache_hit,
+                "time_to_first_token_ms": c.time_to_first_token_ms,
+                "time_to_decision_ms": c.time_to_decision_ms,
+                "prompt_tokens_saved": c.prompt_tokens_saved,
+                "cached_prompt_tokens": c.cached_prompt_tokens,
+                "cascade_escalation": c.cascade_escalation
             }
             for i, c in enumerate(trace.llm_calls)
         ],
@@ -168,7 +224,9 @@ def send_telemetry_to_backend(trace: TraceRecord, backend_url: str = None):
                 "input_data": c.parameters,
                 "output_data": c.result_summary,
                 "duration_ms": c.duration_ms,
-                "success": c.success
+                "success": c.success,
+                "started_at": c.started_at,
+                "ended_at": c.ended_at
             }
             for i, c in enumerate(trace.tool_calls)
         ],
@@ -198,13 +256,27 @@ def send_telemetry_to_backend(trace: TraceRecord, backend_url: str = None):
         # Don't fail the agent if telemetry fails — log and continue
 
 
+async def asend_telemetry_to_backend(trace: TraceRecord, backend_url: str = None):
+    """
+    Async send_telemetry_to_backend for the asyncio agent runners. The POST
+    runs on a worker thread so the event loop keeps serving other workflows.
+    """
+    import asyncio
+
+    await asyncio.to_thread(send_telemetry_to_backend, trace, backend_url)
+
+
 def get_data_path(filename: str) -> str:
     """Get the absolute path to a file in the agents/data directory."""
     return os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", filename)
 
 
 def load_json_data(filename: str) -> Any:
-    """Load a JSON data file from the agents/data directory."""
+    """
+    Load a JSON data file from the agents/data directory.
+    Parses the file on every call and returns a mutable copy — hot paths
+    should use agents.data_repository.load_reference_data instead.
+    """
     filepath = get_data_path(filename)
     with open(filepath, "r", encoding="utf-8") as f:
         return json.load(f)
@@ -0,0 +1,265 @@
+"""
+InsureOps AI — Offline Batch LLM Mode
+Overnight bulk reprocessing through an OpenAI-format batch file instead of
+one live chat completion per record.
+
+1. prepare  — run each workflow's tool steps, write every LLM request to a
+              batch JSONL file (OpenAI Batch API input format) and the
+              paused workflow states to a state JSONL file
+2. (submit the batch file to the provider, download the output file —
+   or produce it locally with `simulate` for testing)
+3. complete — read the results file, apply each response at the workflow's
+              LLM step, run the remaining steps and send telemetry
+
+Batch calls record latency_ms=0 (the call happened offline) and are costed
+at BATCH_PRICE_FACTOR of the live price.
+
+Usage:
+    python -m agents.batch_llm prepare  --agent claims --batch batch.jsonl --state state.jsonl
+    python -m agents.batch_llm simulate --batch batch.jsonl --results results.jsonl
+    python -m agents.batch_llm complete --state state.jsonl --results results.jsonl
+"""
+
+import json
+import os
+import uuid
+from typing import Iterable, Optional
+
+from agents.base_agent import LLMCallRecord, send_telemetry_to_backend
+from agents.llm_gateway import LLMGateway, cached_prompt_tokens, get_llm_gateway
+from agents.llm_simulation import get_llm_simulation
+from agents.workflow import get_workflow, state_to_dict, state_from_dict
+
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+BATCH_PRICE_FACTOR = 0.5  # batch jobs are billed at half the live rate
+
+
+def _write_jsonl(path: str, rows: Iterable[dict]) -> int:
+    """Write rows atomically; returns the row count."""
+    tmp_path = f"{path}.tmp"
+    count = 0
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for row in rows:
+            f.write(json.dumps(row) + "\n")
+            count += 1
+    os.replace(tmp_path, path)
+    return count
+
+
+def _read_jsonl(path: str) -> list[dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+# ─── Phase 1: Prepare ───────────────────────────────
+
+def prepare_batch(
+    agent_type: str,
+    records: list[dict],
+    batch_path: str,
+    state_path: str,
+    model: Optional[str] = None,
+    verbose: bool = False
+) -> dict:
+    """
+    Run the tool steps for every record and stop before the LLM step.
+    Writes one batch request per record that reached the LLM step; records
+    whose tool phase failed are kept in the state file and finalized as
+    errors by complete_batch().
+    """
+    workflow = get_workflow(agent_type)
+    spec = workflow.llm
+    gateway = get_llm_gateway()
+    model = model or gateway.settings.model
+
+    requests, states = [], []
+    for record in records:
+        state = workflow.run(workflow.initial_state(record), verbose, stop_before=spec.step_name)
+        custom_id = state["trace"].trace_id
+        prompt, tokens_saved = None, 0
+        if state["trace"].status != "error":
+            built = spec.build_prompt(state)
+            prompt, tokens_saved = built.text, built.tokens_saved
+            requests.append({
+                "custom_id": custom_id,
+                "method": "POST",
+                "url": BATCH_ENDPOINT,
+                "body": gateway._request(prompt, spec.system_prompt, model, spec.temperature,
+                                         {"type": "json_object"}),
+            })
+        states.append({
+            "custom_id": custom_id,
+            "agent_type": agent_type,
+            "model": model,
+            "prompt": prompt,
+            "prompt_tokens_saved": tokens_saved,
+            "state": state_to_dict(state),
+        })
+
+    _write_jsonl(batch_path, requests)
+    _write_jsonl(state_path, states)
+    return {"agent_type": agent_type, "records": len(states), "requests": len(requests),
+            "tool_errors": len(states) - len(requests), "model": model}
+
+
+# ─── Local Stand-in ─────────────────────────────────
+
+def simulate_batch_results(batch_path: str, results_path: str) -> int:
+    """
+    Produce a results file in OpenAI batch output format from a batch file,
+    answering each request with its agent's simulator (seeded like live
+    simulated calls, see llm_simulation.py). For tests and dry runs.
+    """
+    simulation = get_llm_simulation()
+    simulators = {
+        wf.llm.system_prompt: wf.llm.simulator
+        for wf in map(get_workflow, ("claims", "fraud", "underwriting"))
+    }
+
+    def _results():
+        for request in _read_jsonl(batch_path):
+            messages = request["body"]["messages"]
+            system_prompt = next((m["content"] for m in messages if m["role"] == "system"), "")
+            prompt = messages[-1]["content"]
+            rng = simulation.rng(request["body"]["model"], system_prompt, prompt)
+            response_text, prompt_tokens, completion_tokens = simulators[system_prompt](prompt, rng)
+            yield {
+                "id": f"batch_req_{uuid.uuid4().hex[:24]}",
+                "custom_id": request["custom_id"],
+                "response": {
+                    "status_code": 200,
+                    "request_id": uuid.uuid4().hex,
+                    "body": {
+                        "object": "chat.completion",
+                        "model": request["body"]["model"],
+                        "choices": [{
+                            "index": 0,
+                            "finish_reason": "stop",
+                            "message": {"role": "assistant", "content": response_text},
+                        }],
+                        "usage": {
+                            "prompt_tokens": prompt_tokens,
+                            "completion_tokens": completion_tokens,
+                            "total_tokens": prompt_tokens + completion_tokens,
+                        },
+                    },
+                },
+                "error": None,
+            }
+
+    return _write_jsonl(results_path, _results())
+
+
+# ─── Phase 2: Complete ──────────────────────────────
+
+def _parse_result(result: dict) -> tuple[Optional[tuple[str, int, int, int]], Optional[str]]:
+    """(response_text, prompt_tokens, completion_tokens, cached_prompt_tokens) or an error message."""
+    if result.get("error"):
+        error = result["error"]
+        return None, error.get("message", str(error)) if isinstance(error, dict) else str(error)
+    response = result.get("response") or {}
+    if response.get("status_code") != 200:
+        return None, f"batch request failed with status {response.get('status_code')}"
+    body = response["body"]
+    usage = body.get("usage") or {}
+    return (
+        body["choices"][0]["message"]["content"],
+        usage.get("prompt_tokens", 0),
+        usage.get("completion_tokens", 0),
+        cached_prompt_tokens(usage),
+    ), None
+
+
+def complete_batch(
+    state_path: str,
+    results_path: str,
+    send_telemetry: bool = True,
+    verbose: bool = False
+) -> list[dict]:
+    """
+    Resume every paused workflow from its LLM step using the batch results
+    and run it to completion. Returns agent results in state-file order.
+    """
+    results = {r["custom_id"]: r for r in _read_jsonl(results_path)}
+    outputs = []
+
+    for entry in _read_jsonl(state_path):
+        workflow = get_workflow(entry["agent_type"])
+        spec = workflow.llm
+        state = state_from_dict(entry["state"])
+        trace = state["trace"]
+
+        if trace.status != "error":
+            result = results.get(entry["custom_id"])
+            parsed, error = _parse_result(result) if result else (None, "no result in batch output")
+            if error:
+                print(f"   ❌ Error in {spec.step_name}: {error}")
+                trace.llm_calls.append(LLMCallRecord(model=entry["model"], status="error",
+                                                     prompt_text=entry["prompt"][:500]))
+                trace.status = "error"
+                trace.output_data = {"error": error, "failed_step": spec.step_name}
+            else:
+                llm_record = LLMGateway._record(entry["model"], entry["prompt"], parsed[:3], latency_ms=0,
+                                                cached_tokens=parsed[3])
+                llm_record.cost_usd *= BATCH_PRICE_FACTOR
+                llm_record.prompt_tokens_saved = entry.get("prompt_tokens_saved", 0)
+                state = spec.apply_response(state, parsed[0], llm_record)
+                state = workflow.run(state, verbose, start_after=spec.step_name)
+
+        if send_telemetry:
+            send_telemetry_to_backend(state["trace"])
+        outputs.append(workflow.build_result(state))
+
+    return outputs
+
+
+# ─── CLI Entry Point ────────────────────────────────
+
+if __name__ == "__main__":
+    import argparse
+    from agents.base_agent import load_json_data
+
+    sample_files = {
+        "claims": "sample_claims.json",
+        "fraud": "sample_claims.json",
+        "underwriting": "sample_applicants.json",
+    }
+
+    parser = argparse.ArgumentParser(description="Offline batch-file LLM mode")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    prepare = sub.add_parser("prepare", help="Run tool steps and write the batch + state files")
+    prepare.add_argument("--agent", choices=sorted(sample_files), required=True)
+    prepare.add_argument("--input", help="JSON file of records (default: the agent's sample data)")
+    prepare.add_argument("--batch", required=True, help="Batch request JSONL to write")
+    prepare.add_argument("--state", required=True, help="Paused workflow state JSONL to write")
+    prepare.add_argument("--model", help="Model for the batch requests (default OPENROUTER_MODEL)")
+
+    simulate = sub.add_parser("simulate", help="Write a results file locally using the simulators")
+    simulate.add_argument("--batch", required=True)
+    simulate.add_argument("--results", required=True)
+
+    complete = sub.add_parser("complete", help="Apply batch results and finalize every workflow")
+    complete.add_argument("--state", required=True)
+    complete.add_argument("--results", required=True)
+    complete.add_argument("--no-telemetry", action="store_true", help="Don't send traces to the backend")
+
+    args = parser.parse_args()
+
+    if args.command == "prepare":
+        if args.input:
+            with open(args.input, "r", encoding="utf-8") as f:
+                records = json.load(f)
+        else:
+            records = load_json_data(sample_files[args.agent])
+        print(json.dumps(prepare_batch(args.agent, records, args.batch, args.state, args.model), indent=2))
+    elif args.command == "simulate":
+        print(f"✅ Wrote {simulate_batch_results(args.batch, args.results)} results to {args.results}")
+    else:
+        outputs = complete_batch(args.state, args.results, send_telemetry=not args.no_telemetry)
+        decisions = {}
+        for output in outputs:
+            decision_type = output["decision"].get("decision_type", "error")
+            decisions[decision_type] = decisions.get(decision_type, 0) + 1
+        print(json.dumps({"completed": len(outputs), "decisions": decisions}, indent=2))
@@ -0,0 +1,310 @@
+"""
+InsureOps AI — Batch Agent Runner
+Pushes many records through an agent on a worker pool and streams each
+result back as soon as it completes.
+
+- mode="thread":  workers share the process (stores, caches, LLM gateway);
+                  fine while runs mostly wait on the LLM
+- mode="process": one interpreter per worker, for CPU-bound tool steps;
+                  each worker builds its own stores and gateway
+- mode="pipeline": tools, LLM and finalize phases as separate stages with
+                  their own queues and workers (see agents.pipeline)
+
+Records are pulled lazily and at most `max_pending` runs (default
+2 × workers) are in flight, so a 200k-record JSONL file or stdin stream is
+never read into memory ahead of the workers (backpressure).
+
+The JSONL CLI reads one record per line from a file or stdin and writes
+one result per line (decision and, unless --no-traces, the trace), then
+prints throughput and latency percentiles to stderr:
+
+Usage:
+    python -m agents.batch_runner --agent claims --input claims.jsonl --output decisions.jsonl --workers 16
+    cat applicants.jsonl | python -m agents.underwriting_agent.agent --input - --mode process
+    python -m agents.batch_runner --agent claims --input claims.jsonl --mode pipeline --stage-workers llm=32,tools=4
+"""
+
+import json
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Executor, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Callable, Iterable, Iterator, NamedTuple, Optional, TextIO
+
+
+BATCH_MODES = ("thread", "process", "pipeline")
+
+
+class BatchResult(NamedTuple):
+    index: int                 # position of the record in the input
+    record: dict
+    result: Optional[dict]     # the agent's result dict, None if the run raised
+    latency_ms: float          # wall-clock time from a worker picking the record up to its result
+    error: Optional[str]
+    ran: bool = True           # False if no run took place (undecodable input, dead worker)
+
+
+class InvalidRecord(NamedTuple):
+    """An input line that could not be decoded; it becomes an error result instead of a run."""
+    line: int
+    error: str
+
+
+def _runner(agent_type: str) -> Callable[..., dict]:
+    if agent_type == "claims":
+        from agents.claims_agent.agent import run_claims_agent
+        return run_claims_agent
+    if agent_type == "fraud":
+        from agents.fraud_agent.agent import run_fraud_agent
+        return run_fraud_agent
+    if agent_type == "underwriting":
+        from agents.underwriting_agent.agent import run_underwriting_agent
+        return run_underwriting_agent
+    raise ValueError(f"Unknown agent type '{agent_type}'")
+
+
+def _run_one(agent_type: str, record: dict, send_telemetry: bool) -> tuple[Optional[dict], float, Optional[str]]:
+    """One agent run inside a worker (module-level so process pools can pickle it)."""
+    start = time.perf_counter()
+    try:
+        result, error = _runner(agent_type)(record, send_telemetry=send_telemetry, verbose=False), None
+    except Exception as e:
+        result, error = None, str(e)
+    return result, (time.perf_counter() - start) * 1000, error
+
+
+def _quiet_stdout():
+    """Process-pool initializer: agent prints go to stderr, keeping stdout for JSONL."""
+    sys.stdout = sys.stderr
+
+
+def _executor(mode: str, workers: int, quiet_stdout: bool) -> Executor:
+    if mode == "thread":
+        return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="agent-batch")
+    if mode == "process":
+        return ProcessPoolExecutor(max_workers=workers, initializer=_quiet_stdout if quiet_stdout else None)
+    raise ValueError(f"Unknown batch mode '{mode}' (expected one of {BATCH_MODES})")
+
+
+def run_agent_batch(
+    agent_type: str,
+    records: Iterable[dict],
+    workers: int = 4,
+    mode: str = "thread",
+    send_telemetry: bool = False,
+    max_pending: Optional[int] = None,
+    quiet_stdout: bool = False,
+    stage_workers: Optional[dict[str, int]] = None
+) -> Iterator[BatchResult]:
+    """
+    Run an agent over `records` on `workers` threads or processes, yielding
+    a BatchResult per record in completion order (use .index to restore
+    input order). At most `max_pending` runs are queued or running at once.
+    mode="pipeline" ignores `workers` for `stage_workers` (per stage) and
+    uses `max_pending` as each stage's queue size. An InvalidRecord (see
+    read_jsonl) yields an error result; if `records` itself raises, the
+    runs already in flight are yielded before the error is re-raised.
+
+    Usage:
+        for item in run_agent_batch("claims", claims, workers=8):
+            print(item.index, item.result["decision"])
+    """
+    _runner(agent_type)  # fail fast on an unknown agent type
+    if mode == "pipeline":
+        from agents.pipeline import AgentPipeline
+        yield from AgentPipeline(agent_type, stage_workers, max_pending, send_telemetry).run(records)
+        return
+    max_pending = max_pending or 2 * workers
+    pending = {}
+    source = enumerate(records)
+    exhausted = False
+    source_error: Optional[Exception] = None
+
+    with _executor(mode, workers, quiet_stdout) as pool:
+        while pending or not exhausted:
+            while not exhausted and len(pending) < max_pending:
+                try:
+                    item = next(source, None)
+                except Exception as e:  # the input itself failed: finish the runs in flight, then raise
+                    item, source_error = None, e
+                if item is None:
+                    exhausted = True
+                    break
+                index, record = item
+                if isinstance(record, InvalidRecord):
+                    yield BatchResult(index, {}, None, 0.0, f"line {record.line}: {record.error}", ran=False)
+                    continue
+                pending[pool.submit(_run_one, agent_type, record, send_telemetry)] = (index, record)
+            if not pending:
+                break
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                index, record = pending.pop(future)
+                try:
+                    result, latency_ms, error = future.result()
+                except Exception as e:  # the worker itself died (e.g. a killed process)
+                    yield BatchResult(index, record, None, 0.0, str(e), ran=False)
+                    continue
+                yield BatchResult(index, record, result, latency_ms, error)
+    if source_error is not None:
+        raise source_error
+
+
+# ─── Batch Summary ──────────────────────────────────
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = min(len(sorted_values) - 1, max(0, round(pct / 100 * (len(sorted_values) - 1))))
+    return round(sorted_values[rank], 1)
+
+
+class BatchStats:
+    """
+    Throughput, latency percentiles and decision counts for a batch, updated
+    as results arrive. Rows that never ran count as errors and records, but
+    not towards latency.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.latencies: list[float] = []
+        self.decisions: dict[str, int] = {}
+        self.records = 0
+        self.errors = 0
+
+    def add(self, item: BatchResult):
+        self.records += 1
+        if item.ran:
+            self.latencies.append(item.latency_ms)
+        if item.error is not None or item.result is None:
+            self.errors += 1
+            return
+        if item.result["trace"]["status"] == "error":
+            self.errors += 1
+        decision_type = item.result["decision"].get("decision_type", "error")
+        self.decisions[decision_type] = self.decisions.get(decision_type, 0) + 1
+
+    def summary(self) -> dict:
+        seconds = time.perf_counter() - self.started
+        latencies = sorted(self.latencies)
+        return {
+            "records": self.records,
+            "errors": self.errors,
+            "seconds": round(seconds, 2),
+            "records_per_sec": round(self.records / seconds, 1) if seconds else 0.0,
+            "latency_ms": {
+                "mean": round(statistics.fmean(latencies), 1) if latencies else 0.0,
+                "p50": _percentile(latencies, 50),
+                "p90": _percentile(latencies, 90),
+                "p99": _percentile(latencies, 99),
+                "max": round(latencies[-1], 1) if latencies else 0.0,
+            },
+            "decisions": self.decisions,
+        }
+
+
+# ─── JSONL CLI ──────────────────────────────────────
+
+def read_jsonl(stream: TextIO) -> Iterator[dict | InvalidRecord]:
+    """
+    Records from a JSONL stream, one per non-blank line, read lazily. A line
+    that is not a JSON object yields an InvalidRecord, so one bad line in a
+    large job becomes an error row rather than ending the batch.
+    """
+    for number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield InvalidRecord(number, f"invalid JSON: {e}")
+            continue
+        if isinstance(record, dict):
+            yield record
+        else:
+            yield InvalidRecord(number, f"expected a JSON object, got {type(record).__name__}")
+
+
+def _output_row(item: BatchResult, include_trace: bool) -> dict:
+    row = {
+        "index": item.index,
+        "id": item.record.get("id"),
+        "latency_ms": round(item.latency_ms, 1),
+        "error": item.error,
+    }
+    if item.result is not None:
+        row["trace_id"] = item.result["trace_id"]
+        row["decision"] = item.result["decision"]
+        if include_trace:
+            row["trace"] = item.result["trace"]
+    return row
+
+
+def batch_main(agent_type: Optional[str] = None, argv: Optional[list[str]] = None) -> dict:
+    """Command-line entry point; `agent_type` is fixed when called from an agent's __main__."""
+    import argparse
+    parser = argparse.ArgumentParser(description="Run an agent over a JSONL file of records")
+    if agent_type is None:
+        parser.add_argument("--agent", choices=("claims", "fraud", "underwriting"), required=True)
+    parser.add_argument("--input", default="-", help="JSONL records to process ('-' = stdin)")
+    parser.add_argument("--output", default="-", help="JSONL results to write ('-' = stdout)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--mode", choices=BATCH_MODES, default="thread")
+    parser.add_argument("--max-pending", type=int,
+                        help="Runs in flight at once (default 2 × workers); per-stage queue size with --mode pipeline")
+    parser.add_argument("--stage-workers", default="",
+                        help="With --mode pipeline: workers per stage, e.g. tools=2,llm=32,finalize=2")
+    parser.add_argument("--no-traces", action="store_true", help="Write decisions only, without traces")
+    parser.add_argument("--telemetry", action="store_true", help="Send each trace to the backend")
+    parser.add_argument("--no-checkpoints", action="store_true",
+                        help="Skip workflow checkpoints (failed records are re-run rather than resumed)")
+    args = parser.parse_args(argv)
+    agent_type = agent_type or args.agent
+    if args.no_checkpoints:
+        os.environ["WORKFLOW_CHECKPOINTS"] = "false"  # inherited by process-mode workers
+
+    source = sys.stdin if args.input == "-" else open(args.input, "r", encoding="utf-8")
+    sink = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    # Agents print progress and warnings; keep stdout clean when it carries the JSONL
+    real_stdout = sys.stdout
+    if sink is real_stdout:
+        sys.stdout = sys.stderr
+
+    pipeline = None
+    if args.mode == "pipeline":
+        from agents.pipeline import AgentPipeline
+        stage_workers = {name: int(count) for name, count in
+                         (pair.split("=") for pair in args.stage_workers.split(",") if pair)}
+        pipeline = AgentPipeline(agent_type, stage_workers, args.max_pending, args.telemetry)
+        results = pipeline.run(read_jsonl(source))
+    else:
+        results = run_agent_batch(agent_type, read_jsonl(source), args.workers, args.mode,
+                                  send_telemetry=args.telemetry, max_pending=args.max_pending,
+                                  quiet_stdout=sink is real_stdout)
+
+    stats = BatchStats()
+    try:
+        for item in results:
+            stats.add(item)
+            sink.write(json.dumps(_output_row(item, not args.no_traces)) + "\n")
+    finally:
+        sys.stdout = real_stdout
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+
+    summary = {"agent_type": agent_type, "workers": args.workers, "mode": args.mode, **stats.summary()}
+    if pipeline is not None:
+        del summary["workers"]
+        summary["pipeline"] = pipeline.stats()
+    print(json.dumps(summary, indent=2), file=sys.stderr)
+    return summary
+
+
+if __name__ == "__main__":
+    # Use the package module (not this __main__ copy) so pipeline mode shares its InvalidRecord
+    from agents.batch_runner import batch_main as _batch_main
+    _batch_main()
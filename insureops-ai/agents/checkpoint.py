@@ -0,0 +1,225 @@
+"""
+InsureOps AI — Workflow Checkpoints
+Saves an agent run's state to SQLite (WORKFLOW_CHECKPOINT_PATH, default
+agents/data/checkpoints.db), keyed by trace_id, once its tool steps are done
+and again after its LLM step. A run that fails (e.g. the LLM call times out)
+or is interrupted can be resumed from its last checkpoint under the same
+trace_id, without re-running the tool steps or the LLM call before it — see
+workflow.resume_run(). A run that fails in a tool step leaves no checkpoint;
+those steps are deterministic and cheap, so it is simply run again.
+Checkpointing a run costs two small writes and a delete (~1 ms);
+WORKFLOW_CHECKPOINTS=false skips it for bulk jobs that can re-run records.
+
+One row per run holds the latest checkpoint. Status:
+- running:   steps still executing (or the process died mid-run)
+- failed:    a step raised; `failed_step` / `error` say which and why
+
+Retention: finished runs are deleted as soon as they succeed; failed and
+interrupted runs are kept for WORKFLOW_CHECKPOINT_TTL_SECONDS (default 7
+days), and at most WORKFLOW_CHECKPOINT_MAX_RUNS (oldest dropped first).
+WORKFLOW_CHECKPOINTS=false turns checkpointing off.
+
+Usage:
+    python -m agents.checkpoint --list
+    python -m agents.checkpoint --resume <trace_id>
+    python -m agents.checkpoint --purge
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import NamedTuple, Optional
+
+from agents.base_agent import get_data_path
+
+
+CHECKPOINT_STATUSES = ("running", "failed")
+PURGE_EVERY_WRITES = 500
+
+
+class Checkpoint(NamedTuple):
+    trace_id: str
+    agent_type: str
+    status: str
+    completed_steps: tuple[str, ...]
+    state: dict                  # workflow.state_to_dict() form — see state_from_dict()
+    failed_step: Optional[str]
+    error: Optional[str]
+    updated_at: float
+
+
+class WorkflowCheckpointStore:
+    """
+    Latest checkpoint per agent run, in SQLite.
+
+    Usage:
+        store = get_checkpoint_store()
+        store.save(trace_id, "claims", state_to_json(state), ("Policy Lookup",))
+        store.load(trace_id)       # Checkpoint or None
+        store.finish(trace_id)     # run succeeded: drop its checkpoint
+    """
+
+    def __init__(self, db_path: Optional[str] = None, ttl_seconds: float = 7 * 86400.0,
+                 max_runs: int = 10000):
+        self.db_path = db_path or os.getenv("WORKFLOW_CHECKPOINT_PATH") or get_data_path("checkpoints.db")
+        self.ttl_seconds = ttl_seconds
+        self.max_runs = max_runs
+        self._lock = threading.Lock()
+        self._writes = 0
+
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        if self.db_path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS workflow_checkpoints ("
+            "trace_id TEXT PRIMARY KEY, agent_type TEXT NOT NULL, status TEXT NOT NULL, "
+            "completed_steps TEXT NOT NULL, state TEXT NOT NULL, failed_step TEXT, error TEXT, "
+            "updated_at REAL NOT NULL) WITHOUT ROWID"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_workflow_checkpoints_updated ON workflow_checkpoints(updated_at)"
+        )
+        self._conn.commit()
+        self.purge_expired()
+
+    def save(self, trace_id: str, agent_type: str, state_json: str, completed_steps: tuple[str, ...]):
+        """Store the state (workflow.state_to_json) after `completed_steps`, replacing the previous checkpoint."""
+        row = (trace_id, agent_type, json.dumps(list(completed_steps)), state_json, time.time())
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO workflow_checkpoints "
+                "(trace_id, agent_type, status, completed_steps, state, failed_step, error, updated_at) "
+                "VALUES (?, ?, 'running', ?, ?, NULL, NULL, ?)",
+                row
+            )
+            self._conn.commit()
+            self._writes += 1
+            purge = self._writes % PURGE_EVERY_WRITES == 0
+        if purge:
+            self.purge_expired()
+
+    def mark_failed(self, trace_id: str, failed_step: str, error: str):
+        """Keep the last checkpoint for a resume, noting the step that failed."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE workflow_checkpoints SET status = 'failed', failed_step = ?, error = ?, updated_at = ? "
+                "WHERE trace_id = ?",
+                (failed_step, error, time.time(), trace_id)
+            )
+            self._conn.commit()
+
+    def finish(self, trace_id: str):
+        """The run succeeded — nothing left to resume."""
+        with self._lock:
+            self._conn.execute("DELETE FROM workflow_checkpoints WHERE trace_id = ?", (trace_id,))
+            self._conn.commit()
+
+    def load(self, trace_id: str) -> Optional[Checkpoint]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT trace_id, agent_type, status, completed_steps, state, failed_step, error, updated_at "
+                "FROM workflow_checkpoints WHERE trace_id = ?", (trace_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return Checkpoint(row[0], row[1], row[2], tuple(json.loads(row[3])), json.loads(row[4]), *row[5:])
+
+    def list_runs(self, status: Optional[str] = None, limit: int = 100) -> list[dict]:
+        """Resumable runs, most recent first (without their state)."""
+        query = ("SELECT trace_id, agent_type, status, completed_steps, failed_step, error, updated_at "
+                 "FROM workflow_checkpoints")
+        params: tuple = ()
+        if status:
+            query += " WHERE status = ?"
+            params = (status,)
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY updated_at DESC LIMIT ?", (*params, limit)).fetchall()
+        return [
+            {
+                "trace_id": r[0], "agent_type": r[1], "status": r[2],
+                "last_completed_step": (json.loads(r[3]) or [None])[-1],
+                "failed_step": r[4], "error": r[5], "updated_at": r[6],
+            }
+            for r in rows
+        ]
+
+    def purge_expired(self) -> int:
+        """Drop checkpoints older than the TTL, then the oldest beyond max_runs; returns rows removed."""
+        with self._lock:
+            removed = self._conn.execute(
+                "DELETE FROM workflow_checkpoints WHERE updated_at < ?", (time.time() - self.ttl_seconds,)
+            ).rowcount
+            removed += self._conn.execute(
+                "DELETE FROM workflow_checkpoints WHERE trace_id IN ("
+                "SELECT trace_id FROM workflow_checkpoints ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_runs,)
+            ).rowcount
+            self._conn.commit()
+            return removed
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = dict(self._conn.execute(
+                "SELECT status, COUNT(*) FROM workflow_checkpoints GROUP BY status"
+            ).fetchall())
+        return {
+            "db_path": self.db_path,
+            "ttl_seconds": self.ttl_seconds,
+            "max_runs": self.max_runs,
+            **{status: counts.get(status, 0) for status in CHECKPOINT_STATUSES},
+        }
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def checkpoints_enabled() -> bool:
+    return os.getenv("WORKFLOW_CHECKPOINTS", "true").lower() in ("1", "true", "yes")
+
+
+# Singleton instance
+_checkpoint_store = None
+_checkpoint_store_lock = threading.Lock()
+
+def get_checkpoint_store() -> WorkflowCheckpointStore:
+    """Get or create the process-wide WorkflowCheckpointStore."""
+    global _checkpoint_store
+    if _checkpoint_store is None:
+        with _checkpoint_store_lock:
+            if _checkpoint_store is None:
+                _checkpoint_store = WorkflowCheckpointStore(
+                    ttl_seconds=float(os.getenv("WORKFLOW_CHECKPOINT_TTL_SECONDS", str(7 * 86400))),
+                    max_runs=int(os.getenv("WORKFLOW_CHECKPOINT_MAX_RUNS", "10000"))
+                )
+    return _checkpoint_store
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Inspect, resume and purge workflow checkpoints")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--list", action="store_true", help="List resumable runs")
+    group.add_argument("--resume", metavar="TRACE_ID", help="Resume a run from its last completed step")
+    group.add_argument("--purge", action="store_true", help="Apply the retention policy now")
+    parser.add_argument("--status", choices=CHECKPOINT_STATUSES, help="With --list: only this status")
+    args = parser.parse_args()
+
+    # Use the package module (not this __main__ copy) so the workflow shares the store
+    from agents.checkpoint import get_checkpoint_store as _store
+    from agents.workflow import resume_run
+
+    if args.list:
+        print(json.dumps({"stats": _store().stats(), "runs": _store().list_runs(args.status)}, indent=2))
+    elif args.resume:
+        result = resume_run(args.resume, send_telemetry=False)
+        print(json.dumps({"trace_id": result["trace_id"], "decision": result["decision"],
+                          "status": result["trace"]["status"]}, indent=2))
+    else:
+        print(json.dumps({"removed": _store().purge_expired()}, indent=2))
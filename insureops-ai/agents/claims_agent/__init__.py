@@ -1,5 +1,5 @@
 """Claims Processing Agent — __init__.py"""
 
-from agents.claims_agent.agent import run_claims_agent
+from agents.claims_agent.agent import run_claims_agent, arun_claims_agent, run_claims_agent_batch
 
-__all__ = ['run_claims_agent']
+__all__ = ['run_claims_agent', 'arun_claims_agent', 'run_claims_agent_batch']
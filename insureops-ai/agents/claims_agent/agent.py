@@ -12,15 +12,18 @@ A multi-step agent that processes insurance claims using:
 import json
 import os
 import random
-import time
-from typing import TypedDict, Optional
+from typing import TYPE_CHECKING, Iterable, Iterator, TypedDict, Optional
 from dotenv import load_dotenv
 
 from agents.base_agent import (
     TraceRecord, LLMCallRecord, ToolCallRecord, GuardrailResult,
-    DecisionRecord, Timer, calculate_cost, calculate_prompt_quality,
-    send_telemetry_to_backend, load_json_data
+    DecisionRecord, Timer, load_json_data, parse_llm_json
 )
+from agents.llm_gateway import get_llm_gateway
+from agents.model_cascade import arun_cascade, record_escalated_hops, resolve_cascade, run_cascade
+from agents.prompt_builder import BuiltPrompt, ToolSection, build_prompt
+from agents.tokenizer import count_tokens
+from agents.workflow import AgentWorkflow, WorkflowStep, LLMStepSpec, provisional_decision_recorder
 from agents.claims_agent.tools import policy_lookup, coverage_checker, payout_calculator
 from agents.claims_agent.rag import get_policy_rag
 from agents.claims_agent.prompts import (
@@ -30,6 +33,9 @@ from agents.claims_agent.prompts import (
     GUARDRAIL_COMPLIANCE_PROMPT
 )
 
+if TYPE_CHECKING:
+    from agents.batch_runner import BatchResult
+
 load_dotenv(os.path.join(os.path.dirname(__file__), '..', '..', '.env'))
 
 
@@ -44,104 +50,77 @@ class ClaimsState(TypedDict):
     policy_context: str
     llm_analysis: Optional[dict]
     guardrail_results: list
+    provisional_decision: Optional[dict]
     decision: Optional[dict]
     trace: Optional[TraceRecord]
 
 
 # ─── LLM Wrapper ────────────────────────────────────
 
-def call_llm(prompt: str, system_prompt: str = "", model: str = None) -> tuple[str, LLMCallRecord]:
+LLM_TEMPERATURE = 0.2
+SIMULATED_LATENCY = (0.3, 1.2)  # seconds, simulation mode only (unless LLM_SIM_LATENCY is set)
+
+
+def call_llm(prompt: str, system_prompt: str = "", model: str = None,
+             on_decision=None) -> tuple[str, LLMCallRecord]:
     """
-    Call the LLM via OpenRouter (OpenAI-compatible API).
+    Call the LLM via the shared gateway (OpenRouter, OpenAI-compatible API).
     Falls back to a simulated response if no API key is available.
     """
-    api_key = os.getenv("OPENROUTER_API_KEY", "")
-    model = model or os.getenv("OPENROUTER_MODEL", "openai/gpt-4o-mini")
-
-    with Timer() as timer:
-        if api_key and api_key != "your_openrouter_api_key_here":
-            try:
-                from openai import OpenAI
-
-                client = OpenAI(
-                    base_url="https://openrouter.ai/api/v1",
-                    api_key=api_key
-                )
-
-                messages = []
-                if system_prompt:
-                    messages.append({"role": "system", "content": system_prompt})
-                messages.append({"role": "user", "content": prompt})
-
-                response = client.chat.completions.create(
-                    model=model,
-                    messages=messages,
-                    temperature=0.2,
-                    response_format={"type": "json_object"}
-                )
-
-                response_text = response.choices[0].message.content
-                prompt_tokens = response.usage.prompt_tokens if response.usage else len(prompt.split()) * 2
-                completion_tokens = response.usage.completion_tokens if response.usage else len(response_text.split()) * 2
-
-            except Exception as e:
-                print(f"⚠️ LLM call failed, using simulation: {e}")
-                response_text, prompt_tokens, completion_tokens = _simulate_llm_response(prompt)
-        else:
-            # No API key — simulate a realistic response
-            response_text, prompt_tokens, completion_tokens = _simulate_llm_response(prompt)
-
-    cost = calculate_cost(prompt_tokens, completion_tokens, model)
-    quality = calculate_prompt_quality(prompt)
-
-    record = LLMCallRecord(
+    return get_llm_gateway().complete(
+        prompt, system_prompt,
         model=model,
-        prompt_tokens=prompt_tokens,
-        completion_tokens=completion_tokens,
-        latency_ms=timer.elapsed_ms,
-        cost_usd=cost,
-        status="success",
-        prompt_quality=quality,
-        prompt_text=prompt[:500],
-        response_text=response_text[:500]
+        temperature=LLM_TEMPERATURE,
+        simulator=_simulate_llm_response,
+        simulated_latency=SIMULATED_LATENCY,
+        on_decision=on_decision
     )
 
-    return response_text, record
 
+async def acall_llm(prompt: str, system_prompt: str = "", model: str = None,
+                    on_decision=None) -> tuple[str, LLMCallRecord]:
+    """Async call_llm — awaits the LLM (or simulated latency) without blocking the event loop."""
+    return await get_llm_gateway().acomplete(
+        prompt, system_prompt,
+        model=model,
+        temperature=LLM_TEMPERATURE,
+        simulator=_simulate_llm_response,
+        simulated_latency=SIMULATED_LATENCY,
+        on_decision=on_decision
+    )
 
-def _simulate_llm_response(prompt: str) -> tuple[str, int, int]:
-    """Generate a realistic simulated LLM response for demo purposes."""
-    # Simulate processing time
-    time.sleep(random.uniform(0.3, 1.2))
 
-    prompt_tokens = len(prompt.split()) * 2
-    completion_tokens = random.randint(150, 400)
+def _simulate_llm_response(prompt: str, rng: Optional[random.Random] = None) -> tuple[str, int, int]:
+    """Generate a realistic simulated LLM response for demo purposes."""
+    rng = rng or random.Random()
+    prompt_tokens = count_tokens(prompt)
+    completion_tokens = rng.randint(150, 400)
 
     # Determine decision based on keywords in the prompt
     prompt_lower = prompt.lower()
 
     if "fraud" in prompt_lower or "suspicious" in prompt_lower:
         decision_type = "escalated"
-        confidence = round(random.uniform(0.55, 0.75), 2)
+        confidence = round(rng.uniform(0.55, 0.75), 2)
         reasoning = "Multiple fraud indicators detected. Claim requires investigation by the Special Investigations Unit before processing."
     elif "not covered" in prompt_lower or "exclusion" in prompt_lower or "flood" in prompt_lower:
         decision_type = "rejected"
-        confidence = round(random.uniform(0.80, 0.95), 2)
+        confidence = round(rng.uniform(0.80, 0.95), 2)
         reasoning = "Claim falls under a policy exclusion. The claimed peril is not covered under the current policy terms."
     elif "25000" in prompt_lower or "45000" in prompt_lower or "48000" in prompt_lower or "52000" in prompt_lower:
         decision_type = "escalated"
-        confidence = round(random.uniform(0.65, 0.85), 2)
+        confidence = round(rng.uniform(0.65, 0.85), 2)
         reasoning = "High-value claim exceeding $25,000 threshold. Requires senior claims supervisor approval per Section 4.3."
     else:
         decision_type = "approved"
-        confidence = round(random.uniform(0.80, 0.95), 2)
+        confidence = round(rng.uniform(0.80, 0.95), 2)
         reasoning = "Claim is valid and falls within policy coverage. Documentation requirements met. Payout calculated per standard ACV method."
 
     response = json.dumps({
         "decision": decision_type,
         "confidence": confidence,
         "reasoning": reasoning,
-        "payout_amount": None if decision_type == "rejected" else random.randint(500, 50000),
+        "payout_amount": None if decision_type == "rejected" else rng.randint(500, 50000),
         "conditions": ["Standard documentation verification required"] if decision_type == "approved" else [],
         "risk_flags": ["Requires SIU review"] if decision_type == "escalated" else [],
         "compliance_notes": "Decision compliant with state insurance regulations."
@@ -192,18 +171,20 @@ def step_payout_calculation(state: ClaimsState) -> ClaimsState:
 def step_rag_retrieval(state: ClaimsState) -> ClaimsState:
     """Step 4: Retrieve relevant policy context via RAG."""
     claim = state["claim_data"]
+    policy_forms = (state.get("policy_data") or {}).get("policy_forms")
     rag = get_policy_rag()
 
     with Timer() as timer:
         context = rag.retrieve_context(
             claim.get("claim_type", ""),
-            claim.get("description", "")
+            claim.get("description", ""),
+            policy_forms=policy_forms
         )
 
     state["policy_context"] = context
     state["trace"].tool_calls.append(ToolCallRecord(
         tool_name="rag_policy_retrieval",
-        parameters={"claim_type": claim.get("claim_type", "")},
+        parameters={"claim_type": claim.get("claim_type", ""), "policy_forms": list(policy_forms or [])},
         result_summary=f"Retrieved {len(context)} chars of policy context",
         duration_ms=timer.elapsed_ms,
         success=True
@@ -211,38 +192,44 @@ def step_rag_retrieval(state: ClaimsState) -> ClaimsState:
     return state
 
 
-def step_llm_analysis(state: ClaimsState) -> ClaimsState:
-    """Step 5: LLM analyzes the claim with all gathered context."""
-    claim = state["claim_data"]
+# Tool result fields in the order they matter to the analysis (see prompt_builder.py)
+POLICY_FIELD_PRIORITY = (
+    "status", "policy_id", "payment_status", "effective_date", "expiry_date",
+    "deductible_standard", "deductible_wind_hail", "dwelling_coverage",
+    "personal_property_coverage", "liability_coverage", "medical_coverage",
+    "claims_history", "policy_forms"
+)
+COVERAGE_FIELD_PRIORITY = (
+    "covered", "coverage_section", "exclusions", "limit_amount", "deductible", "applicable_limit", "notes"
+)
+PAYOUT_FIELD_PRIORITY = ("payout", "reason", "requires_supervisor", "requires_inspection", "breakdown")
 
-    prompt = CLAIM_ANALYSIS_PROMPT.format(
-        claim_id=claim.get("id", "N/A"),
-        claim_type=claim.get("claim_type", "N/A"),
-        description=claim.get("description", "N/A"),
-        amount=claim.get("amount", 0),
-        policy_id=claim.get("policy_id", "N/A"),
-        date_of_incident=claim.get("date_of_incident", "N/A"),
-        policy_context=state.get("policy_context", "None"),
-        policy_lookup_result=json.dumps(state.get("policy_data", {}), indent=2)[:300],
-        coverage_check_result=json.dumps(state.get("coverage_data", {}), indent=2)[:300],
-        payout_calculation_result=json.dumps(state.get("payout_data", {}), indent=2)[:300]
-    )
 
-    response_text, llm_record = call_llm(prompt, CLAIMS_SYSTEM_PROMPT)
+def _build_analysis_prompt(state: ClaimsState) -> BuiltPrompt:
+    """Format the analysis prompt, fitting each tool result to its token budget."""
+    claim = state["claim_data"]
 
+    return build_prompt(CLAIM_ANALYSIS_PROMPT, {
+        "claim_id": claim.get("id", "N/A"),
+        "claim_type": claim.get("claim_type", "N/A"),
+        "description": claim.get("description", "N/A"),
+        "amount": claim.get("amount", 0),
+        "policy_id": claim.get("policy_id", "N/A"),
+        "date_of_incident": claim.get("date_of_incident", "N/A"),
+        "policy_context": state.get("policy_context", "None"),
+    }, [
+        ToolSection("policy_lookup_result", state.get("policy_data"), 110, POLICY_FIELD_PRIORITY, legacy_chars=300),
+        ToolSection("coverage_check_result", state.get("coverage_data"), 90, COVERAGE_FIELD_PRIORITY, legacy_chars=300),
+        ToolSection("payout_calculation_result", state.get("payout_data"), 120, PAYOUT_FIELD_PRIORITY, legacy_chars=300),
+    ], system_prompt=CLAIMS_SYSTEM_PROMPT)
+
+
+def _apply_analysis(state: ClaimsState, response_text: str, llm_record: LLMCallRecord) -> ClaimsState:
+    """Record the LLM call and parse its JSON analysis into state."""
     state["trace"].llm_calls.append(llm_record)
 
-    # Parse LLM response
-    try:
-        # Try to extract JSON from the response
-        json_match = response_text
-        if "```json" in response_text:
-            json_match = response_text.split("```json")[1].split("```")[0]
-        elif "```" in response_text:
-            json_match = response_text.split("```")[1].split("```")[0]
-
-        analysis = json.loads(json_match.strip())
-    except (json.JSONDecodeError, IndexError):
+    analysis = parse_llm_json(response_text)
+    if analysis is None:
         # Fallback if JSON parsing fails
         analysis = {
             "decision": "escalated",
@@ -258,10 +245,35 @@ def step_llm_analysis(state: ClaimsState) -> ClaimsState:
     return state
 
 
-def step_guardrails(state: ClaimsState) -> ClaimsState:
-    """Step 6: Run guardrail checks (PII, compliance)."""
-    claim = state["claim_data"]
-    analysis = state.get("llm_analysis", {})
+def step_llm_analysis(state: ClaimsState) -> ClaimsState:
+    """Step 5: LLM analyzes the claim with all gathered context (via the model cascade)."""
+    prompt = _build_analysis_prompt(state)
+    response_text, hops = run_cascade(
+        resolve_cascade("claims"),
+        lambda model: call_llm(prompt.text, CLAIMS_SYSTEM_PROMPT, model,
+                               on_decision=provisional_decision_recorder(state)),
+        lambda analysis: check_guardrails(state["claim_data"], analysis)
+    )
+    llm_record = record_escalated_hops(state["trace"], hops, prompt.tokens_saved)
+    return _apply_analysis(state, response_text, llm_record)
+
+
+async def astep_llm_analysis(state: ClaimsState) -> ClaimsState:
+    """Async step_llm_analysis: awaits the LLM call."""
+    prompt = _build_analysis_prompt(state)
+    response_text, hops = await arun_cascade(
+        resolve_cascade("claims"),
+        lambda model: acall_llm(prompt.text, CLAIMS_SYSTEM_PROMPT, model,
+                                on_decision=provisional_decision_recorder(state)),
+        lambda analysis: check_guardrails(state["claim_data"], analysis)
+    )
+    llm_record = record_escalated_hops(state["trace"], hops, prompt.tokens_saved)
+    return _apply_analysis(state, response_text, llm_record)
+
+
+def check_guardrails(claim: dict, analysis: dict) -> list[GuardrailResult]:
+    """PII, compliance and safety checks on an LLM analysis (also used by the model cascade)."""
+    results = []
 
     # PII Check
     pii_text = f"{claim.get('description', '')} {analysis.get('reasoning', '')}"
@@ -270,18 +282,14 @@ def step_guardrails(state: ClaimsState) -> ClaimsState:
         for indicator in ['ssn', 'social security', 'credit card', 'bank account']
     )
 
-    state["guardrail_results"] = []
-    state["guardrail_results"].append(GuardrailResult(
+    results.append(GuardrailResult(
         check_type="pii",
         passed=not pii_has_issues,
         details="No PII detected in claim data" if not pii_has_issues else "Potential PII detected — redaction recommended"
     ))
 
-    state["trace"].guardrails.append(state["guardrail_results"][-1])
-
     # Compliance Check
     decision = analysis.get("decision", "")
-    amount = claim.get("amount", 0)
     compliance_passed = True
     compliance_details = "Decision compliant with insurance regulations"
 
@@ -289,21 +297,26 @@ def step_guardrails(state: ClaimsState) -> ClaimsState:
         compliance_passed = False
         compliance_details = "Low-confidence rejection may violate fair claims handling requirements"
 
-    state["guardrail_results"].append(GuardrailResult(
+    results.append(GuardrailResult(
         check_type="compliance",
         passed=compliance_passed,
         details=compliance_details
     ))
-    state["trace"].guardrails.append(state["guardrail_results"][-1])
 
     # Safety Check (bias detection)
-    state["guardrail_results"].append(GuardrailResult(
+    results.append(GuardrailResult(
         check_type="safety",
         passed=True,
         details="No bias indicators detected in decision rationale"
     ))
-    state["trace"].guardrails.append(state["guardrail_results"][-1])
 
+    return results
+
+
+def step_guardrails(state: ClaimsState) -> ClaimsState:
+    """Step 6: Run guardrail checks (PII, compliance)."""
+    state["guardrail_results"] = check_guardrails(state["claim_data"], state.get("llm_analysis", {}))
+    state["trace"].guardrails.extend(state["guardrail_results"])
     return state
 
 
@@ -360,25 +373,8 @@ def step_finalize(state: ClaimsState) -> ClaimsState:
 
 # ─── Main Agent Runner ──────────────────────────────
 
-def run_claims_agent(claim_data: dict, send_telemetry: bool = True) -> dict:
-    """
-    Run the Claims Processing Agent on a single claim.
-
-    Args:
-        claim_data: Dictionary with claim details (id, claim_type, description, amount, policy_id, date_of_incident)
-        send_telemetry: Whether to send the trace to the backend
-
-    Returns:
-        Dictionary with decision, trace, and output details
-    """
-    print(f"\n🔍 Claims Agent — Processing claim: {claim_data.get('id', 'N/A')}")
-    print(f"   Type: {claim_data.get('claim_type', 'N/A')}")
-    print(f"   Amount: ${claim_data.get('amount', 0):,.2f}")
-
-    # Initialize state
-    trace = TraceRecord(agent_type="claims")
-
-    state: ClaimsState = {
+def _initial_state(claim_data: dict) -> ClaimsState:
+    return {
         "claim_data": claim_data,
         "policy_data": None,
         "coverage_data": None,
@@ -386,58 +382,117 @@ def run_claims_agent(claim_data: dict, send_telemetry: bool = True) -> dict:
         "policy_context": "",
         "llm_analysis": None,
         "guardrail_results": [],
+        "provisional_decision": None,
         "decision": None,
-        "trace": trace
+        "trace": TraceRecord(agent_type="claims")
     }
 
-    # Execute workflow steps sequentially (LangGraph-style)
-    workflow_steps = [
-        ("Policy Lookup", step_policy_lookup),
-        ("Coverage Check", step_coverage_check),
-        ("Payout Calculation", step_payout_calculation),
-        ("RAG Retrieval", step_rag_retrieval),
-        ("LLM Analysis", step_llm_analysis),
-        ("Guardrail Checks", step_guardrails),
-        ("Finalize Decision", step_finalize),
-    ]
-
-    for step_name, step_fn in workflow_steps:
-        try:
-            print(f"   → {step_name}...")
-            state = step_fn(state)
-        except Exception as e:
-            print(f"   ❌ Error in {step_name}: {e}")
-            trace.status = "error"
-            trace.output_data = {"error": str(e), "failed_step": step_name}
-            break
-
-    # Print result
-    decision = state.get("decision") or {}
-    print(f"\n   ✅ Decision: {decision.get('decision_type', 'N/A').upper()}")
-    print(f"   📊 Confidence: {decision.get('confidence', 0):.0%}")
-    print(f"   ⏱️  Latency: {trace.total_latency_ms}ms")
-    print(f"   💰 Cost: ${trace.total_cost_usd:.6f}")
-
-    # Send telemetry
-    if send_telemetry:
-        send_telemetry_to_backend(trace)
 
+def _print_header(claim_data: dict):
+    print(f"\n🔍 Claims Agent — Processing claim: {claim_data.get('id', 'N/A')}")
+    print(f"   Type: {claim_data.get('claim_type', 'N/A')}")
+    print(f"   Amount: ${claim_data.get('amount', 0):,.2f}")
+
+
+def _build_result(state: ClaimsState) -> dict:
+    trace = state["trace"]
     return {
         "trace_id": trace.trace_id,
-        "decision": decision,
+        "decision": state.get("decision") or {},
         "trace": trace.model_dump(),
         "payout": state.get("payout_data", {}),
         "coverage": state.get("coverage_data", {})
     }
 
 
+CLAIMS_WORKFLOW = AgentWorkflow(
+    "claims",
+    (
+        WorkflowStep("Policy Lookup", step_policy_lookup,
+                     inputs=("claim_data",), outputs=("policy_data",)),
+        WorkflowStep("Coverage Check", step_coverage_check,
+                     inputs=("claim_data", "policy_data"), outputs=("coverage_data",)),
+        WorkflowStep("Payout Calculation", step_payout_calculation,
+                     inputs=("claim_data", "coverage_data", "policy_data"), outputs=("payout_data",)),
+        # Scoped to the policy's forms, so it waits for the lookup but not coverage/payout
+        WorkflowStep("RAG Retrieval", step_rag_retrieval,
+                     inputs=("claim_data", "policy_data"), outputs=("policy_context",)),
+        WorkflowStep("LLM Analysis", step_llm_analysis, astep_llm_analysis),
+        WorkflowStep("Guardrail Checks", step_guardrails),
+        WorkflowStep("Finalize Decision", step_finalize),
+    ),
+    initial_state=_initial_state,
+    build_result=_build_result,
+    llm=LLMStepSpec(
+        step_name="LLM Analysis",
+        system_prompt=CLAIMS_SYSTEM_PROMPT,
+        temperature=LLM_TEMPERATURE,
+        build_prompt=_build_analysis_prompt,
+        apply_response=_apply_analysis,
+        simulator=_simulate_llm_response
+    )
+)
+
+
+def run_claims_agent(claim_data: dict, send_telemetry: bool = True, verbose: bool = True) -> dict:
+    """
+    Run the Claims Processing Agent on a single claim.
+
+    Args:
+        claim_data: Dictionary with claim details (id, claim_type, description, amount, policy_id, date_of_incident)
+        send_telemetry: Whether to send the trace to the backend
+        verbose: Print step progress and the decision summary
+
+    Returns:
+        Dictionary with decision, trace, and output details
+    """
+    if verbose:
+        _print_header(claim_data)
+    state = CLAIMS_WORKFLOW.execute(_initial_state(claim_data), send_telemetry, verbose)
+    return _build_result(state)
+
+
+async def arun_claims_agent(claim_data: dict, send_telemetry: bool = True, verbose: bool = False) -> dict:
+    """
+    Async run_claims_agent. Tool steps run inline; the LLM call and telemetry
+    are awaited, so many claims can be in flight on one event loop
+    (see agents.workflow.arun_many).
+    """
+    if verbose:
+        _print_header(claim_data)
+    state = await CLAIMS_WORKFLOW.aexecute(_initial_state(claim_data), send_telemetry, verbose)
+    return _build_result(state)
+
+
+def run_claims_agent_batch(
+    claims: Iterable[dict],
+    workers: int = 4,
+    mode: str = "thread",
+    send_telemetry: bool = False,
+    max_pending: Optional[int] = None
+) -> Iterator["BatchResult"]:
+    """
+    Run the agent over many claims on a thread or process pool, yielding
+    results as they complete (see agents.batch_runner.run_agent_batch).
+    """
+    from agents.batch_runner import run_agent_batch
+    return run_agent_batch("claims", claims, workers, mode, send_telemetry, max_pending)
+
+
 # ─── CLI Entry Point ────────────────────────────────
 
 if __name__ == "__main__":
-    # Load a sample claim and run the agent
-    claims = load_json_data("sample_claims.json")
-    sample_claim = claims[0]  # CLM-001: water damage
+    import sys
+
+    # With arguments: JSONL batch mode (python -m agents.claims_agent.agent --input records.jsonl --workers 8)
+    if len(sys.argv) > 1:
+        from agents.batch_runner import batch_main
+        batch_main("claims")
+    else:
+        # No arguments: load a sample claim and run the agent
+        claims = load_json_data("sample_claims.json")
+        sample_claim = claims[0]  # CLM-001: water damage
 
-    result = run_claims_agent(sample_claim, send_telemetry=False)
-    print(f"\n📋 Full Result:")
-    print(json.dumps(result["decision"], indent=2))
+        result = run_claims_agent(sample_claim, send_telemetry=False)
+        print(f"\n📋 Full Result:")
+        print(json.dumps(result["decision"], indent=2))
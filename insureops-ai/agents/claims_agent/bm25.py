@@ -0,0 +1,125 @@
+"""
+Claims Processing Agent — BM25 Inverted Index
+Term -> postings index with precomputed term frequencies and document
+lengths. Queries only touch the postings of their own terms, so retrieval
+cost scales with matching documents rather than corpus size.
+"""
+
+import heapq
+import math
+import re
+from collections import Counter
+from typing import Callable, Iterable, Optional
+
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset("""
+a an and are as at be been but by for from had has have he her his i if in into is it its
+of on or our she so such that the their them then there these they this to was we were
+which while who will with you your
+""".split())
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase word tokens with stopwords and single characters removed."""
+    return [t for t in _TOKEN_RE.findall(text.lower()) if len(t) > 1 and t not in STOPWORDS]
+
+
+class BM25Index:
+    """
+    Okapi BM25 over an inverted index.
+
+    Usage:
+        index = BM25Index()
+        index.add("water damage from burst pipe")   # returns doc id 0
+        index.search(tokenize("burst pipe"), top_k=3)  # [(score, doc_id), ...]
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: dict[str, list[tuple[int, int]]] = {}  # term -> [(doc_id, tf)]
+        self.doc_lengths: list[int] = []
+        self._total_length = 0
+        self._idf: dict[str, float] = {}
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def add(self, text: str) -> int:
+        """Index one document and return its id."""
+        return self.add_tokens(tokenize(text))
+
+    def add_tokens(self, tokens: list[str]) -> int:
+        doc_id = len(self.doc_lengths)
+        for term, tf in Counter(tokens).items():
+            self.postings.setdefault(term, []).append((doc_id, tf))
+        self.doc_lengths.append(len(tokens))
+        self._total_length += len(tokens)
+        self._idf.clear()
+        return doc_id
+
+    def to_state(self) -> dict:
+        """JSON-serializable snapshot of the index."""
+        return {
+            "k1": self.k1,
+            "b": self.b,
+            "doc_count": len(self.doc_lengths),
+            "doc_lengths": self.doc_lengths,
+            "postings": self.postings,
+        }
+
+    @classmethod
+    def from_state(cls, state: dict) -> "BM25Index":
+        """Rebuild an index from to_state() output without re-tokenizing."""
+        index = cls(k1=state["k1"], b=state["b"])
+        index.doc_lengths = list(state["doc_lengths"])
+        index._total_length = sum(index.doc_lengths)
+        # JSON round-trips postings as [doc_id, tf] lists; search() unpacks either form
+        index.postings = state["postings"]
+        return index
+
+    def idf(self, term: str) -> float:
+        """BM25+ style non-negative IDF, cached until the next add()."""
+        idf = self._idf.get(term)
+        if idf is None:
+            df = len(self.postings.get(term, ()))
+            n = len(self.doc_lengths)
+            idf = self._idf[term] = math.log(1 + (n - df + 0.5) / (df + 0.5))
+        return idf
+
+    def search(
+        self,
+        query_terms: Iterable[str],
+        top_k: int = 3,
+        doc_filter: Optional[Callable[[int], bool]] = None
+    ) -> list[tuple[float, int]]:
+        """
+        Score documents containing any query term and return the top_k
+        (score, doc_id) pairs, best first. Duplicate query terms count once.
+        """
+        if not self.doc_lengths:
+            return []
+
+        avgdl = self._total_length / len(self.doc_lengths) or 1.0
+        k1, b = self.k1, self.b
+        doc_lengths = self.doc_lengths
+        scores: dict[int, float] = {}
+
+        for term in dict.fromkeys(query_terms):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = self.idf(term)
+            for doc_id, tf in postings:
+                if doc_filter is not None and not doc_filter(doc_id):
+                    continue
+                norm = k1 * (1 - b + b * doc_lengths[doc_id] / avgdl)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (k1 + 1) / (tf + norm)
+
+        # Ties broken by document order so results are deterministic
+        return [
+            (score, doc_id)
+            for doc_id, score in heapq.nsmallest(top_k, scores.items(), key=lambda kv: (-kv[1], kv[0]))
+        ]
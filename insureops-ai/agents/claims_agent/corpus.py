@@ -0,0 +1,264 @@
+"""
+Claims Processing Agent — Policy Corpus
+Chunks a directory tree of policy forms, endorsements and riders, and
+persists the chunks plus the BM25 index so a cold start only stats files.
+A file is re-chunked only when its mtime/size changed AND its content hash
+differs from the manifest.
+
+Each file is a policy form; its form id is the path relative to the corpus
+root without the extension (e.g. "HO-3", "endorsements/HO-04-90").
+"""
+
+import hashlib
+import json
+import os
+import re
+from typing import Optional
+
+from agents.claims_agent.bm25 import BM25Index
+
+
+CORPUS_EXTENSIONS = (".txt", ".md", ".pdf")
+STATE_VERSION = 1
+
+
+# ─── Chunking ────────────────────────────────────────
+
+IMPORTANT_TERMS = [
+    "fire", "water", "flood", "theft", "vandalism", "wind", "hail",
+    "lightning", "explosion", "liability", "medical", "collision",
+    "coverage", "deductible", "exclusion", "payout", "claim",
+    "dwelling", "personal property", "loss of use", "structural",
+    "earthquake", "mold", "maintenance", "fraud", "arson",
+    "glass", "windshield", "auto", "vehicle", "storm",
+    "burst pipe", "plumbing", "appliance", "jewelry", "electronics"
+]
+
+
+def extract_keywords(text: str) -> list[str]:
+    """Extract important insurance keywords from a text chunk."""
+    text_lower = text.lower()
+    return [term for term in IMPORTANT_TERMS if term in text_lower]
+
+
+def chunk_policy_text(content: str) -> list[dict]:
+    """Split a policy document into section / sub-section chunks."""
+    chunks = []
+
+    # Split by section headers (lines with === or section numbers)
+    sections = re.split(r'\n={3,}\n', content)
+
+    for section in sections:
+        section = section.strip()
+        if not section:
+            continue
+
+        # Extract section title (first non-empty line)
+        lines = section.split('\n')
+        title = lines[0].strip() if lines else "Unknown Section"
+
+        # Further split large sections into sub-chunks (~500 chars each)
+        sub_sections = re.split(r'\n(\d+\.\d+\s)', section)
+
+        current_chunk = ""
+        current_title = title
+
+        for part in sub_sections:
+            if re.match(r'\d+\.\d+\s', part):
+                # This is a sub-section header
+                if current_chunk:
+                    chunks.append({
+                        "title": current_title,
+                        "content": current_chunk.strip(),
+                        "keywords": extract_keywords(current_chunk)
+                    })
+                current_title = f"{title} > {part.strip()}"
+                current_chunk = part
+            else:
+                current_chunk += part
+
+        # Add the last chunk
+        if current_chunk:
+            chunks.append({
+                "title": current_title,
+                "content": current_chunk.strip(),
+                "keywords": extract_keywords(current_chunk)
+            })
+
+    return chunks
+
+
+def _read_document(path: str) -> Optional[str]:
+    if path.lower().endswith(".pdf"):
+        try:
+            import fitz  # PyMuPDF
+        except ImportError:
+            print(f"⚠️ PyMuPDF not installed — skipping {path}")
+            return None
+        with fitz.open(path) as doc:
+            return "\n".join(page.get_text() for page in doc)
+
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def form_id_for(relpath: str) -> str:
+    """Policy form id for a corpus-relative path: POSIX path without extension."""
+    return os.path.splitext(relpath)[0].replace(os.sep, "/")
+
+
+# ─── Corpus ──────────────────────────────────────────
+
+class PolicyCorpus:
+    """
+    Incrementally indexed set of policy documents.
+
+    Usage:
+        corpus = PolicyCorpus("agents/data/policy_forms", state_dir)
+        corpus.refresh()          # {"files": ..., "rechunked": ..., ...}
+        corpus.chunks[doc_id]     # {"title", "content", "keywords", "form_id", "source"}
+        corpus.docs_for_forms(["HO-3"])
+    """
+
+    def __init__(self, root: str, state_dir: Optional[str] = None):
+        self.root = os.path.abspath(root)
+        self.state_dir = state_dir
+        self.chunks: list[dict] = []
+        self.index = BM25Index()
+        self.form_docs: dict[str, list[int]] = {}
+        self._manifest: dict[str, dict] = {}
+
+    @property
+    def state_path(self) -> Optional[str]:
+        """State file for this corpus root — one per root, so corpora never share state."""
+        if not self.state_dir:
+            return None
+        key = hashlib.sha256(self.root.encode("utf-8")).hexdigest()[:12]
+        return os.path.join(self.state_dir, f"corpus-{key}.json")
+
+    def _discover(self) -> dict[str, str]:
+        """Map of relative path -> absolute path for every document under root."""
+        if os.path.isfile(self.root):
+            return {os.path.basename(self.root): self.root}
+
+        found = {}
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames.sort()
+            for filename in sorted(filenames):
+                if filename.lower().endswith(CORPUS_EXTENSIONS):
+                    path = os.path.join(dirpath, filename)
+                    found[os.path.relpath(path, self.root)] = path
+        return found
+
+    def _load_state(self) -> Optional[dict]:
+        path = self.state_path
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if state.get("version") != STATE_VERSION or state.get("root") != self.root:
+            return None
+        return state
+
+    def _save_state(self):
+        path = self.state_path
+        if not path:
+            return
+        state = {
+            "version": STATE_VERSION,
+            "root": self.root,
+            "files": self._manifest,
+            "index": self.index.to_state(),
+        }
+        try:
+            os.makedirs(self.state_dir, exist_ok=True)
+            tmp_path = f"{path}.tmp{os.getpid()}"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(state, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"⚠️ Could not persist corpus state to {path}: {e}")
+
+    def refresh(self) -> dict:
+        """
+        Bring chunks and index up to date with the files on disk.
+        Unchanged files reuse their persisted chunks; if nothing changed at
+        all, the persisted BM25 index is loaded as-is.
+        """
+        state = None
+        if not self._manifest:
+            state = self._load_state()
+            if state is not None:
+                self._manifest = state["files"]
+
+        stats = {"files": 0, "unchanged": 0, "revalidated": 0, "rechunked": 0, "removed": 0}
+        manifest = {}
+
+        for relpath, path in self._discover().items():
+            stats["files"] += 1
+            st = os.stat(path)
+            stat_key = [st.st_mtime_ns, st.st_size]
+            entry = self._manifest.get(relpath)
+
+            if entry is not None and entry["stat"] == stat_key:
+                stats["unchanged"] += 1
+                manifest[relpath] = entry
+                continue
+
+            with open(path, "rb") as f:
+                digest = hashlib.sha256(f.read()).hexdigest()
+
+            if entry is not None and entry["sha256"] == digest:
+                # Touched but identical — keep the chunks, record the new stat
+                stats["revalidated"] += 1
+                manifest[relpath] = dict(entry, stat=stat_key)
+                continue
+
+            content = _read_document(path)
+            if content is None:
+                continue
+            form_id = form_id_for(relpath)
+            chunks = chunk_policy_text(content)
+            for chunk in chunks:
+                chunk["form_id"] = form_id
+                chunk["source"] = relpath.replace(os.sep, "/")
+
+            stats["rechunked"] += 1
+            manifest[relpath] = {"stat": stat_key, "sha256": digest, "form_id": form_id, "chunks": chunks}
+
+        stats["removed"] = len(set(self._manifest) - set(manifest))
+        index_stale = not self._manifest or stats["rechunked"] > 0 or stats["removed"] > 0
+
+        self._manifest = manifest
+        self.chunks = [chunk for relpath in sorted(manifest) for chunk in manifest[relpath]["chunks"]]
+
+        if not index_stale and len(self.index) == len(self.chunks):
+            stats["index"] = "reused"
+        elif not index_stale and state is not None and state["index"]["doc_count"] == len(self.chunks):
+            self.index = BM25Index.from_state(state["index"])
+            stats["index"] = "loaded"
+        else:
+            # Chunk i is BM25 document i
+            self.index = BM25Index()
+            for chunk in self.chunks:
+                self.index.add(f"{chunk['title']} {chunk['content']}")
+            stats["index"] = "rebuilt"
+
+        if stats["index"] == "rebuilt" or stats["revalidated"]:
+            self._save_state()
+
+        self.form_docs = {}
+        for doc_id, chunk in enumerate(self.chunks):
+            self.form_docs.setdefault(chunk["form_id"], []).append(doc_id)
+
+        return stats
+
+    def forms(self) -> list[str]:
+        return sorted(self.form_docs)
+
+    def docs_for_forms(self, form_ids) -> frozenset:
+        """Doc ids belonging to any of the given policy forms (unknown forms are ignored)."""
+        return frozenset(doc_id for form_id in form_ids for doc_id in self.form_docs.get(form_id, ()))
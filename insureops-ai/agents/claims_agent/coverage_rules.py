@@ -0,0 +1,83 @@
+"""
+Claims Processing Agent — Coverage Rule Table
+Loads the versioned coverage_rules.json once into a frozen lookup table and
+memoizes coverage decisions on (claim_type, policy coverage fingerprint).
+"""
+
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Mapping, Optional
+
+from agents.data_repository import FrozenDict, get_data_repository
+
+
+RULES_FILE = "coverage_rules.json"
+
+
+@dataclass(frozen=True, eq=False)
+class CoverageRuleTable:
+    """Immutable coverage rules keyed by claim type (hashed by identity for memoization)."""
+    version: str
+    rules: Mapping[str, Mapping]
+    default_rule: Mapping
+    # Policy fields any rule draws its limit from — the coverage fingerprint
+    limit_fields: tuple
+
+    def fingerprint(self, policy_data: Optional[Mapping]) -> Optional[tuple]:
+        """Hashable summary of the policy fields that affect coverage decisions."""
+        if not policy_data:
+            return None
+        return tuple(policy_data.get(field, "N/A") for field in self.limit_fields)
+
+    def evaluate(self, claim_type: str, policy_data: Optional[Mapping]) -> Mapping:
+        """Coverage decision for a claim type under a policy (memoized)."""
+        return _evaluate(self, claim_type, self.fingerprint(policy_data))
+
+
+@lru_cache(maxsize=4096)
+def _evaluate(table: CoverageRuleTable, claim_type: str, fingerprint: Optional[tuple]) -> Mapping:
+    rule = table.rules.get(claim_type)
+    if rule is None:
+        rule = dict(table.default_rule)
+        rule["notes"] = rule["notes"].format(claim_type=claim_type)
+    else:
+        rule = dict(rule)
+
+    # Add applicable limit value from policy data
+    if rule["applicable_limit"] and fingerprint is not None:
+        rule["limit_amount"] = fingerprint[table.limit_fields.index(rule["applicable_limit"])]
+
+    return FrozenDict(rule)
+
+
+def compile_coverage_rules(data: Mapping) -> CoverageRuleTable:
+    """Build a CoverageRuleTable from a parsed coverage_rules.json."""
+    rules = data["rules"]
+    return CoverageRuleTable(
+        version=data["version"],
+        rules=rules,
+        default_rule=data["default_rule"],
+        limit_fields=tuple(sorted({
+            rule["applicable_limit"] for rule in rules.values() if rule["applicable_limit"]
+        })),
+    )
+
+
+# Singleton instance — recompiled when the rule file changes on disk
+_table: Optional[CoverageRuleTable] = None
+_table_version = 0
+_table_lock = threading.Lock()
+
+def get_coverage_rules() -> CoverageRuleTable:
+    """Get the CoverageRuleTable for the current coverage_rules.json."""
+    global _table, _table_version
+    repo = get_data_repository()
+    version = repo.version(RULES_FILE)
+    if _table is None or version != _table_version:
+        with _table_lock:
+            if _table is None or version != _table_version:
+                _table = compile_coverage_rules(repo.get(RULES_FILE))
+                _table_version = version
+                _evaluate.cache_clear()
+    return _table
@@ -0,0 +1,157 @@
+"""
+Claims Processing Agent — Batch Payout Engine
+Vectorized payout_calculator for bulk reprocessing of open claims after
+deductible or depreciation changes. Applies ACV depreciation, deductibles,
+coverage limits and the RCV holdback over NumPy arrays and emits a single
+aggregate trace per batch instead of one ToolCallRecord per claim.
+"""
+
+from typing import Optional, Sequence
+
+from agents.base_agent import (
+    TraceRecord, ToolCallRecord, Timer, round_values, send_telemetry_to_backend
+)
+from agents.claims_agent.policy_store import get_policy_store
+from agents.claims_agent.tools import (
+    coverage_checker_batch, DEPRECIATION_RATE, DEFAULT_DEDUCTIBLE,
+    DEFAULT_WIND_HAIL_DEDUCTIBLE, FIXED_DEDUCTIBLES,
+    INSPECTION_THRESHOLD, SUPERVISOR_THRESHOLD
+)
+
+
+def _limit_array(coverage_limits, size: int):
+    """Coverage limits as floats; None / 'N/A' / missing mean unlimited."""
+    import numpy as np
+
+    if coverage_limits is None:
+        return np.full(size, np.inf)
+    return np.array(
+        [np.inf if v is None or v == "N/A" else float(v) for v in coverage_limits],
+        dtype=float
+    )
+
+
+def calculate_payouts(
+    claim_amounts: Sequence[float],
+    deductible_types: Sequence[str],
+    coverage_limits: Optional[Sequence] = None,
+    covered: Optional[Sequence[bool]] = None,
+    deductible_standard: Optional[Sequence[float]] = None,
+    deductible_wind_hail: Optional[Sequence[float]] = None,
+    depreciation_rate: float = DEPRECIATION_RATE
+) -> tuple[dict, ToolCallRecord]:
+    """
+    Vectorized payout calculation.
+
+    Args:
+        claim_amounts: claimed amount per claim
+        deductible_types: coverage deductible type per claim (standard, wind_hail, collision, none)
+        coverage_limits: applicable limit per claim (None / "N/A" = unlimited)
+        covered: coverage flag per claim (default all covered); uncovered claims pay 0
+        deductible_standard / deductible_wind_hail: per-claim policy deductibles
+        depreciation_rate: ACV depreciation rate (override to model a rule change)
+
+    Returns:
+        (columns, record) — a dict of NumPy arrays that matches payout_calculator
+        claim for claim, and one ToolCallRecord for the whole batch.
+    """
+    import numpy as np
+
+    with Timer() as timer:
+        amounts = np.asarray(claim_amounts, dtype=float)
+        size = len(amounts)
+        types = np.asarray(deductible_types, dtype=object)
+        covered = np.ones(size, dtype=bool) if covered is None else np.asarray(covered, dtype=bool)
+        limits = _limit_array(coverage_limits, size)
+
+        standard = (np.full(size, DEFAULT_DEDUCTIBLE, dtype=float) if deductible_standard is None
+                    else np.asarray(deductible_standard, dtype=float))
+        wind_hail = (np.full(size, DEFAULT_WIND_HAIL_DEDUCTIBLE, dtype=float) if deductible_wind_hail is None
+                     else np.asarray(deductible_wind_hail, dtype=float))
+
+        # Deductible per claim — unknown types fall back to the default deductible
+        deductible = np.full(size, DEFAULT_DEDUCTIBLE, dtype=float)
+        is_standard = types == "standard"
+        is_wind_hail = types == "wind_hail"
+        deductible[is_standard] = standard[is_standard]
+        deductible[is_wind_hail] = wind_hail[is_wind_hail]
+        for deductible_type, amount in FIXED_DEDUCTIBLES.items():
+            deductible[types == deductible_type] = amount
+
+        depreciation = amounts * depreciation_rate
+        acv = amounts * (1 - depreciation_rate)
+        after_deductible = np.maximum(0, acv - deductible)
+        final_payout = np.where(covered, np.minimum(after_deductible, limits), 0.0)
+
+        columns = {
+            "payout": round_values(final_payout, 2),
+            "covered": covered,
+            "claimed_amount": amounts,
+            "depreciation_applied": round_values(depreciation, 2),
+            "acv_after_depreciation": round_values(acv, 2),
+            "deductible": deductible,
+            "after_deductible": round_values(after_deductible, 2),
+            "coverage_limit": limits,
+            "rcv_holdback": round_values(depreciation, 2),
+            "requires_inspection": covered & (amounts > INSPECTION_THRESHOLD),
+            "requires_supervisor": covered & (amounts > SUPERVISOR_THRESHOLD),
+        }
+
+    total_payout = float(columns["payout"].sum())
+    record = ToolCallRecord(
+        tool_name="payout_calculator_batch",
+        parameters={"claims": size, "depreciation_rate": depreciation_rate},
+        result_summary=f"{int(covered.sum())}/{size} covered, total payout ${total_payout:,.2f}",
+        duration_ms=timer.elapsed_ms,
+        success=True
+    )
+
+    return columns, record
+
+
+def reprocess_payouts(
+    claims: list[dict],
+    depreciation_rate: float = DEPRECIATION_RATE,
+    send_telemetry: bool = False
+) -> tuple[dict, TraceRecord]:
+    """
+    Recompute payouts for a list of open claims in bulk.
+    Policies are fetched in one get_many(), coverage in one batch pass, and
+    the run is recorded as a single aggregate TraceRecord.
+    """
+    policies = get_policy_store().get_many(c.get("policy_id", "") for c in claims)
+    coverage, coverage_record = coverage_checker_batch(claims, policies)
+
+    missing_policy = {}
+    columns, payout_record = calculate_payouts(
+        claim_amounts=[c.get("amount", 0) for c in claims],
+        deductible_types=[r.get("deductible", "standard") for r in coverage],
+        coverage_limits=[r.get("limit_amount") for r in coverage],
+        covered=[bool(r.get("covered")) for r in coverage],
+        deductible_standard=[
+            (policies.get(c.get("policy_id", "")) or missing_policy).get("deductible_standard", DEFAULT_DEDUCTIBLE)
+            for c in claims
+        ],
+        deductible_wind_hail=[
+            (policies.get(c.get("policy_id", "")) or missing_policy).get("deductible_wind_hail", DEFAULT_WIND_HAIL_DEDUCTIBLE)
+            for c in claims
+        ],
+        depreciation_rate=depreciation_rate
+    )
+    columns["claim_id"] = [c.get("id", "N/A") for c in claims]
+
+    trace = TraceRecord(agent_type="claims")
+    trace.tool_calls = [coverage_record, payout_record]
+    trace.total_latency_ms = coverage_record.duration_ms + payout_record.duration_ms
+    trace.input_data = {"batch_size": len(claims), "depreciation_rate": depreciation_rate}
+    trace.output_data = {
+        "claims_reprocessed": len(claims),
+        "claims_covered": int(columns["covered"].sum()),
+        "total_payout": round(float(columns["payout"].sum()), 2),
+        "requires_supervisor": int(columns["requires_supervisor"].sum()),
+    }
+
+    if send_telemetry:
+        send_telemetry_to_backend(trace)
+
+    return columns, trace
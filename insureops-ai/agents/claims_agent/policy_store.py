@@ -0,0 +1,184 @@
+"""
+Claims Processing Agent — Policy Store
+SQLite-backed policy database with a bounded LRU cache in front of it.
+Seeds itself with the synthetic demo policies on first use, and supports
+batch get_many() lookups for bulk claim runs.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+from agents.base_agent import get_data_path
+from agents.data_repository import freeze
+
+
+_MISSING = object()
+_SQLITE_MAX_PARAMS = 900
+
+
+def synthetic_policies() -> list[dict]:
+    """The demo policy book (POL-1001 .. POL-1020) used as seed data."""
+    return [
+        {
+            "policy_id": f"POL-{1000 + i}",
+            "holder_name": f"Customer {1000 + i}",
+            "status": "active",
+            "effective_date": "2025-06-01",
+            "expiry_date": "2026-06-01",
+            "dwelling_coverage": 300000 + (i * 25000),
+            "personal_property_coverage": 150000 + (i * 12500),
+            "liability_coverage": 100000,
+            "medical_coverage": 5000,
+            "deductible_standard": 500,
+            "deductible_wind_hail": 1000,
+            "premium_monthly": 120 + (i * 15),
+            "claims_history": max(0, i % 3),
+            "payment_status": "current",
+            "policy_forms": ["HO-3"]
+        }
+        for i in range(1, 21)
+    ]
+
+
+class PolicyStore:
+    """
+    Policy lookups by id, served from an LRU cache over SQLite.
+
+    Usage:
+        store = get_policy_store()
+        store.get("POL-1001")                    # FrozenDict or None
+        store.get_many(["POL-1001", "POL-1002"]) # {policy_id: policy}
+        store.put_many(policies)                 # bulk load / update
+    """
+
+    def __init__(self, db_path: Optional[str] = None, cache_size: int = 10000, seed: bool = True):
+        self.db_path = db_path or os.getenv("POLICY_STORE_PATH") or get_data_path("policies.db")
+        self.cache_size = cache_size
+        self._cache: OrderedDict = OrderedDict()
+        self._lock = threading.RLock()
+        self._hits = 0
+        self._misses = 0
+
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        if self.db_path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS policies ("
+            "policy_id TEXT PRIMARY KEY, data TEXT NOT NULL) WITHOUT ROWID"
+        )
+        self._conn.commit()
+
+        if seed and self.count() == 0:
+            self.put_many(synthetic_policies())
+
+    # ─── Cache ───────────────────────────────────────
+
+    def _cache_get(self, policy_id: str):
+        value = self._cache.get(policy_id, _MISSING)
+        if value is not _MISSING:
+            self._cache.move_to_end(policy_id)
+            self._hits += 1
+        return value
+
+    def _cache_put(self, policy_id: str, policy: Optional[dict]):
+        self._cache[policy_id] = policy
+        self._cache.move_to_end(policy_id)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    # ─── Reads ───────────────────────────────────────
+
+    def get(self, policy_id: str) -> Optional[dict]:
+        """Return a read-only policy dict, or None if the policy does not exist."""
+        with self._lock:
+            cached = self._cache_get(policy_id)
+            if cached is not _MISSING:
+                return cached
+
+            self._misses += 1
+            row = self._conn.execute(
+                "SELECT data FROM policies WHERE policy_id = ?", (policy_id,)
+            ).fetchone()
+            policy = freeze(json.loads(row[0])) if row else None
+            self._cache_put(policy_id, policy)
+            return policy
+
+    def get_many(self, policy_ids: Iterable[str]) -> dict[str, Optional[dict]]:
+        """Batch lookup — cache hits first, then one IN query per chunk of misses."""
+        results: dict[str, Optional[dict]] = {}
+        with self._lock:
+            missing = []
+            for policy_id in dict.fromkeys(policy_ids):
+                cached = self._cache_get(policy_id)
+                if cached is _MISSING:
+                    missing.append(policy_id)
+                else:
+                    results[policy_id] = cached
+
+            self._misses += len(missing)
+            for start in range(0, len(missing), _SQLITE_MAX_PARAMS):
+                chunk = missing[start:start + _SQLITE_MAX_PARAMS]
+                placeholders = ",".join("?" * len(chunk))
+                found = dict(self._conn.execute(
+                    f"SELECT policy_id, data FROM policies WHERE policy_id IN ({placeholders})", chunk
+                ).fetchall())
+                for policy_id in chunk:
+                    policy = freeze(json.loads(found[policy_id])) if policy_id in found else None
+                    self._cache_put(policy_id, policy)
+                    results[policy_id] = policy
+        return results
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM policies").fetchone()[0]
+
+    # ─── Writes ──────────────────────────────────────
+
+    def put_many(self, policies: Iterable[dict]):
+        """Insert or replace policies and drop their cached copies."""
+        rows = [(p["policy_id"], json.dumps(p)) for p in policies]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO policies (policy_id, data) VALUES (?, ?)", rows
+            )
+            self._conn.commit()
+            for policy_id, _ in rows:
+                self._cache.pop(policy_id, None)
+
+    def put(self, policy: dict):
+        self.put_many([policy])
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "cached": len(self._cache),
+                "cache_size": self.cache_size,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+            }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# Singleton instance
+_policy_store = None
+_policy_store_lock = threading.Lock()
+
+def get_policy_store() -> PolicyStore:
+    """Get or create the process-wide PolicyStore."""
+    global _policy_store
+    if _policy_store is None:
+        with _policy_store_lock:
+            if _policy_store is None:
+                _policy_store = PolicyStore(
+                    cache_size=int(os.getenv("POLICY_CACHE_SIZE", "10000"))
+                )
+    return _policy_store
@@ -26,7 +26,25 @@ IMPORTANT GUIDELINES:
 - Be thorough but concise in your reasoning
 - Ensure compliance with insurance regulations"""
 
-CLAIM_ANALYSIS_PROMPT = """Analyze the following insurance claim and provide a detailed assessment.
+# Static instructions first and per-claim data last, so every call shares
+# the same prompt prefix (provider prompt caching)
+CLAIM_ANALYSIS_INSTRUCTIONS = """Analyze the following insurance claim and provide a detailed assessment.
+
+Base your analysis on the policy context, claim details and tool results below, and respond in the following JSON format:
+{{
+    "decision": "approved" | "rejected" | "escalated",
+    "confidence": 0.0 to 1.0,
+    "reasoning": "Detailed explanation of the decision",
+    "payout_amount": amount or null,
+    "conditions": ["any conditions attached to the approval"],
+    "risk_flags": ["any risk or fraud indicators noted"],
+    "compliance_notes": "any regulatory compliance notes"
+}}"""
+
+CLAIM_ANALYSIS_PROMPT = CLAIM_ANALYSIS_INSTRUCTIONS + """
+
+POLICY CONTEXT:
+{policy_context}
 
 CLAIM DETAILS:
 - Claim ID: {claim_id}
@@ -36,24 +54,10 @@ CLAIM DETAILS:
 - Policy ID: {policy_id}
 - Date of Incident: {date_of_incident}
 
-POLICY CONTEXT:
-{policy_context}
-
 TOOL RESULTS:
 - Policy Lookup: {policy_lookup_result}
 - Coverage Check: {coverage_check_result}
-- Payout Calculation: {payout_calculation_result}
-
-Based on the above information, provide your analysis in the following JSON format:
-{{
-    "decision": "approved" | "rejected" | "escalated",
-    "confidence": 0.0 to 1.0,
-    "reasoning": "Detailed explanation of the decision",
-    "payout_amount": amount or null,
-    "conditions": ["any conditions attached to the approval"],
-    "risk_flags": ["any risk or fraud indicators noted"],
-    "compliance_notes": "any regulatory compliance notes"
-}}"""
+- Payout Calculation: {payout_calculation_result}"""
 
 GUARDRAIL_PII_PROMPT = """Review the following text for any Personally Identifiable Information (PII).
 Check for: Social Security numbers, bank account numbers, credit card numbers, 
@@ -1,128 +1,92 @@
 """
 Claims Processing Agent — RAG Pipeline
-Loads the sample policy document, chunks it, and provides context retrieval
-for claim analysis. Uses simple keyword-based retrieval for portability,
-with optional FAISS upgrade when sentence-transformers is available.
+Indexes the policy form corpus (agents/data/policy_forms, or RAG_CORPUS_DIR)
+and provides context retrieval for claim analysis, scoped to the forms
+attached to the claim's policy. Chunks and the BM25 inverted index persist
+under RAG_INDEX_DIR, so a cold start loads them instead of re-parsing.
 """
 
 import os
-import re
+import threading
 from typing import Optional
 from agents.base_agent import get_data_path
+from agents.claims_agent.bm25 import BM25Index, tokenize
+from agents.claims_agent.corpus import PolicyCorpus, extract_keywords
+from agents.claims_agent.vector_index import get_index_dir
+
+
+RETRIEVAL_MODES = ("bm25", "vector")
 
 
 class PolicyRAG:
     """Simple RAG pipeline for policy document context retrieval."""
 
-    def __init__(self, policy_path: Optional[str] = None):
-        self.policy_path = policy_path or get_data_path("sample_policy.txt")
+    def __init__(self, corpus_path: Optional[str] = None, retrieval_mode: Optional[str] = None):
+        self.corpus_path = corpus_path or os.getenv("RAG_CORPUS_DIR") or get_data_path("policy_forms")
+        self.retrieval_mode = (retrieval_mode or os.getenv("RAG_RETRIEVAL_MODE", "bm25")).lower()
+        if self.retrieval_mode not in RETRIEVAL_MODES:
+            raise ValueError(f"Unknown RAG retrieval mode '{self.retrieval_mode}' (expected one of {RETRIEVAL_MODES})")
+        self.corpus = PolicyCorpus(self.corpus_path, state_dir=get_index_dir())
         self.chunks = []
-        self.section_index = {}
-        self._load_and_chunk()
-
-    def _load_and_chunk(self):
-        """Load the policy document and split into searchable chunks."""
-        if not os.path.exists(self.policy_path):
-            print(f"⚠️ Policy document not found at {self.policy_path}")
-            return
-
-        with open(self.policy_path, "r", encoding="utf-8") as f:
-            content = f.read()
-
-        # Split by section headers (lines with === or section numbers)
-        sections = re.split(r'\n={3,}\n', content)
-
-        for section in sections:
-            section = section.strip()
-            if not section:
-                continue
-
-            # Extract section title (first non-empty line)
-            lines = section.split('\n')
-            title = lines[0].strip() if lines else "Unknown Section"
-
-            # Further split large sections into sub-chunks (~500 chars each)
-            sub_sections = re.split(r'\n(\d+\.\d+\s)', section)
-
-            current_chunk = ""
-            current_title = title
-
-            for part in sub_sections:
-                if re.match(r'\d+\.\d+\s', part):
-                    # This is a sub-section header
-                    if current_chunk:
-                        self.chunks.append({
-                            "title": current_title,
-                            "content": current_chunk.strip(),
-                            "keywords": self._extract_keywords(current_chunk)
-                        })
-                    current_title = f"{title} > {part.strip()}"
-                    current_chunk = part
-                else:
-                    current_chunk += part
-
-            # Add the last chunk
-            if current_chunk:
-                self.chunks.append({
-                    "title": current_title,
-                    "content": current_chunk.strip(),
-                    "keywords": self._extract_keywords(current_chunk)
-                })
-
-        # Build section index for quick lookup
-        for i, chunk in enumerate(self.chunks):
-            for keyword in chunk["keywords"]:
-                if keyword not in self.section_index:
-                    self.section_index[keyword] = []
-                self.section_index[keyword].append(i)
+        self.index = BM25Index()
+        self.vector_index = None
+        self.refresh()
+
+    def refresh(self) -> dict:
+        """Re-index changed policy documents; unchanged files are not re-chunked."""
+        if not os.path.exists(self.corpus_path):
+            print(f"⚠️ Policy corpus not found at {self.corpus_path}")
+            return {}
+
+        stats = self.corpus.refresh()
+        self.chunks = self.corpus.chunks
+        self.index = self.corpus.index
+        if self.retrieval_mode == "vector":
+            self._load_vector_index()
+        return stats
+
+    def _load_vector_index(self):
+        """Map the persisted embedding index for these chunks (built on first use)."""
+        from agents.claims_agent.vector_index import load_or_build_vector_index
+
+        self.vector_index = load_or_build_vector_index(
+            [f"{chunk['title']} {chunk['content']}" for chunk in self.chunks]
+        )
 
     def _extract_keywords(self, text: str) -> list[str]:
         """Extract important keywords from a text chunk."""
-        # Insurance-specific keywords
-        important_terms = [
-            "fire", "water", "flood", "theft", "vandalism", "wind", "hail",
-            "lightning", "explosion", "liability", "medical", "collision",
-            "coverage", "deductible", "exclusion", "payout", "claim",
-            "dwelling", "personal property", "loss of use", "structural",
-            "earthquake", "mold", "maintenance", "fraud", "arson",
-            "glass", "windshield", "auto", "vehicle", "storm",
-            "burst pipe", "plumbing", "appliance", "jewelry", "electronics"
-        ]
-
-        text_lower = text.lower()
-        found = [term for term in important_terms if term in text_lower]
-        return found
-
-    def retrieve_context(self, claim_type: str, description: str = "", top_k: int = 3) -> str:
+        return extract_keywords(text)
+
+    def retrieve_context(
+        self,
+        claim_type: str,
+        description: str = "",
+        top_k: int = 3,
+        policy_forms: Optional[list[str]] = None
+    ) -> str:
         """
         Retrieve relevant policy sections for a given claim type.
-        Uses keyword matching to find the most relevant chunks.
+        Ranks chunks with BM25 over the claim type and description terms,
+        or by embedding similarity in vector mode. When policy_forms is
+        given, only documents attached to those forms are searched.
         """
         if not self.chunks:
             return "Policy document not available for context."
 
-        query_text = f"{claim_type} {description}".lower()
-        query_keywords = self._extract_keywords(query_text)
-
-        # Also add the claim type directly
-        claim_keywords = claim_type.lower().replace("_", " ").split()
-        query_keywords.extend(claim_keywords)
-
-        # Score each chunk
-        scored_chunks = []
-        for i, chunk in enumerate(self.chunks):
-            score = 0
-            for kw in query_keywords:
-                if kw in chunk["keywords"]:
-                    score += 2
-                if kw in chunk["content"].lower():
-                    score += 1
-            if score > 0:
-                scored_chunks.append((score, i, chunk))
-
-        # Sort by score, take top_k
-        scored_chunks.sort(key=lambda x: x[0], reverse=True)
-        top_chunks = scored_chunks[:top_k]
+        doc_filter = None
+        if policy_forms:
+            allowed = self.corpus.docs_for_forms(policy_forms)
+            if not allowed:
+                return f"No policy documents indexed for forms: {', '.join(policy_forms)}."
+            doc_filter = allowed.__contains__
+
+        if self.vector_index is not None:
+            query = f"{claim_type.replace('_', ' ')} {description}"
+            ranked = self.vector_index.search(query, top_k=top_k, doc_filter=doc_filter)
+        else:
+            query_terms = tokenize(claim_type.replace("_", " ")) + tokenize(description)
+            ranked = self.index.search(query_terms, top_k=top_k, doc_filter=doc_filter)
+        top_chunks = [(score, idx, self.chunks[idx]) for score, idx in ranked]
 
         if not top_chunks:
             return "No specific policy sections found for this claim type."
@@ -136,10 +100,13 @@ class PolicyRAG:
 
 # Singleton instance
 _rag_instance = None
+_rag_lock = threading.Lock()
 
 def get_policy_rag() -> PolicyRAG:
     """Get or create the singleton PolicyRAG instance."""
     global _rag_instance
     if _rag_instance is None:
-        _rag_instance = PolicyRAG()
+        with _rag_lock:
+            if _rag_instance is None:
+                _rag_instance = PolicyRAG()
     return _rag_instance
@@ -0,0 +1,255 @@
+"""
+Claims Processing Agent — Dense Vector Index
+Embeds policy chunks once, persists the vectors as a .npy file with JSON
+metadata, and memory-maps them on startup so every worker process shares
+the same pages instead of re-embedding the corpus.
+
+Embedders:
+- HashingEmbedder (default): offline TF-IDF over hashed unigram/bigram features
+- SentenceTransformerEmbedder: used only when RAG_EMBEDDING_MODEL points at a
+  model directory that exists locally (nothing is downloaded)
+"""
+
+import hashlib
+import json
+import math
+import os
+from collections import Counter
+from functools import lru_cache
+from typing import Callable, Optional, Sequence
+
+from agents.base_agent import get_data_path
+from agents.claims_agent.bm25 import tokenize
+
+
+DEFAULT_INDEX_DIR = get_data_path("rag_index")
+
+
+def get_index_dir() -> str:
+    return os.getenv("RAG_INDEX_DIR") or DEFAULT_INDEX_DIR
+
+
+# ─── Embedders ───────────────────────────────────────
+
+@lru_cache(maxsize=65536)
+def _feature_slot(feature: str, dim: int) -> tuple[int, float]:
+    """Stable (bucket, sign) for a feature — independent of PYTHONHASHSEED."""
+    h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+    return h % dim, (1.0 if (h >> 63) & 1 else -1.0)
+
+
+class HashingEmbedder:
+    """
+    Offline TF-IDF embedder. Unigrams and bigrams are hashed into `dim`
+    signed buckets, weighted by sublinear TF and a per-bucket IDF fitted on
+    the corpus, then L2-normalized so dot product is cosine similarity.
+    """
+
+    def __init__(self, dim: int = 1024):
+        self.dim = dim
+        self.idf = None  # numpy array, set by fit() or load_state()
+
+    @property
+    def name(self) -> str:
+        return f"hashing-tfidf-{self.dim}"
+
+    def _features(self, text: str) -> Counter:
+        tokens = tokenize(text)
+        return Counter(tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])])
+
+    def fit(self, texts: Sequence[str]):
+        import numpy as np
+
+        df = np.zeros(self.dim, dtype=np.float32)
+        for text in texts:
+            buckets = {_feature_slot(f, self.dim)[0] for f in self._features(text)}
+            df[list(buckets)] += 1
+        self.idf = np.log((1 + len(texts)) / (1 + df)).astype(np.float32) + 1.0
+        return self
+
+    def embed(self, texts: Sequence[str]):
+        import numpy as np
+
+        if self.idf is None:
+            raise RuntimeError("HashingEmbedder must be fit() or loaded before embedding")
+
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature, tf in self._features(text).items():
+                bucket, sign = _feature_slot(feature, self.dim)
+                vectors[row, bucket] += sign * (1.0 + math.log(tf))
+        vectors *= self.idf
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.divide(vectors, norms, out=vectors, where=norms > 0)
+        return vectors
+
+    def state(self) -> dict:
+        return {"dim": self.dim, "idf": [round(float(v), 6) for v in self.idf]}
+
+    def load_state(self, state: dict):
+        import numpy as np
+
+        self.dim = state["dim"]
+        self.idf = np.asarray(state["idf"], dtype=np.float32)
+
+
+class SentenceTransformerEmbedder:
+    """Wraps a locally stored sentence-transformers model (CPU, normalized output)."""
+
+    def __init__(self, model_path: str):
+        from sentence_transformers import SentenceTransformer
+
+        self.model_path = model_path
+        self.model = SentenceTransformer(model_path, device="cpu")
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+    @property
+    def name(self) -> str:
+        return f"sentence-transformers:{os.path.basename(os.path.normpath(self.model_path))}"
+
+    def fit(self, texts: Sequence[str]):
+        return self
+
+    def embed(self, texts: Sequence[str]):
+        import numpy as np
+
+        return np.asarray(
+            self.model.encode(list(texts), normalize_embeddings=True, show_progress_bar=False),
+            dtype=np.float32
+        )
+
+    def state(self) -> dict:
+        return {"dim": self.dim}
+
+    def load_state(self, state: dict):
+        pass
+
+
+def get_embedder():
+    """
+    Pick the embedder for vector retrieval. A sentence-transformers model is
+    used only if RAG_EMBEDDING_MODEL names an existing local directory and
+    the package is installed; otherwise fall back to HashingEmbedder.
+    """
+    model_path = os.getenv("RAG_EMBEDDING_MODEL", "")
+    if model_path and os.path.isdir(model_path):
+        try:
+            return SentenceTransformerEmbedder(model_path)
+        except ImportError:
+            print("⚠️ sentence-transformers not installed — using hashing embedder")
+    return HashingEmbedder()
+
+
+# ─── Index ───────────────────────────────────────────
+
+class VectorIndex:
+    """
+    Row-normalized embedding matrix with cosine top-k search.
+    Row i is document i, matching BM25Index doc ids.
+    """
+
+    def __init__(self, vectors, embedder, metadata: dict):
+        self.vectors = vectors
+        self.embedder = embedder
+        self.metadata = metadata
+
+    def __len__(self) -> int:
+        return self.vectors.shape[0]
+
+    def search(
+        self,
+        query: str,
+        top_k: int = 3,
+        doc_filter: Optional[Callable[[int], bool]] = None
+    ) -> list[tuple[float, int]]:
+        """Return the top_k (cosine score, doc_id) pairs, best first."""
+        import numpy as np
+
+        if len(self) == 0:
+            return []
+
+        query_vec = self.embedder.embed([query])[0]
+        scores = self.vectors @ query_vec
+        if doc_filter is not None:
+            allowed = np.fromiter((doc_filter(i) for i in range(len(scores))), dtype=bool, count=len(scores))
+            scores = np.where(allowed, scores, -np.inf)
+
+        k = min(top_k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        # Ties broken by document order so results are deterministic
+        top = sorted(top, key=lambda i: (-scores[i], i))
+        return [(float(scores[i]), int(i)) for i in top if scores[i] > 0]
+
+
+def corpus_key(texts: Sequence[str], embedder_name: str) -> str:
+    """Content key for an index: changes when any chunk or the embedder changes."""
+    digest = hashlib.sha256(embedder_name.encode("utf-8"))
+    for text in texts:
+        digest.update(b"\x00" + text.encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def save_vector_index(index_dir: str, key: str, vectors, embedder):
+    """
+    Write vectors-<key>.npy and vectors-<key>.json atomically. Files are
+    keyed by corpus content, so concurrent builders never overwrite an index
+    another process has mapped.
+    """
+    import numpy as np
+
+    os.makedirs(index_dir, exist_ok=True)
+    base = os.path.join(index_dir, f"vectors-{key}")
+    tmp_suffix = f".tmp{os.getpid()}"
+
+    with open(base + ".npy" + tmp_suffix, "wb") as f:
+        np.save(f, np.ascontiguousarray(vectors, dtype=np.float32))
+    os.replace(base + ".npy" + tmp_suffix, base + ".npy")
+
+    metadata = {
+        "key": key,
+        "embedder": embedder.name,
+        "count": int(vectors.shape[0]),
+        "dim": int(vectors.shape[1]) if vectors.ndim == 2 else 0,
+        "embedder_state": embedder.state(),
+    }
+    with open(base + ".json" + tmp_suffix, "w", encoding="utf-8") as f:
+        json.dump(metadata, f)
+    os.replace(base + ".json" + tmp_suffix, base + ".json")
+
+
+def load_vector_index(index_dir: str, key: str, embedder) -> Optional[VectorIndex]:
+    """Memory-map a persisted index, or return None if it is missing or stale."""
+    import numpy as np
+
+    base = os.path.join(index_dir, f"vectors-{key}")
+    try:
+        with open(base + ".json", "r", encoding="utf-8") as f:
+            metadata = json.load(f)
+        vectors = np.load(base + ".npy", mmap_mode="r")
+    except (OSError, ValueError):
+        return None
+
+    if metadata.get("embedder") != embedder.name or vectors.shape[0] != metadata.get("count"):
+        return None
+
+    embedder.load_state(metadata["embedder_state"])
+    return VectorIndex(vectors, embedder, metadata)
+
+
+def load_or_build_vector_index(texts: Sequence[str], embedder=None, index_dir: Optional[str] = None) -> VectorIndex:
+    """Map the persisted index for this corpus, embedding and saving it first if needed."""
+    embedder = embedder or get_embedder()
+    index_dir = index_dir or get_index_dir()
+    key = corpus_key(texts, embedder.name)
+
+    index = load_vector_index(index_dir, key, embedder)
+    if index is None:
+        vectors = embedder.fit(texts).embed(texts)
+        try:
+            save_vector_index(index_dir, key, vectors, embedder)
+            index = load_vector_index(index_dir, key, embedder)
+        except OSError as e:
+            print(f"⚠️ Could not persist vector index to {index_dir}: {e}")
+        if index is None:
+            index = VectorIndex(vectors, embedder, {"key": key, "embedder": embedder.name, "count": len(texts)})
+    return index
@@ -0,0 +1,203 @@
+"""
+InsureOps AI — Reference Data Repository
+Process-wide, change-aware cache for the JSON reference files in agents/data.
+Each file is parsed once and served as an immutable view; it is re-parsed only
+when its mtime/size changes AND its content hash differs from the cached copy.
+File stats are re-checked at most once per check_interval seconds.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Optional
+
+from agents.base_agent import get_data_path
+
+
+# ─── Immutable Views ─────────────────────────────────
+
+class FrozenDict(dict):
+    """
+    Read-only dict. Subclasses dict so json.dumps, pydantic and isinstance
+    checks keep working, but every mutating method raises TypeError.
+    """
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("Reference data is read-only — copy it before modifying")
+
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+    __ior__ = _readonly
+
+    def __hash__(self):
+        return hash(tuple(sorted(self.items())))
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+
+def freeze(value: Any) -> Any:
+    """Recursively convert dicts to FrozenDict and lists to tuples."""
+    if isinstance(value, dict):
+        return FrozenDict((k, freeze(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Return a fully mutable deep copy of a frozen value."""
+    if isinstance(value, dict):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [thaw(v) for v in value]
+    return value
+
+
+# ─── Repository ──────────────────────────────────────
+
+class _CacheEntry:
+    __slots__ = ("stat_key", "digest", "data", "version", "checked_at")
+
+    def __init__(self, stat_key: tuple, digest: str, data: Any, version: int):
+        self.stat_key = stat_key
+        self.checked_at = time.monotonic()
+        self.digest = digest
+        self.data = data
+        self.version = version
+
+
+class DataRepository:
+    """
+    Thread-safe cache of parsed reference data files.
+
+    Usage:
+        repo = get_data_repository()
+        guidelines = repo.get("underwriting_guidelines.json")  # FrozenDict
+        repo.stats()  # {"hits": ..., "misses": ..., "reloads": ..., ...}
+    """
+
+    def __init__(self, base_dir: Optional[str] = None, check_interval: Optional[float] = None):
+        self.base_dir = base_dir
+        if check_interval is None:
+            check_interval = float(os.getenv("DATA_REPOSITORY_CHECK_INTERVAL", "1.0"))
+        self.check_interval = check_interval
+        self._entries: dict[str, _CacheEntry] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._reloads = 0
+        self._revalidations = 0
+
+    def _resolve(self, filename: str) -> str:
+        if self.base_dir:
+            return os.path.join(self.base_dir, filename)
+        return get_data_path(filename)
+
+    def get(self, filename: str) -> Any:
+        """Return the frozen, parsed contents of a data file."""
+        return self._get_entry(filename).data
+
+    def version(self, filename: str) -> int:
+        """
+        Monotonic version of a file's parsed contents. Increments on every
+        reload, so derived structures can tell when to rebuild.
+        """
+        return self._get_entry(filename).version
+
+    def _get_entry(self, filename: str) -> _CacheEntry:
+        entry = self._entries.get(filename)
+        now = time.monotonic()
+        if entry is not None and now - entry.checked_at < self.check_interval:
+            # No file I/O on this path; the lock only keeps the counter exact under thread pools
+            with self._lock:
+                self._hits += 1
+            return entry
+
+        filepath = self._resolve(filename)
+        st = os.stat(filepath)
+        stat_key = (st.st_mtime_ns, st.st_size)
+
+        with self._lock:
+            entry = self._entries.get(filename)
+            if entry is not None and entry.stat_key == stat_key:
+                entry.checked_at = now
+                self._hits += 1
+                return entry
+
+            with open(filepath, "rb") as f:
+                raw = f.read()
+            digest = hashlib.sha256(raw).hexdigest()
+
+            if entry is not None and entry.digest == digest:
+                # File was touched but its content is unchanged
+                entry.stat_key = stat_key
+                entry.checked_at = now
+                self._revalidations += 1
+                self._hits += 1
+                return entry
+
+            data = freeze(json.loads(raw.decode("utf-8")))
+            if entry is None:
+                self._misses += 1
+                version = 1
+            else:
+                self._reloads += 1
+                version = entry.version + 1
+
+            entry = _CacheEntry(stat_key, digest, data, version)
+            self._entries[filename] = entry
+            return entry
+
+    def invalidate(self, filename: Optional[str] = None):
+        """Drop one cached file (or all of them) so the next get() re-parses."""
+        with self._lock:
+            if filename is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(filename, None)
+
+    def stats(self) -> dict:
+        """Return hit/miss/reload counters and the set of cached files."""
+        with self._lock:
+            lookups = self._hits + self._misses + self._reloads
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "reloads": self._reloads,
+                "revalidations": self._revalidations,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "cached_files": sorted(self._entries.keys()),
+            }
+
+    def reset_stats(self):
+        """Zero the counters without dropping cached data."""
+        with self._lock:
+            self._hits = self._misses = self._reloads = self._revalidations = 0
+
+
+# Singleton instance
+_repository = None
+_repository_lock = threading.Lock()
+
+def get_data_repository() -> DataRepository:
+    """Get or create the process-wide DataRepository."""
+    global _repository
+    if _repository is None:
+        with _repository_lock:
+            if _repository is None:
+                _repository = DataRepository()
+    return _repository
+
+
+def load_reference_data(filename: str) -> Any:
+    """Cached, read-only equivalent of load_json_data for tool lookups."""
+    return get_data_repository().get(filename)
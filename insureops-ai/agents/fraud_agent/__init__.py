@@ -1,5 +1,5 @@
 """Fraud Detection Agent — __init__.py"""
 
-from agents.fraud_agent.agent import run_fraud_agent
+from agents.fraud_agent.agent import run_fraud_agent, arun_fraud_agent, run_fraud_agent_batch
 
-__all__ = ['run_fraud_agent']
+__all__ = ['run_fraud_agent', 'arun_fraud_agent', 'run_fraud_agent_batch']
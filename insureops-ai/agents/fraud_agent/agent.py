@@ -12,20 +12,26 @@ A multi-step agent that analyzes claims for fraud using:
 import json
 import os
 import random
-import time
-from typing import TypedDict, Optional
+from typing import TYPE_CHECKING, Iterable, Iterator, TypedDict, Optional
 from dotenv import load_dotenv
 
 from agents.base_agent import (
     TraceRecord, LLMCallRecord, ToolCallRecord, GuardrailResult,
-    DecisionRecord, Timer, calculate_cost, calculate_prompt_quality,
-    send_telemetry_to_backend, load_json_data
+    DecisionRecord, load_json_data, parse_llm_json
 )
+from agents.llm_gateway import get_llm_gateway
+from agents.model_cascade import arun_cascade, record_escalated_hops, resolve_cascade, run_cascade
+from agents.prompt_builder import BuiltPrompt, ToolSection, build_prompt
+from agents.tokenizer import count_tokens
+from agents.workflow import AgentWorkflow, WorkflowStep, LLMStepSpec, provisional_decision_recorder
 from agents.fraud_agent.tools import (
     duplicate_checker, pattern_analyzer, claimant_history_lookup
 )
 from agents.fraud_agent.prompts import FRAUD_SYSTEM_PROMPT, FRAUD_ANALYSIS_PROMPT
 
+if TYPE_CHECKING:
+    from agents.batch_runner import BatchResult
+
 load_dotenv(os.path.join(os.path.dirname(__file__), '..', '..', '.env'))
 
 
@@ -38,63 +44,48 @@ class FraudState(TypedDict):
     history_data: Optional[dict]
     llm_analysis: Optional[dict]
     guardrail_results: list
+    provisional_decision: Optional[dict]
     decision: Optional[dict]
     trace: Optional[TraceRecord]
 
 
 # ─── LLM Wrapper ────────────────────────────────────
 
-def call_llm(prompt: str, system_prompt: str = "", model: str = None) -> tuple[str, LLMCallRecord]:
-    """Call LLM via OpenRouter (OpenAI-compatible API) or simulation fallback."""
-    api_key = os.getenv("OPENROUTER_API_KEY", "")
-    model = model or os.getenv("OPENROUTER_MODEL", "openai/gpt-4o-mini")
-
-    with Timer() as timer:
-        if api_key and api_key != "your_openrouter_api_key_here":
-            try:
-                from openai import OpenAI
-
-                client = OpenAI(
-                    base_url="https://openrouter.ai/api/v1",
-                    api_key=api_key
-                )
-
-                messages = []
-                if system_prompt:
-                    messages.append({"role": "system", "content": system_prompt})
-                messages.append({"role": "user", "content": prompt})
-
-                response = client.chat.completions.create(
-                    model=model, messages=messages, temperature=0.1,
-                    response_format={"type": "json_object"}
-                )
-
-                response_text = response.choices[0].message.content
-                prompt_tokens = response.usage.prompt_tokens if response.usage else len(prompt.split()) * 2
-                completion_tokens = response.usage.completion_tokens if response.usage else len(response_text.split()) * 2
-            except Exception as e:
-                print(f"⚠️ LLM call failed, using simulation: {e}")
-                response_text, prompt_tokens, completion_tokens = _simulate_llm_response(prompt)
-        else:
-            response_text, prompt_tokens, completion_tokens = _simulate_llm_response(prompt)
-
-    cost = calculate_cost(prompt_tokens, completion_tokens, model)
-    quality = calculate_prompt_quality(prompt)
-
-    record = LLMCallRecord(
-        model=model, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens,
-        latency_ms=timer.elapsed_ms, cost_usd=cost, status="success",
-        prompt_quality=quality, prompt_text=prompt[:500], response_text=response_text[:500]
+LLM_TEMPERATURE = 0.1
+SIMULATED_LATENCY = (0.5, 1.8)  # seconds, simulation mode only (unless LLM_SIM_LATENCY is set)
+
+
+def call_llm(prompt: str, system_prompt: str = "", model: str = None,
+             on_decision=None) -> tuple[str, LLMCallRecord]:
+    """Call LLM via the shared gateway (OpenRouter) or simulation fallback."""
+    return get_llm_gateway().complete(
+        prompt, system_prompt,
+        model=model,
+        temperature=LLM_TEMPERATURE,
+        simulator=_simulate_llm_response,
+        simulated_latency=SIMULATED_LATENCY,
+        on_decision=on_decision
     )
-    return response_text, record
 
 
-def _simulate_llm_response(prompt: str) -> tuple[str, int, int]:
-    """Simulate fraud detection LLM response."""
-    time.sleep(random.uniform(0.5, 1.8))
+async def acall_llm(prompt: str, system_prompt: str = "", model: str = None,
+                    on_decision=None) -> tuple[str, LLMCallRecord]:
+    """Async call_llm — awaits the LLM (or simulated latency) without blocking the event loop."""
+    return await get_llm_gateway().acomplete(
+        prompt, system_prompt,
+        model=model,
+        temperature=LLM_TEMPERATURE,
+        simulator=_simulate_llm_response,
+        simulated_latency=SIMULATED_LATENCY,
+        on_decision=on_decision
+    )
+
 
-    prompt_tokens = len(prompt.split()) * 2
-    completion_tokens = random.randint(200, 500)
+def _simulate_llm_response(prompt: str, rng: Optional[random.Random] = None) -> tuple[str, int, int]:
+    """Simulate fraud detection LLM response."""
+    rng = rng or random.Random()
+    prompt_tokens = count_tokens(prompt)
+    completion_tokens = rng.randint(200, 500)
     prompt_lower = prompt.lower()
 
     # Check for strong fraud indicators
@@ -104,22 +95,22 @@ def _simulate_llm_response(prompt: str) -> tuple[str, int, int]:
 
     if fraud_count >= 2 or "critical" in prompt_lower:
         decision = "escalated"
-        confidence = round(random.uniform(0.85, 0.95), 2)
-        fraud_prob = round(random.uniform(0.75, 0.95), 2)
+        confidence = round(rng.uniform(0.85, 0.95), 2)
+        fraud_prob = round(rng.uniform(0.75, 0.95), 2)
         reasoning = "Strong fraud indicators detected. Multiple suspicious patterns match known fraud schemes. Recommending full SIU investigation."
         action = "investigation_required"
         priority = "critical"
     elif fraud_count >= 1 or "high" in prompt_lower or "pre_flagged" in prompt_lower:
         decision = "flagged"
-        confidence = round(random.uniform(0.70, 0.85), 2)
-        fraud_prob = round(random.uniform(0.45, 0.70), 2)
+        confidence = round(rng.uniform(0.70, 0.85), 2)
+        fraud_prob = round(rng.uniform(0.45, 0.70), 2)
         reasoning = "Some suspicious patterns detected. Claim requires closer review to rule out fraudulent activity."
         action = "flag"
         priority = "high"
     else:
         decision = "approved"
-        confidence = round(random.uniform(0.80, 0.95), 2)
-        fraud_prob = round(random.uniform(0.05, 0.20), 2)
+        confidence = round(rng.uniform(0.80, 0.95), 2)
+        fraud_prob = round(rng.uniform(0.05, 0.20), 2)
         reasoning = "No significant fraud indicators detected. Claim appears legitimate based on available data."
         action = "clear"
         priority = "low"
@@ -156,40 +147,52 @@ def step_pattern_analysis(state: FraudState) -> FraudState:
 def step_claimant_history(state: FraudState) -> FraudState:
     """Step 3: Look up claimant history."""
     claimant_id = state["claim_data"].get("claimant_id", "UNKNOWN")
-    history_data, record = claimant_history_lookup(claimant_id)
+    history_data, record = claimant_history_lookup(
+        claimant_id, as_of=state["claim_data"].get("date_of_incident")
+    )
     state["history_data"] = history_data
     state["trace"].tool_calls.append(record)
     return state
 
 
-def step_llm_analysis(state: FraudState) -> FraudState:
-    """Step 4: LLM performs comprehensive fraud analysis."""
-    claim = state["claim_data"]
+# Tool result fields in the order they matter to the analysis (see prompt_builder.py)
+DUPLICATE_FIELD_PRIORITY = (
+    "risk_level", "recommendation", "exact_duplicates_found", "similar_claims_found", "similar_claims"
+)
+PATTERN_FIELD_PRIORITY = (
+    "fraud_risk", "fraud_probability", "flags_found", "severity_score", "flags", "recommendation"
+)
+HISTORY_FIELD_PRIORITY = (
+    "frequency_risk", "previous_fraud_flags", "total_claims", "total_amount_claimed", "velocity",
+    "recommendation", "claim_types", "claimant_id", "claims_summary"
+)
 
-    prompt = FRAUD_ANALYSIS_PROMPT.format(
-        claim_id=claim.get("id", "N/A"),
-        claim_type=claim.get("claim_type", "N/A"),
-        description=claim.get("description", "N/A"),
-        amount=claim.get("amount", 0),
-        policy_id=claim.get("policy_id", "N/A"),
-        date_of_incident=claim.get("date_of_incident", "N/A"),
-        fraud_indicators="Yes — Pre-flagged" if claim.get("fraud_indicators") else "No",
-        duplicate_check_result=json.dumps(state.get("duplicate_data", {}), indent=2)[:400],
-        pattern_analysis_result=json.dumps(state.get("pattern_data", {}), indent=2)[:400],
-        claimant_history_result=json.dumps(state.get("history_data", {}), indent=2)[:400]
-    )
 
-    response_text, llm_record = call_llm(prompt, FRAUD_SYSTEM_PROMPT)
+def _build_analysis_prompt(state: FraudState) -> BuiltPrompt:
+    """Format the analysis prompt, fitting each tool result to its token budget."""
+    claim = state["claim_data"]
+
+    return build_prompt(FRAUD_ANALYSIS_PROMPT, {
+        "claim_id": claim.get("id", "N/A"),
+        "claim_type": claim.get("claim_type", "N/A"),
+        "description": claim.get("description", "N/A"),
+        "amount": claim.get("amount", 0),
+        "policy_id": claim.get("policy_id", "N/A"),
+        "date_of_incident": claim.get("date_of_incident", "N/A"),
+        "fraud_indicators": "Yes — Pre-flagged" if claim.get("fraud_indicators") else "No",
+    }, [
+        ToolSection("duplicate_check_result", state.get("duplicate_data"), 100, DUPLICATE_FIELD_PRIORITY),
+        ToolSection("pattern_analysis_result", state.get("pattern_data"), 160, PATTERN_FIELD_PRIORITY),
+        ToolSection("claimant_history_result", state.get("history_data"), 120, HISTORY_FIELD_PRIORITY),
+    ], system_prompt=FRAUD_SYSTEM_PROMPT)
+
+
+def _apply_analysis(state: FraudState, response_text: str, llm_record: LLMCallRecord) -> FraudState:
+    """Record the LLM call and parse its JSON analysis into state."""
     state["trace"].llm_calls.append(llm_record)
 
-    try:
-        json_match = response_text
-        if "```json" in response_text:
-            json_match = response_text.split("```json")[1].split("```")[0]
-        elif "```" in response_text:
-            json_match = response_text.split("```")[1].split("```")[0]
-        analysis = json.loads(json_match.strip())
-    except (json.JSONDecodeError, IndexError):
+    analysis = parse_llm_json(response_text)
+    if analysis is None:
         analysis = {
             "decision": "escalated", "confidence": 0.60, "fraud_probability": 0.50,
             "reasoning": "Unable to parse LLM response. Escalating for manual review.",
@@ -201,10 +204,35 @@ def step_llm_analysis(state: FraudState) -> FraudState:
     return state
 
 
-def step_guardrails(state: FraudState) -> FraudState:
-    """Step 5: Run compliance and safety guardrails."""
-    analysis = state.get("llm_analysis", {})
-    state["guardrail_results"] = []
+def step_llm_analysis(state: FraudState) -> FraudState:
+    """Step 4: LLM performs comprehensive fraud analysis (via the model cascade)."""
+    prompt = _build_analysis_prompt(state)
+    response_text, hops = run_cascade(
+        resolve_cascade("fraud"),
+        lambda model: call_llm(prompt.text, FRAUD_SYSTEM_PROMPT, model,
+                               on_decision=provisional_decision_recorder(state)),
+        lambda analysis: check_guardrails(state["claim_data"], analysis)
+    )
+    llm_record = record_escalated_hops(state["trace"], hops, prompt.tokens_saved)
+    return _apply_analysis(state, response_text, llm_record)
+
+
+async def astep_llm_analysis(state: FraudState) -> FraudState:
+    """Async step_llm_analysis: awaits the LLM call."""
+    prompt = _build_analysis_prompt(state)
+    response_text, hops = await arun_cascade(
+        resolve_cascade("fraud"),
+        lambda model: acall_llm(prompt.text, FRAUD_SYSTEM_PROMPT, model,
+                                on_decision=provisional_decision_recorder(state)),
+        lambda analysis: check_guardrails(state["claim_data"], analysis)
+    )
+    llm_record = record_escalated_hops(state["trace"], hops, prompt.tokens_saved)
+    return _apply_analysis(state, response_text, llm_record)
+
+
+def check_guardrails(claim: dict, analysis: dict) -> list[GuardrailResult]:
+    """Compliance, safety and PII checks on an LLM analysis (also used by the model cascade)."""
+    results = []
 
     # Compliance check — ensure fair investigation procedures
     compliance_passed = True
@@ -213,27 +241,31 @@ def step_guardrails(state: FraudState) -> FraudState:
         compliance_passed = False
         compliance_detail = "Low-confidence fraud flag — ensure sufficient evidence before SIU referral"
 
-    state["guardrail_results"].append(GuardrailResult(
+    results.append(GuardrailResult(
         check_type="compliance", passed=compliance_passed, details=compliance_detail
     ))
-    state["trace"].guardrails.append(state["guardrail_results"][-1])
 
     # Safety check
-    state["guardrail_results"].append(GuardrailResult(
+    results.append(GuardrailResult(
         check_type="safety", passed=True,
         details="No safety concerns in fraud assessment"
     ))
-    state["trace"].guardrails.append(state["guardrail_results"][-1])
 
     # PII check
-    description = state["claim_data"].get("description", "")
+    description = claim.get("description", "")
     has_pii = any(t in description.lower() for t in ["ssn", "social security", "credit card"])
-    state["guardrail_results"].append(GuardrailResult(
+    results.append(GuardrailResult(
         check_type="pii", passed=not has_pii,
         details="No PII detected" if not has_pii else "PII detected — redaction required"
     ))
-    state["trace"].guardrails.append(state["guardrail_results"][-1])
 
+    return results
+
+
+def step_guardrails(state: FraudState) -> FraudState:
+    """Step 5: Run compliance and safety guardrails."""
+    state["guardrail_results"] = check_guardrails(state["claim_data"], state.get("llm_analysis", {}))
+    state["trace"].guardrails.extend(state["guardrail_results"])
     return state
 
 
@@ -282,61 +314,101 @@ def step_finalize(state: FraudState) -> FraudState:
 
 # ─── Main Agent Runner ──────────────────────────────
 
-def run_fraud_agent(claim_data: dict, send_telemetry: bool = True) -> dict:
-    """Run the Fraud Detection Agent on a single claim."""
+def _initial_state(claim_data: dict) -> FraudState:
+    return {
+        "claim_data": claim_data, "duplicate_data": None,
+        "pattern_data": None, "history_data": None,
+        "llm_analysis": None, "guardrail_results": [],
+        "provisional_decision": None, "decision": None,
+        "trace": TraceRecord(agent_type="fraud")
+    }
+
+
+def _print_header(claim_data: dict):
     print(f"\n🔎 Fraud Agent — Analyzing claim: {claim_data.get('id', 'N/A')}")
     print(f"   Type: {claim_data.get('claim_type', 'N/A')}")
     print(f"   Amount: ${claim_data.get('amount', 0):,.2f}")
     print(f"   Pre-flagged: {'Yes ⚠️' if claim_data.get('fraud_indicators') else 'No'}")
 
-    trace = TraceRecord(agent_type="fraud")
-    state: FraudState = {
-        "claim_data": claim_data, "duplicate_data": None,
-        "pattern_data": None, "history_data": None,
-        "llm_analysis": None, "guardrail_results": [], "decision": None,
-        "trace": trace
-    }
-
-    steps = [
-        ("Duplicate Check", step_duplicate_check),
-        ("Pattern Analysis", step_pattern_analysis),
-        ("Claimant History Lookup", step_claimant_history),
-        ("LLM Fraud Analysis", step_llm_analysis),
-        ("Guardrail Checks", step_guardrails),
-        ("Finalize Assessment", step_finalize),
-    ]
-
-    for step_name, step_fn in steps:
-        try:
-            print(f"   → {step_name}...")
-            state = step_fn(state)
-        except Exception as e:
-            print(f"   ❌ Error in {step_name}: {e}")
-            trace.status = "error"
-            trace.output_data = {"error": str(e), "failed_step": step_name}
-            break
-
-    decision = state.get("decision", {})
-    print(f"\n   ✅ Decision: {decision.get('decision_type', 'N/A').upper()}")
-    print(f"   📊 Confidence: {decision.get('confidence', 0):.0%}")
-    print(f"   ⏱️  Latency: {trace.total_latency_ms}ms")
-    print(f"   💰 Cost: ${trace.total_cost_usd:.6f}")
-
-    if send_telemetry:
-        send_telemetry_to_backend(trace)
 
+def _build_result(state: FraudState) -> dict:
+    trace = state["trace"]
     return {
-        "trace_id": trace.trace_id, "decision": decision,
+        "trace_id": trace.trace_id, "decision": state.get("decision") or {},
         "trace": trace.model_dump(),
         "pattern_analysis": state.get("pattern_data", {}),
         "claimant_history": state.get("history_data", {})
     }
 
 
+FRAUD_WORKFLOW = AgentWorkflow(
+    "fraud",
+    (
+        WorkflowStep("Duplicate Check", step_duplicate_check,
+                     inputs=("claim_data",), outputs=("duplicate_data",)),
+        WorkflowStep("Pattern Analysis", step_pattern_analysis,
+                     inputs=("claim_data",), outputs=("pattern_data",)),
+        WorkflowStep("Claimant History Lookup", step_claimant_history,
+                     inputs=("claim_data",), outputs=("history_data",)),
+        WorkflowStep("LLM Fraud Analysis", step_llm_analysis, astep_llm_analysis),
+        WorkflowStep("Guardrail Checks", step_guardrails),
+        WorkflowStep("Finalize Assessment", step_finalize),
+    ),
+    initial_state=_initial_state,
+    build_result=_build_result,
+    llm=LLMStepSpec(
+        step_name="LLM Fraud Analysis",
+        system_prompt=FRAUD_SYSTEM_PROMPT,
+        temperature=LLM_TEMPERATURE,
+        build_prompt=_build_analysis_prompt,
+        apply_response=_apply_analysis,
+        simulator=_simulate_llm_response
+    )
+)
+
+
+def run_fraud_agent(claim_data: dict, send_telemetry: bool = True, verbose: bool = True) -> dict:
+    """Run the Fraud Detection Agent on a single claim."""
+    if verbose:
+        _print_header(claim_data)
+    state = FRAUD_WORKFLOW.execute(_initial_state(claim_data), send_telemetry, verbose)
+    return _build_result(state)
+
+
+async def arun_fraud_agent(claim_data: dict, send_telemetry: bool = True, verbose: bool = False) -> dict:
+    """Async run_fraud_agent — awaits the LLM call and telemetry."""
+    if verbose:
+        _print_header(claim_data)
+    state = await FRAUD_WORKFLOW.aexecute(_initial_state(claim_data), send_telemetry, verbose)
+    return _build_result(state)
+
+
+def run_fraud_agent_batch(
+    claims: Iterable[dict],
+    workers: int = 4,
+    mode: str = "thread",
+    send_telemetry: bool = False,
+    max_pending: Optional[int] = None
+) -> Iterator["BatchResult"]:
+    """
+    Run the agent over many claims on a thread or process pool, yielding
+    results as they complete (see agents.batch_runner.run_agent_batch).
+    """
+    from agents.batch_runner import run_agent_batch
+    return run_agent_batch("fraud", claims, workers, mode, send_telemetry, max_pending)
+
+
 if __name__ == "__main__":
-    claims = load_json_data("sample_claims.json")
-    # Test with a fraud-flagged claim (CLM-014 — suspicious fire)
-    fraud_claim = next((c for c in claims if c["id"] == "CLM-014"), claims[0])
-    result = run_fraud_agent(fraud_claim, send_telemetry=False)
-    print(f"\n📋 Full Result:")
-    print(json.dumps(result["decision"], indent=2))
+    import sys
+
+    # With arguments: JSONL batch mode (python -m agents.fraud_agent.agent --input records.jsonl --workers 8)
+    if len(sys.argv) > 1:
+        from agents.batch_runner import batch_main
+        batch_main("fraud")
+    else:
+        claims = load_json_data("sample_claims.json")
+        # Test with a fraud-flagged claim (CLM-014 — suspicious fire)
+        fraud_claim = next((c for c in claims if c["id"] == "CLM-014"), claims[0])
+        result = run_fraud_agent(fraud_claim, send_telemetry=False)
+        print(f"\n📋 Full Result:")
+        print(json.dumps(result["decision"], indent=2))
@@ -0,0 +1,153 @@
+"""
+Fraud Detection Agent — Indexed Claims Store
+In-memory claims database with a hash index on claimant_id and a per-claim_type
+sorted amount index, so duplicate_checker's "same type within 15% of the amount"
+band is a bisect range query instead of a full scan.
+"""
+
+import threading
+from bisect import bisect_left, bisect_right, insort
+from typing import Callable, Iterable, Optional
+
+from agents.data_repository import get_data_repository, freeze
+
+
+class ClaimsStore:
+    """
+    Claims keyed by id with secondary indexes.
+
+    Usage:
+        store = ClaimsStore(claims)
+        store.add_claim(new_claim)  # searchable immediately, no rebuild
+        store.by_claimant("CUST-101")
+        store.similar_amount("theft", 8000, tolerance=0.15)
+    """
+
+    def __init__(self, claims: Iterable[dict] = ()):
+        self._lock = threading.RLock()
+        self._claims: dict[str, dict] = {}
+        self._seq: dict[str, int] = {}  # insertion order — mirrors file order for ties
+        self._next_seq = 0
+        self._by_claimant: dict[str, list[str]] = {}
+        # claim_type -> sorted list of (amount, seq, claim_id)
+        self._by_type_amount: dict[str, list[tuple]] = {}
+        self._listeners: list[Callable[[Optional[dict], dict], None]] = []
+
+        for claim in claims:
+            self.add_claim(claim)
+
+    def __len__(self) -> int:
+        return len(self._claims)
+
+    def __contains__(self, claim_id: str) -> bool:
+        return claim_id in self._claims
+
+    def get(self, claim_id: str) -> Optional[dict]:
+        return self._claims.get(claim_id)
+
+    def all_claims(self) -> list[dict]:
+        """All claims in insertion order."""
+        with self._lock:
+            return sorted(self._claims.values(), key=lambda c: self._seq[c["id"]])
+
+    def subscribe(self, listener: Callable[[Optional[dict], dict], None]):
+        """Register a callback invoked as listener(old_claim, new_claim) on every write."""
+        self._listeners.append(listener)
+
+    # ─── Writes ──────────────────────────────────────
+
+    def add_claim(self, claim: dict) -> dict:
+        """
+        Insert a claim, or replace the existing claim with the same id.
+        Index maintenance is O(log n) plus the list insert for the amount index.
+        """
+        claim = freeze(claim)
+        claim_id = claim["id"]
+
+        with self._lock:
+            old = self._claims.get(claim_id)
+            if old is not None:
+                self._unindex(old)
+                seq = self._seq[claim_id]
+            else:
+                seq = self._next_seq
+                self._next_seq += 1
+                self._seq[claim_id] = seq
+
+            self._claims[claim_id] = claim
+            self._index(claim, seq)
+
+        for listener in self._listeners:
+            listener(old, claim)
+        return claim
+
+    def _index(self, claim: dict, seq: int):
+        claimant = claim.get("claimant_id")
+        if claimant is not None:
+            ids = self._by_claimant.setdefault(claimant, [])
+            insort(ids, claim["id"], key=self._seq.__getitem__)
+
+        amounts = self._by_type_amount.setdefault(claim.get("claim_type"), [])
+        insort(amounts, (claim.get("amount", 0), seq, claim["id"]))
+
+    def _unindex(self, claim: dict):
+        claimant = claim.get("claimant_id")
+        if claimant is not None:
+            ids = self._by_claimant.get(claimant, [])
+            if claim["id"] in ids:
+                ids.remove(claim["id"])
+
+        amounts = self._by_type_amount.get(claim.get("claim_type"), [])
+        entry = (claim.get("amount", 0), self._seq[claim["id"]], claim["id"])
+        idx = bisect_left(amounts, entry)
+        if idx < len(amounts) and amounts[idx] == entry:
+            del amounts[idx]
+
+    # ─── Queries ─────────────────────────────────────
+
+    def by_claimant(self, claimant_id: str) -> list[dict]:
+        """Claims filed by a claimant, in insertion order."""
+        with self._lock:
+            return [self._claims[cid] for cid in self._by_claimant.get(claimant_id, [])]
+
+    def similar_amount(self, claim_type: str, amount: float, tolerance: float = 0.15) -> list[dict]:
+        """
+        Claims of the same type whose amount is strictly within
+        amount * tolerance of the given amount, in insertion order.
+        """
+        band = amount * tolerance
+        if band <= 0:
+            return []
+
+        with self._lock:
+            amounts = self._by_type_amount.get(claim_type, [])
+            lo = bisect_right(amounts, (amount - band, float("inf")))
+            hi = bisect_left(amounts, (amount + band, -1))
+            # Re-apply the exact predicate to guard against float rounding at the edges
+            matches = [
+                entry for entry in amounts[max(lo - 1, 0):hi + 1]
+                if abs(entry[0] - amount) < band
+            ]
+            matches.sort(key=lambda e: e[1])
+            return [self._claims[cid] for _, _, cid in matches]
+
+    def sequence(self, claim_id: str) -> int:
+        return self._seq[claim_id]
+
+
+# Singleton instance — rebuilt when sample_claims.json changes on disk
+_store: Optional[ClaimsStore] = None
+_store_version = 0
+_store_lock = threading.Lock()
+
+def get_claims_store() -> ClaimsStore:
+    """Get or build the ClaimsStore seeded from sample_claims.json."""
+    global _store, _store_version
+    repo = get_data_repository()
+    version = repo.version("sample_claims.json")
+    if _store is None or version != _store_version:
+        with _store_lock:
+            if _store is None or version != _store_version:
+                _store = ClaimsStore(repo.get("sample_claims.json"))
+                _store_version = version
+    return _store
@@ -0,0 +1,190 @@
+"""
+Fraud Detection Agent — Claimant Feature Store
+Materialized per-claimant aggregates (claim counts, amounts, claim types,
+fraud flags, dated history for velocity windows) kept up to date from
+ClaimsStore write events, so claimant_history_lookup is an O(1) read.
+"""
+
+import threading
+from bisect import bisect_left, bisect_right, insort
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Iterable, Optional, Union
+
+from agents.fraud_agent.claims_store import ClaimsStore, get_claims_store
+
+
+# Velocity windows reported by claimant_history_lookup
+VELOCITY_WINDOWS_DAYS = {"last_90_days": 90, "last_year": 365}
+
+
+def _parse_date(value) -> Optional[date]:
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(str(value)[:10])
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class ClaimantAggregate:
+    """Running totals for one claimant."""
+    total_claims: int = 0
+    amount_sum: Decimal = Decimal(0)  # exact, so adding and removing claims never drifts
+    fraud_flagged: int = 0
+    claim_type_counts: dict = field(default_factory=dict)
+    # Sorted (incident_date, claim_id, amount) for windowed velocity queries
+    dated_claims: list = field(default_factory=list)
+
+    @property
+    def total_amount(self) -> float:
+        return float(self.amount_sum)
+
+    def apply(self, claim: dict, sign: int):
+        """Add (sign=+1) or remove (sign=-1) one claim's contribution."""
+        amount = claim.get("amount", 0)
+        claim_type = claim.get("claim_type", "")
+
+        self.total_claims += sign
+        self.amount_sum += sign * Decimal(str(amount))
+        if claim.get("fraud_indicators"):
+            self.fraud_flagged += sign
+
+        count = self.claim_type_counts.get(claim_type, 0) + sign
+        if count > 0:
+            self.claim_type_counts[claim_type] = count
+        else:
+            self.claim_type_counts.pop(claim_type, None)
+
+        incident = _parse_date(claim.get("date_of_incident"))
+        if incident is not None:
+            entry = (incident, claim["id"], amount)
+            if sign > 0:
+                insort(self.dated_claims, entry)
+            else:
+                idx = bisect_left(self.dated_claims, entry)
+                if idx < len(self.dated_claims) and self.dated_claims[idx] == entry:
+                    del self.dated_claims[idx]
+
+    def window(self, as_of: date, days: int) -> dict:
+        """Claim count and amount with incident dates in (as_of - days, as_of]."""
+        start = as_of - timedelta(days=days)
+        lo = bisect_right(self.dated_claims, (start, chr(0x10FFFF)))
+        hi = bisect_right(self.dated_claims, (as_of, chr(0x10FFFF)))
+        in_window = self.dated_claims[lo:hi]
+        return {
+            "claims": len(in_window),
+            "amount": sum(amount for _, _, amount in in_window),
+        }
+
+    def velocity(self, as_of: Union[str, date, None] = None) -> dict:
+        """window() for each VELOCITY_WINDOWS_DAYS window ending at as_of (default today)."""
+        as_of_date = _parse_date(as_of) or date.today()
+        return {name: self.window(as_of_date, days) for name, days in VELOCITY_WINDOWS_DAYS.items()}
+
+    def copy(self) -> "ClaimantAggregate":
+        return ClaimantAggregate(self.total_claims, self.amount_sum, self.fraud_flagged,
+                                 dict(self.claim_type_counts), list(self.dated_claims))
+
+
+class ClaimantFeatureStore:
+    """
+    Per-claimant aggregate table maintained incrementally from a ClaimsStore.
+
+    Usage:
+        features = ClaimantFeatureStore(get_claims_store())
+        features.get("CUST-101")             # snapshot of the claimant's aggregate
+        features.velocity("CUST-101", "2026-02-10")
+        features.verify()                    # [] when aggregates match raw claims
+    """
+
+    def __init__(self, claims_store: ClaimsStore):
+        self.claims_store = claims_store
+        self._lock = threading.Lock()
+        self._aggregates: dict[str, ClaimantAggregate] = {}
+
+        for claim in claims_store.all_claims():
+            self._on_claim_written(None, claim)
+        claims_store.subscribe(self._on_claim_written)
+
+    def _on_claim_written(self, old: Optional[dict], new: dict):
+        with self._lock:
+            if old is not None:
+                self._aggregate_for(old.get("claimant_id")).apply(old, -1)
+            self._aggregate_for(new.get("claimant_id")).apply(new, +1)
+
+    def _aggregate_for(self, claimant_id: str) -> ClaimantAggregate:
+        agg = self._aggregates.get(claimant_id)
+        if agg is None:
+            agg = self._aggregates[claimant_id] = ClaimantAggregate()
+        return agg
+
+    def get(self, claimant_id: str) -> ClaimantAggregate:
+        """
+        A consistent copy of a claimant's aggregate (empty if none on file),
+        taken under the lock so concurrent claim writes can't tear the read.
+        """
+        with self._lock:
+            agg = self._aggregates.get(claimant_id)
+            return agg.copy() if agg is not None else ClaimantAggregate()
+
+    def velocity(self, claimant_id: str, as_of: Union[str, date, None] = None) -> dict:
+        """Claim counts/amounts for each VELOCITY_WINDOWS_DAYS window ending at as_of."""
+        return self.get(claimant_id).velocity(as_of)
+
+    # ─── Consistency Check ───────────────────────────
+
+    def verify(self, raw_claims: Optional[Iterable[dict]] = None) -> list[dict]:
+        """
+        Recompute every aggregate from raw claims (default: the backing
+        ClaimsStore) and diff against the materialized table.
+        Returns a list of mismatches; empty means consistent.
+        """
+        if raw_claims is None:
+            raw_claims = self.claims_store.all_claims()
+
+        expected: dict[str, ClaimantAggregate] = {}
+        for claim in raw_claims:
+            claimant_id = claim.get("claimant_id")
+            agg = expected.get(claimant_id)
+            if agg is None:
+                agg = expected[claimant_id] = ClaimantAggregate()
+            agg.apply(claim, +1)
+
+        diffs = []
+        with self._lock:
+            claimant_ids = set(expected) | {
+                cid for cid, agg in self._aggregates.items() if agg.total_claims
+            }
+            for claimant_id in sorted(claimant_ids, key=str):
+                stored = self._aggregates.get(claimant_id) or ClaimantAggregate()
+                fresh = expected.get(claimant_id) or ClaimantAggregate()
+                for field_name in ("total_claims", "total_amount", "fraud_flagged",
+                                   "claim_type_counts", "dated_claims"):
+                    stored_value = getattr(stored, field_name)
+                    expected_value = getattr(fresh, field_name)
+                    if stored_value != expected_value:
+                        diffs.append({
+                            "claimant_id": claimant_id,
+                            "field": field_name,
+                            "stored": stored_value,
+                            "expected": expected_value,
+                        })
+        return diffs
+
+
+# Singleton instance — follows the shared ClaimsStore
+_feature_store: Optional[ClaimantFeatureStore] = None
+_feature_store_lock = threading.Lock()
+
+def get_feature_store() -> ClaimantFeatureStore:
+    """Get or build the ClaimantFeatureStore over the shared ClaimsStore."""
+    global _feature_store
+    claims_store = get_claims_store()
+    if _feature_store is None or _feature_store.claims_store is not claims_store:
+        with _feature_store_lock:
+            if _feature_store is None or _feature_store.claims_store is not claims_store:
+                _feature_store = ClaimantFeatureStore(claims_store)
+    return _feature_store
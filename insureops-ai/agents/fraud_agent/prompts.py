@@ -27,7 +27,23 @@ COMMON FRAUD PATTERNS TO CHECK:
 - Claims for items that are difficult to verify (cash, jewelry)
 - Suspicious timing (fires when property is vacant, theft when alarms are off)"""
 
-FRAUD_ANALYSIS_PROMPT = """Analyze the following insurance claim for potential fraud indicators.
+# Static instructions first and per-claim data last, so every call shares
+# the same prompt prefix (provider prompt caching)
+FRAUD_ANALYSIS_INSTRUCTIONS = """Analyze the following insurance claim for potential fraud indicators.
+
+Base your fraud assessment on the claim details and tool analysis results below, and respond in the following JSON format:
+{{
+    "decision": "approved" | "flagged" | "escalated",
+    "confidence": 0.0 to 1.0,
+    "fraud_probability": 0.0 to 1.0,
+    "reasoning": "Detailed explanation of the fraud assessment",
+    "risk_flags": ["list of specific fraud indicators found"],
+    "recommended_action": "clear" | "flag" | "investigation_required",
+    "investigation_priority": "low" | "medium" | "high" | "critical",
+    "compliance_notes": "any regulatory or legal notes"
+}}"""
+
+FRAUD_ANALYSIS_PROMPT = FRAUD_ANALYSIS_INSTRUCTIONS + """
 
 CLAIM DETAILS:
 - Claim ID: {claim_id}
@@ -41,16 +57,4 @@ CLAIM DETAILS:
 TOOL ANALYSIS RESULTS:
 - Duplicate Check: {duplicate_check_result}
 - Pattern Analysis: {pattern_analysis_result}
-- Claimant History: {claimant_history_result}
-
-Based on the above information, provide your fraud assessment in the following JSON format:
-{{
-    "decision": "approved" | "flagged" | "escalated",
-    "confidence": 0.0 to 1.0,
-    "fraud_probability": 0.0 to 1.0,
-    "reasoning": "Detailed explanation of the fraud assessment",
-    "risk_flags": ["list of specific fraud indicators found"],
-    "recommended_action": "clear" | "flag" | "investigation_required",
-    "investigation_priority": "low" | "medium" | "high" | "critical",
-    "compliance_notes": "any regulatory or legal notes"
-}}"""
+- Claimant History: {claimant_history_result}"""
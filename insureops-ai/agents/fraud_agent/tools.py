@@ -4,7 +4,10 @@ Deterministic tools: duplicate_checker, pattern_analyzer, claimant_history_looku
 """
 
 import random
-from agents.base_agent import load_json_data, ToolCallRecord, Timer
+from typing import Optional
+from agents.base_agent import ToolCallRecord, Timer
+from agents.fraud_agent.claims_store import get_claims_store
+from agents.fraud_agent.feature_store import get_feature_store
 
 
 def duplicate_checker(claim_data: dict) -> tuple[dict, ToolCallRecord]:
@@ -13,21 +16,27 @@ def duplicate_checker(claim_data: dict) -> tuple[dict, ToolCallRecord]:
     Simulates a cross-reference against existing claims database.
     """
     with Timer() as timer:
-        claims_db = load_json_data("sample_claims.json")
+        store = get_claims_store()
         current_id = claim_data.get("id", "")
         current_type = claim_data.get("claim_type", "")
         current_claimant = claim_data.get("claimant_id", "")
         current_amount = claim_data.get("amount", 0)
 
+        # Index lookups instead of a full scan; merge back into store order
+        same_claimant = store.by_claimant(current_claimant)
+        similar_amount = store.similar_amount(current_type, current_amount, tolerance=0.15)
+        same_claimant_ids = {c["id"] for c in same_claimant}
+        candidates = {c["id"]: c for c in similar_amount}
+        candidates.update((c["id"], c) for c in same_claimant)
+
         similar_claims = []
         exact_duplicates = []
 
-        for claim in claims_db:
+        for claim in sorted(candidates.values(), key=lambda c: store.sequence(c["id"])):
             if claim["id"] == current_id:
                 continue  # Skip self
 
-            # Check for same claimant
-            if claim.get("claimant_id") == current_claimant:
+            if claim["id"] in same_claimant_ids:
                 similar_claims.append({
                     "claim_id": claim["id"],
                     "match_type": "same_claimant",
@@ -35,10 +44,7 @@ def duplicate_checker(claim_data: dict) -> tuple[dict, ToolCallRecord]:
                     "amount": claim["amount"],
                     "similarity_score": 0.8
                 })
-
-            # Check for very similar descriptions and amounts
-            if (claim.get("claim_type") == current_type and
-                abs(claim.get("amount", 0) - current_amount) < current_amount * 0.15):
+            else:
                 similar_claims.append({
                     "claim_id": claim["id"],
                     "match_type": "similar_amount_and_type",
@@ -47,13 +53,8 @@ def duplicate_checker(claim_data: dict) -> tuple[dict, ToolCallRecord]:
                     "similarity_score": 0.6
                 })
 
-        # Deduplicate
-        seen = set()
-        unique_similar = []
-        for c in similar_claims:
-            if c["claim_id"] not in seen:
-                seen.add(c["claim_id"])
-                unique_similar.append(c)
+        # Candidates are keyed by claim id, so each claim appears once
+        unique_similar = similar_claims
 
         result = {
             "exact_duplicates_found": len(exact_duplicates),
@@ -168,20 +169,22 @@ def pattern_analyzer(claim_data: dict) -> tuple[dict, ToolCallRecord]:
     return result, record
 
 
-def claimant_history_lookup(claimant_id: str) -> tuple[dict, ToolCallRecord]:
+def claimant_history_lookup(claimant_id: str, as_of: Optional[str] = None) -> tuple[dict, ToolCallRecord]:
     """
     Look up the claimant's history across all claims in the system.
-    Checks claim frequency, total amounts, and patterns.
+    Checks claim frequency, total amounts, and patterns. Reads the
+    materialized per-claimant aggregates; velocity windows end at as_of
+    (the current claim's incident date, defaulting to today).
     """
     with Timer() as timer:
-        claims_db = load_json_data("sample_claims.json")
-
-        claimant_claims = [c for c in claims_db if c.get("claimant_id") == claimant_id]
+        features = get_feature_store()
+        aggregate = features.get(claimant_id)
 
-        total_claims = len(claimant_claims)
-        total_amount = sum(c.get("amount", 0) for c in claimant_claims)
-        claim_types = list(set(c.get("claim_type", "") for c in claimant_claims))
-        fraud_flagged = sum(1 for c in claimant_claims if c.get("fraud_indicators"))
+        total_claims = aggregate.total_claims
+        total_amount = aggregate.total_amount
+        claim_types = list(aggregate.claim_type_counts)
+        fraud_flagged = aggregate.fraud_flagged
+        velocity = aggregate.velocity(as_of)  # same snapshot as the totals above
 
         # Risk assessment
         if total_claims >= 4:
@@ -200,9 +203,10 @@ def claimant_history_lookup(claimant_id: str) -> tuple[dict, ToolCallRecord]:
             "claim_types": claim_types,
             "previous_fraud_flags": fraud_flagged,
             "frequency_risk": frequency_risk,
+            "velocity": velocity,
             "claims_summary": [
                 {"id": c["id"], "type": c["claim_type"], "amount": c["amount"]}
-                for c in claimant_claims[:5]
+                for c in features.claims_store.by_claimant(claimant_id)[:5]
             ],
             "recommendation": "investigate" if fraud_flagged > 0 or total_claims > 2 else "standard_review"
         }
@@ -20,6 +20,7 @@ class MetricsCollector:
         metrics.record_tokens(1842)
         metrics.record_decision("approved")
         metrics.increment("tool_calls", tags={"tool": "policy_lookup"})
+        metrics.record_gauge("llm_rate_limiter_in_flight", 12, tags={"model": "gpt-4o-mini"})
         
         batch = metrics.flush()  # Returns all collected metrics
     """
@@ -29,6 +30,7 @@ class MetricsCollector:
         self._metrics: List[MetricSchema] = []
         self._counters: Dict[str, float] = defaultdict(float)
         self._histograms: Dict[str, List[float]] = defaultdict(list)
+        self._gauges: Dict[str, float] = {}
 
     def record_latency(self, latency_ms: float, tags: Optional[Dict[str, str]] = None):
         """Record a latency measurement in milliseconds."""
@@ -109,6 +111,19 @@ class MetricsCollector:
             tags=tags or {},
         ))
 
+    def record_gauge(self, name: str, value: float, unit: str = "value", tags: Optional[Dict[str, str]] = None):
+        """Record the current value of a gauge (last value wins in the summary)."""
+        tags = tags or {}
+        key = name + "".join(f",{k}={v}" for k, v in sorted(tags.items()))
+        self._gauges[key] = float(value)
+        self._metrics.append(MetricSchema(
+            metric_name=name,
+            value=float(value),
+            unit=unit,
+            agent_type=self.agent_type,
+            tags=tags,
+        ))
+
     def get_percentiles(self, metric_name: str = "latency") -> Dict[str, float]:
         """Calculate P50, P95, P99 for histogram data."""
         values = sorted(self._histograms.get(metric_name, []))
@@ -130,6 +145,7 @@ class MetricsCollector:
         return {
             "agent_type": self.agent_type,
             "counters": dict(self._counters),
+            "gauges": dict(self._gauges),
             "latency_percentiles": self.get_percentiles("latency"),
             "total_metrics": len(self._metrics),
         }
@@ -0,0 +1,120 @@
+"""
+InsureOps AI — Incremental JSON Parser
+Parses a streamed JSON object one chunk at a time and reports each top-level
+field the moment its value is complete, so a caller can act on "decision"
+and "confidence" while the model is still writing "reasoning".
+
+Text before the first "{" (e.g. a ```json fence) and after the closing "}"
+is ignored.
+
+Usage:
+    parser = IncrementalJSONParser(on_field=lambda key, value: print(key, value))
+    for chunk in stream:
+        parser.feed(chunk)
+    parser.fields   # every top-level field completed so far
+"""
+
+import json
+from typing import Any, Callable, Optional
+
+
+class IncrementalJSONParser:
+    """Streaming parser for the top-level fields of one JSON object."""
+
+    def __init__(self, on_field: Optional[Callable[[str, Any], None]] = None):
+        self.on_field = on_field
+        self.fields: dict[str, Any] = {}
+        self.done = False
+        self._text = ""
+        self._pos = 0             # index of the next unread character
+        self._started = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._phase = "key"       # key, key_string, colon, value_wait, value, after_value
+        self._key: Optional[str] = None
+        self._key_start = 0
+        self._value_start = 0
+
+    @property
+    def text(self) -> str:
+        return self._text
+
+    def feed(self, chunk: str) -> dict[str, Any]:
+        """Consume a chunk; returns the fields completed by it."""
+        if self.done or not chunk:
+            return {}
+        self._text += chunk
+        text = self._text
+        completed = {}
+
+        while self._pos < len(text) and not self.done:
+            i, c = self._pos, text[self._pos]
+            self._pos += 1
+
+            if not self._started:
+                if c == "{":
+                    self._started, self._depth = True, 1
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._phase == "key_string":
+                        self._key = json.loads(text[self._key_start:i + 1])
+                        self._phase = "colon"
+                    elif self._depth == 1 and self._phase == "value":
+                        self._complete(text[self._value_start:i + 1], completed)
+                continue
+
+            if c.isspace():
+                continue
+
+            if self._depth == 1:
+                if self._phase == "key" and c == '"':
+                    self._in_string, self._key_start, self._phase = True, i, "key_string"
+                    continue
+                if self._phase == "colon" and c == ":":
+                    self._phase = "value_wait"
+                    continue
+                if self._phase == "value_wait":
+                    self._value_start, self._phase = i, "value"
+                    if c == '"':
+                        self._in_string = True
+                        continue
+                if c == "," and self._phase in ("value", "after_value"):
+                    if self._phase == "value":
+                        self._complete(text[self._value_start:i], completed)
+                    self._phase = "key"
+                    continue
+
+            if c == '"':
+                self._in_string = True
+            elif c in "{[":
+                self._depth += 1
+            elif c in "}]":
+                self._depth -= 1
+                if self._depth == 1 and self._phase == "value":
+                    # A nested object/array value just closed
+                    self._complete(text[self._value_start:i + 1], completed)
+                elif self._depth == 0:
+                    if self._phase == "value":
+                        self._complete(text[self._value_start:i], completed)
+                    self.done = True
+
+        return completed
+
+    def _complete(self, raw: str, completed: dict):
+        self._phase = "after_value"
+        try:
+            value = json.loads(raw)
+        except json.JSONDecodeError:
+            return
+        self.fields[self._key] = value
+        completed[self._key] = value
+        if self.on_field:
+            self.on_field(self._key, value)
@@ -0,0 +1,213 @@
+"""
+InsureOps AI — LLM Response Cache
+Caches real LLM responses keyed by (model, temperature, system prompt hash,
+prompt hash). An in-memory LRU with TTL sits in front of an optional SQLite
+tier (LLM_CACHE_PATH) that survives restarts.
+
+Cache modes:
+- use:     serve hits, store misses (default)
+- refresh: skip lookup, call the model, overwrite the cached response
+- bypass:  neither read nor write
+
+Usage:
+    with llm_cache_mode("refresh"):
+        run_claims_agent(claim)
+"""
+
+import contextlib
+import contextvars
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+
+CACHE_MODES = ("use", "refresh", "bypass")
+
+_mode_override: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("llm_cache_mode", default=None)
+
+
+class CachedResponse(NamedTuple):
+    response_text: str
+    prompt_tokens: int
+    completion_tokens: int
+    created_at: float
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def cache_key(model: str, temperature: float, system_prompt: str, prompt: str) -> str:
+    """Stable cache key for one chat completion request."""
+    return _sha256(json.dumps([model, temperature, _sha256(system_prompt or ""), _sha256(prompt)]))
+
+
+def _validate_mode(mode: str) -> str:
+    if mode not in CACHE_MODES:
+        raise ValueError(f"Unknown LLM cache mode '{mode}' (expected one of {CACHE_MODES})")
+    return mode
+
+
+@contextlib.contextmanager
+def llm_cache_mode(mode: str):
+    """Override the cache mode for LLM calls made inside this block (thread/task local)."""
+    token = _mode_override.set(_validate_mode(mode))
+    try:
+        yield
+    finally:
+        _mode_override.reset(token)
+
+
+def resolve_cache_mode(mode: Optional[str] = None) -> str:
+    """Explicit argument, then llm_cache_mode() block, then LLM_CACHE_MODE (default 'use')."""
+    return _validate_mode(mode or _mode_override.get() or os.getenv("LLM_CACHE_MODE", "use"))
+
+
+class LLMResponseCache:
+    """
+    Two-tier response cache: in-memory LRU, optionally backed by SQLite.
+
+    Usage:
+        cache = get_llm_cache()
+        key = cache_key(model, 0.2, system_prompt, prompt)
+        cache.get(key)            # CachedResponse or None
+        cache.put(key, text, prompt_tokens, completion_tokens)
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 86400.0, db_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.db_path = db_path
+        self._memory: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._lock = threading.RLock()
+        self._hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+
+        self._conn = None
+        if db_path:
+            self._conn = sqlite3.connect(db_path, check_same_thread=False)
+            if db_path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, response_text TEXT NOT NULL, prompt_tokens INTEGER, "
+                "completion_tokens INTEGER, created_at REAL NOT NULL) WITHOUT ROWID"
+            )
+            self._conn.commit()
+
+    def _expired(self, entry: CachedResponse, now: float) -> bool:
+        return now - entry.created_at > self.ttl_seconds
+
+    def _remember(self, key: str, entry: CachedResponse):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """Return a fresh cached response, or None."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if not self._expired(entry, now):
+                    self._memory.move_to_end(key)
+                    self._hits += 1
+                    return entry
+                del self._memory[key]
+
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT response_text, prompt_tokens, completion_tokens, created_at "
+                    "FROM llm_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    entry = CachedResponse(*row)
+                    if not self._expired(entry, now):
+                        self._remember(key, entry)
+                        self._hits += 1
+                        self._disk_hits += 1
+                        return entry
+                    self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                    self._conn.commit()
+
+            self._misses += 1
+            return None
+
+    def put(self, key: str, response_text: str, prompt_tokens: int, completion_tokens: int):
+        """Store a response in memory and, if configured, on disk."""
+        entry = CachedResponse(response_text, prompt_tokens, completion_tokens, time.time())
+        with self._lock:
+            self._remember(key, entry)
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache "
+                    "(key, response_text, prompt_tokens, completion_tokens, created_at) VALUES (?, ?, ?, ?, ?)",
+                    (key, *entry)
+                )
+                self._conn.commit()
+
+    def purge_expired(self) -> int:
+        """Drop expired entries from both tiers; returns how many disk rows were removed."""
+        now = time.time()
+        with self._lock:
+            for key in [k for k, e in self._memory.items() if self._expired(e, now)]:
+                del self._memory[key]
+            if self._conn is None:
+                return 0
+            removed = self._conn.execute(
+                "DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl_seconds,)
+            ).rowcount
+            self._conn.commit()
+            return removed
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM llm_cache")
+                self._conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "cached": len(self._memory),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "disk_tier": self.db_path,
+                "hits": self._hits,
+                "disk_hits": self._disk_hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+            }
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# Singleton instance
+_llm_cache = None
+_llm_cache_lock = threading.Lock()
+
+def get_llm_cache() -> LLMResponseCache:
+    """Get or create the process-wide LLMResponseCache."""
+    global _llm_cache
+    if _llm_cache is None:
+        with _llm_cache_lock:
+            if _llm_cache is None:
+                _llm_cache = LLMResponseCache(
+                    max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1024")),
+                    ttl_seconds=float(os.getenv("LLM_CACHE_TTL_SECONDS", "86400")),
+                    db_path=os.getenv("LLM_CACHE_PATH") or None
+                )
+    return _llm_cache
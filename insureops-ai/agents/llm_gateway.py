@@ -0,0 +1,587 @@
+"""
+InsureOps AI — LLM Gateway
+One shared, pooled OpenAI-compatible client for all agents. The HTTP client
+keeps connections alive between calls, so agents stop paying for client
+construction and a fresh TCP/TLS handshake on every LLM request.
+
+Model, endpoint, timeouts and pool limits are configured in one place
+(OPENROUTER_* / LLM_* environment variables); per-agent settings such as
+temperature are passed per call. complete() blocks; acomplete() is the
+asyncio variant used by the async agent runners. Real responses are served
+from / stored in the LLM response cache (see llm_cache.py).
+
+Real calls are admitted by the per-model rate limiter (RPM/TPM buckets and
+adaptive concurrency, see rate_limiter.py) and retried with jittered
+backoff. A call that still fails raises LLMRequestError — it is never
+silently replaced by a simulated response.
+
+With streaming on (LLM_STREAMING or stream=True) the response is consumed
+token by token and parsed incrementally; on_decision fires as soon as
+"decision" and "confidence" are complete, and the record carries
+time_to_first_token_ms / time_to_decision_ms.
+
+Prompt tokens the provider served from its prompt-prefix cache are read
+from usage.prompt_tokens_details.cached_tokens into cached_prompt_tokens
+and billed at the cached-input rate (see calculate_cost).
+
+Simulated calls (no API key) take their latency, RNG and any injected
+failure from the simulation backend (see llm_simulation.py); injected
+failures are retried with the same retry policy as real ones.
+"""
+
+import asyncio
+import os
+import random
+import threading
+import time
+import weakref
+from dataclasses import dataclass, replace
+from typing import Callable, Optional
+
+from agents.base_agent import LLMCallRecord, Timer, calculate_cost, calculate_prompt_quality
+from agents.json_stream import IncrementalJSONParser
+from agents.llm_cache import LLMResponseCache, cache_key, get_llm_cache, resolve_cache_mode
+from agents.llm_simulation import LatencyRange, LLMSimulation, SimulatedAPIError, get_llm_simulation
+from agents.tokenizer import count_tokens
+from agents.rate_limiter import (
+    RetryPolicy, estimate_tokens, error_status, get_rate_limiter, get_retry_policy,
+    is_retryable, retry_after_seconds
+)
+
+
+DEFAULT_BASE_URL = "https://openrouter.ai/api/v1"
+DEFAULT_MODEL = "openai/gpt-4o-mini"
+PLACEHOLDER_API_KEY = "your_openrouter_api_key_here"
+JSON_RESPONSE_FORMAT = {"type": "json_object"}
+COMPLETION_TOKEN_ESTIMATE = 500  # TPM budget reserved for the response until real usage is known
+OVERLOAD_STATUS_CODES = (429, 503)
+DECISION_KEYS = ("decision", "confidence")
+SIMULATED_STREAM_CHUNK = 64        # characters per simulated stream chunk
+SIMULATED_FIRST_TOKEN_SHARE = 0.3  # share of simulated latency before the first token
+
+# (prompt, rng) -> (response_text, prompt_tokens, completion_tokens)
+Simulator = Callable[[str, Optional[random.Random]], tuple[str, int, int]]
+# Called once with {"decision": ..., "confidence": ...}
+DecisionCallback = Callable[[dict], None]
+
+
+@dataclass(frozen=True)
+class LLMSettings:
+    """Endpoint, model and connection pool settings for the gateway."""
+    api_key: str = ""
+    base_url: str = DEFAULT_BASE_URL
+    model: str = DEFAULT_MODEL
+    connect_timeout: float = 5.0
+    read_timeout: float = 60.0
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    max_retries: int = 2
+    streaming: bool = False
+
+    @classmethod
+    def from_env(cls) -> "LLMSettings":
+        return cls(
+            api_key=os.getenv("OPENROUTER_API_KEY", ""),
+            base_url=os.getenv("OPENROUTER_BASE_URL") or DEFAULT_BASE_URL,
+            model=os.getenv("OPENROUTER_MODEL") or DEFAULT_MODEL,
+            connect_timeout=float(os.getenv("LLM_CONNECT_TIMEOUT", "5")),
+            read_timeout=float(os.getenv("LLM_READ_TIMEOUT", "60")),
+            max_connections=int(os.getenv("LLM_MAX_CONNECTIONS", "100")),
+            max_keepalive_connections=int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "20")),
+            keepalive_expiry=float(os.getenv("LLM_KEEPALIVE_EXPIRY", "30")),
+            max_retries=int(os.getenv("LLM_MAX_RETRIES", "2")),
+            streaming=os.getenv("LLM_STREAMING", "false").lower() in ("1", "true", "yes"),
+        )
+
+    @property
+    def has_api_key(self) -> bool:
+        return bool(self.api_key) and self.api_key != PLACEHOLDER_API_KEY
+
+
+class LLMRequestError(RuntimeError):
+    """A real LLM call failed (after retries, if the error was retryable)."""
+
+
+def cached_prompt_tokens(usage) -> int:
+    """Prompt tokens served from the provider's prefix cache; usage may be an SDK object or a dict."""
+    if not usage:
+        return 0
+    details = usage.get("prompt_tokens_details") if isinstance(usage, dict) else getattr(usage, "prompt_tokens_details", None)
+    if not details:
+        return 0
+    cached = details.get("cached_tokens") if isinstance(details, dict) else getattr(details, "cached_tokens", None)
+    return int(cached or 0)
+
+
+class DecisionTracker:
+    """
+    Feeds response text to an IncrementalJSONParser and timestamps the
+    first token and the moment every DECISION_KEYS field is complete.
+    """
+
+    def __init__(self, on_decision: Optional[DecisionCallback] = None):
+        self.on_decision = on_decision
+        self._start = time.perf_counter()
+        self._notified = False
+        self.reset()
+
+    def reset(self):
+        """Start over (a retried stream); on_decision still fires at most once per call."""
+        self.parser = IncrementalJSONParser()
+        self.first_token_ms: Optional[int] = None
+        self.decision_ms: Optional[int] = None
+        self.cached_prompt_tokens = 0
+
+    def _elapsed_ms(self) -> int:
+        return int((time.perf_counter() - self._start) * 1000)
+
+    def feed(self, piece: str):
+        if self.first_token_ms is None:
+            self.first_token_ms = self._elapsed_ms()
+        self.parser.feed(piece)
+        fields = self.parser.fields
+        if self.decision_ms is None and all(k in fields for k in DECISION_KEYS):
+            self.decision_ms = self._elapsed_ms()
+            if self.on_decision and not self._notified:
+                self._notified = True
+                self.on_decision({k: fields[k] for k in DECISION_KEYS})
+
+    def finish(self, response_text: str):
+        """Account for a response that arrived whole (not streamed, or cached)."""
+        if self.first_token_ms is None:
+            self.feed(response_text)
+
+    def result(self, prompt: str, usage) -> tuple[str, int, int]:
+        text = self.parser.text
+        self.cached_prompt_tokens = cached_prompt_tokens(usage)
+        prompt_tokens = usage.prompt_tokens if usage else count_tokens(prompt)
+        completion_tokens = usage.completion_tokens if usage else count_tokens(text)
+        return text, prompt_tokens, completion_tokens
+
+
+class LLMGateway:
+    """
+    Shared chat-completion client; simulates responses when no API key is set.
+
+    Usage:
+        gateway = get_llm_gateway()
+        text, record = gateway.complete(prompt, system_prompt, temperature=0.2,
+                                        simulator=_simulate_llm_response)
+        text, record = await gateway.acomplete(...)  # same arguments
+    """
+
+    def __init__(
+        self,
+        settings: Optional[LLMSettings] = None,
+        cache: Optional[LLMResponseCache] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        simulation: Optional[LLMSimulation] = None
+    ):
+        self.settings = settings or LLMSettings.from_env()
+        self.cache = cache if cache is not None else get_llm_cache()
+        self.retry_policy = retry_policy or replace(get_retry_policy(), max_retries=self.settings.max_retries)
+        self.simulation = simulation or get_llm_simulation()
+        self._client = None
+        # running loop -> (AsyncOpenAI, closer)
+        self._async_clients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def _pool_options(self):
+        """(limits, timeout) built from the HTTP library this openai release uses."""
+        # Limits/Timeout must come from the HTTP library the openai client is
+        # built on: httpx2 for current releases, httpx for 1.x
+        try:
+            import httpx2 as http
+        except ImportError:
+            import httpx as http
+        s = self.settings
+        limits = http.Limits(
+            max_connections=s.max_connections,
+            max_keepalive_connections=s.max_keepalive_connections,
+            keepalive_expiry=s.keepalive_expiry,
+        )
+        return limits, http.Timeout(s.read_timeout, connect=s.connect_timeout)
+
+    @property
+    def client(self):
+        """The pooled OpenAI client, created on first use."""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    from openai import OpenAI, DefaultHttpxClient
+
+                    limits, timeout = self._pool_options()
+                    self._client = OpenAI(
+                        base_url=self.settings.base_url,
+                        api_key=self.settings.api_key,
+                        max_retries=0,  # retries go through the rate limiter (_call / _acall)
+                        http_client=DefaultHttpxClient(limits=limits, timeout=timeout),
+                    )
+        return self._client
+
+    @property
+    def async_client(self):
+        """
+        The pooled AsyncOpenAI client for the running event loop. Async
+        connection pools cannot be shared across loops, so each loop (e.g.
+        each asyncio.run()) gets its own client, closed when that loop shuts
+        down — once the loop is closed its connections can't be closed any more.
+        """
+        loop = asyncio.get_running_loop()
+        entry = self._async_clients.get(loop)
+        if entry is None:
+            from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+            limits, timeout = self._pool_options()
+            client = AsyncOpenAI(
+                base_url=self.settings.base_url,
+                api_key=self.settings.api_key,
+                max_retries=0,  # retries go through the rate limiter (_call / _acall)
+                http_client=DefaultAsyncHttpxClient(limits=limits, timeout=timeout),
+            )
+            entry = (client, _close_at_loop_shutdown(client))
+            with self._lock:
+                # Finished loops' clients were closed at their shutdown; the
+                # client keeps its loop alive, so drop those entries here
+                for finished in [l for l in self._async_clients if l.is_closed()]:
+                    del self._async_clients[finished]
+                self._async_clients[loop] = entry
+        return entry[0]
+
+    def _request(self, prompt: str, system_prompt: str, model: str, temperature: float,
+                 response_format: Optional[dict], stream: bool = False) -> dict:
+        messages = []
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+        messages.append({"role": "user", "content": prompt})
+
+        kwargs = {"model": model, "messages": messages, "temperature": temperature}
+        if response_format:
+            kwargs["response_format"] = response_format
+        if stream:
+            kwargs["stream"] = True
+            kwargs["stream_options"] = {"include_usage": True}
+        return kwargs
+
+    @staticmethod
+    def _parse(response, prompt: str, tracker: DecisionTracker) -> tuple[str, int, int]:
+        response_text = response.choices[0].message.content
+        tracker.cached_prompt_tokens = cached_prompt_tokens(response.usage)
+        prompt_tokens = response.usage.prompt_tokens if response.usage else count_tokens(prompt)
+        completion_tokens = response.usage.completion_tokens if response.usage else count_tokens(response_text)
+        return response_text, prompt_tokens, completion_tokens
+
+    @staticmethod
+    def _record(model: str, prompt: str, result: tuple[str, int, int], latency_ms: int,
+                cache_hit: bool = False, tracker: Optional[DecisionTracker] = None,
+                cached_tokens: Optional[int] = None) -> LLMCallRecord:
+        response_text, prompt_tokens, completion_tokens = result
+        if cached_tokens is None:
+            cached_tokens = tracker.cached_prompt_tokens if tracker and not cache_hit else 0
+        return LLMCallRecord(
+            model=model,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            latency_ms=latency_ms,
+            # A cache hit costs nothing; its latency is the real lookup time
+            cost_usd=0.0 if cache_hit else calculate_cost(prompt_tokens, completion_tokens, model, cached_tokens),
+            status="success",
+            prompt_quality=calculate_prompt_quality(prompt),
+            prompt_text=prompt[:500],
+            response_text=response_text[:500],
+            cache_hit=cache_hit,
+            time_to_first_token_ms=tracker.first_token_ms if tracker else None,
+            time_to_decision_ms=tracker.decision_ms if tracker else None,
+            cached_prompt_tokens=cached_tokens
+        )
+
+    def _cache_lookup(self, key: Optional[str], mode: str):
+        if key is None or mode != "use":
+            return None
+        cached = self.cache.get(key)
+        return cached[:3] if cached is not None else None
+
+    def _cache_key(self, mode: str, model: str, temperature: float, system_prompt: str, prompt: str):
+        # Only real responses are cached — simulated ones are random and free
+        if mode == "bypass" or not self.settings.has_api_key:
+            return None
+        return cache_key(model, temperature, system_prompt, prompt)
+
+    def complete(
+        self,
+        prompt: str,
+        system_prompt: str = "",
+        *,
+        temperature: float,
+        simulator: Simulator,
+        simulated_latency: Optional[LatencyRange] = None,
+        model: Optional[str] = None,
+        response_format: Optional[dict] = JSON_RESPONSE_FORMAT,
+        cache_mode: Optional[str] = None,
+        stream: Optional[bool] = None,
+        on_decision: Optional[DecisionCallback] = None
+    ) -> tuple[str, LLMCallRecord]:
+        """
+        Run one chat completion and return (response_text, LLMCallRecord).
+        Uses `simulator` (after sleeping for `simulated_latency`) when no API
+        key is configured; a real call that keeps failing raises
+        LLMRequestError. cache_mode overrides the response cache mode
+        (use / refresh / bypass) for this call; stream overrides
+        LLM_STREAMING. on_decision receives decision/confidence as soon as
+        they are parsed (at the end of the response when not streaming).
+        """
+        model = model or self.settings.model
+        mode = resolve_cache_mode(cache_mode)
+        key = self._cache_key(mode, model, temperature, system_prompt, prompt)
+        stream = self.settings.streaming if stream is None else stream
+        tracker = DecisionTracker(on_decision)
+
+        with Timer() as timer:
+            result = cached = self._cache_lookup(key, mode)
+            if cached is None and self.settings.has_api_key:
+                request = self._request(prompt, system_prompt, model, temperature, response_format, stream)
+                result = self._call(request, prompt, tracker)
+                if key is not None:
+                    self.cache.put(key, *result)
+            elif cached is None:
+                # No API key — simulate a realistic response
+                result = self._simulate(model, system_prompt, prompt, simulator, simulated_latency,
+                                        tracker if stream else None)
+            tracker.finish(result[0])
+
+        record = self._record(model, prompt, result, timer.elapsed_ms, cache_hit=cached is not None, tracker=tracker)
+        return result[0], record
+
+    async def acomplete(
+        self,
+        prompt: str,
+        system_prompt: str = "",
+        *,
+        temperature: float,
+        simulator: Simulator,
+        simulated_latency: Optional[LatencyRange] = None,
+        model: Optional[str] = None,
+        response_format: Optional[dict] = JSON_RESPONSE_FORMAT,
+        cache_mode: Optional[str] = None,
+        stream: Optional[bool] = None,
+        on_decision: Optional[DecisionCallback] = None
+    ) -> tuple[str, LLMCallRecord]:
+        """Async complete(): awaits the HTTP call or simulated latency instead of blocking."""
+        model = model or self.settings.model
+        mode = resolve_cache_mode(cache_mode)
+        key = self._cache_key(mode, model, temperature, system_prompt, prompt)
+        stream = self.settings.streaming if stream is None else stream
+        tracker = DecisionTracker(on_decision)
+
+        with Timer() as timer:
+            result = cached = self._cache_lookup(key, mode)
+            if cached is None and self.settings.has_api_key:
+                request = self._request(prompt, system_prompt, model, temperature, response_format, stream)
+                result = await self._acall(request, prompt, tracker)
+                if key is not None:
+                    self.cache.put(key, *result)
+            elif cached is None:
+                result = await self._asimulate(model, system_prompt, prompt, simulator, simulated_latency,
+                                               tracker if stream else None)
+            tracker.finish(result[0])
+
+        record = self._record(model, prompt, result, timer.elapsed_ms, cache_hit=cached is not None, tracker=tracker)
+        return result[0], record
+
+    @staticmethod
+    def _estimate_tokens(request: dict) -> int:
+        return estimate_tokens(*(m["content"] for m in request["messages"])) + COMPLETION_TOKEN_ESTIMATE
+
+    def _handle_failure(self, limiter, request: dict, error: Exception, attempt: int, latency_ms: float) -> float:
+        """Release the slot; raise LLMRequestError or return the backoff delay."""
+        overloaded = error_status(error) in OVERLOAD_STATUS_CODES or type(error).__name__ == "APITimeoutError"
+        limiter.release(latency_ms if overloaded else None, throttled=overloaded)
+        if not is_retryable(error) or attempt >= self.retry_policy.max_retries:
+            limiter.record_failure()
+            raise LLMRequestError(
+                f"LLM call to {request['model']} failed after {attempt + 1} attempt(s): {error}"
+            ) from error
+        limiter.record_retry()
+        delay = self.retry_policy.delay(attempt, retry_after_seconds(error))
+        print(f"⚠️ LLM call failed ({error}), retrying in {delay:.1f}s")
+        return delay
+
+    @staticmethod
+    def _release_success(limiter, result: tuple[str, int, int], estimated: int, latency_ms: float):
+        limiter.release(latency_ms, estimated_tokens=estimated, used_tokens=result[1] + result[2])
+
+    @staticmethod
+    def _consume_stream(stream, prompt: str, tracker: DecisionTracker) -> tuple[str, int, int]:
+        tracker.reset()
+        usage = None
+        for chunk in stream:
+            usage = getattr(chunk, "usage", None) or usage
+            if chunk.choices and chunk.choices[0].delta.content:
+                tracker.feed(chunk.choices[0].delta.content)
+        return tracker.result(prompt, usage)
+
+    @staticmethod
+    async def _aconsume_stream(stream, prompt: str, tracker: DecisionTracker) -> tuple[str, int, int]:
+        tracker.reset()
+        usage = None
+        async for chunk in stream:
+            usage = getattr(chunk, "usage", None) or usage
+            if chunk.choices and chunk.choices[0].delta.content:
+                tracker.feed(chunk.choices[0].delta.content)
+        return tracker.result(prompt, usage)
+
+    def _call(self, request: dict, prompt: str, tracker: DecisionTracker) -> tuple[str, int, int]:
+        """One chat completion through the model's rate limiter, with retries."""
+        limiter = get_rate_limiter(request["model"])
+        estimated = self._estimate_tokens(request)
+        attempt = 0
+        while True:
+            limiter.acquire(estimated)
+            start = time.perf_counter()
+            try:
+                response = self.client.chat.completions.create(**request)
+                if request.get("stream"):
+                    result = self._consume_stream(response, prompt, tracker)
+                else:
+                    result = self._parse(response, prompt, tracker)
+            except Exception as e:
+                time.sleep(self._handle_failure(limiter, request, e, attempt, (time.perf_counter() - start) * 1000))
+                attempt += 1
+                continue
+            self._release_success(limiter, result, estimated, (time.perf_counter() - start) * 1000)
+            return result
+
+    async def _acall(self, request: dict, prompt: str, tracker: DecisionTracker) -> tuple[str, int, int]:
+        """Async _call()."""
+        limiter = get_rate_limiter(request["model"])
+        estimated = self._estimate_tokens(request)
+        attempt = 0
+        while True:
+            await limiter.aacquire(estimated)
+            start = time.perf_counter()
+            try:
+                response = await self.async_client.chat.completions.create(**request)
+                if request.get("stream"):
+                    result = await self._aconsume_stream(response, prompt, tracker)
+                else:
+                    result = self._parse(response, prompt, tracker)
+            except asyncio.CancelledError:
+                limiter.release()
+                raise
+            except Exception as e:
+                delay = self._handle_failure(limiter, request, e, attempt, (time.perf_counter() - start) * 1000)
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            self._release_success(limiter, result, estimated, (time.perf_counter() - start) * 1000)
+            return result
+
+    @staticmethod
+    def _simulated_stream(text: str, seconds: float):
+        """(pause, piece) pairs spreading a simulated response over `seconds`."""
+        pieces = [text[i:i + SIMULATED_STREAM_CHUNK] for i in range(0, len(text), SIMULATED_STREAM_CHUNK)]
+        first = seconds * SIMULATED_FIRST_TOKEN_SHARE
+        rest = (seconds - first) / max(len(pieces) - 1, 1)
+        for i, piece in enumerate(pieces):
+            yield (first if i == 0 else rest), piece
+
+    def _simulated_failure(self, model: str, error: SimulatedAPIError, attempt: int) -> float:
+        """Raise LLMRequestError or return the backoff delay for an injected failure."""
+        if not is_retryable(error) or attempt >= self.retry_policy.max_retries:
+            raise LLMRequestError(f"LLM call to {model} failed after {attempt + 1} attempt(s): {error}") from error
+        delay = self.retry_policy.delay(attempt, retry_after_seconds(error))
+        print(f"⚠️ LLM call failed ({error}), retrying in {delay:.1f}s")
+        return delay
+
+    def _simulate(self, model: str, system_prompt: str, prompt: str, simulator: Simulator,
+                  latency: Optional[LatencyRange], tracker: Optional[DecisionTracker] = None):
+        attempt = 0
+        while True:
+            call = self.simulation.plan(model, system_prompt, prompt, attempt, latency)
+            if call.error is None:
+                break
+            time.sleep(call.seconds + self._simulated_failure(model, call.error, attempt))
+            attempt += 1
+
+        result = simulator(prompt, call.rng)
+        if tracker is None:
+            if call.seconds:
+                time.sleep(call.seconds)
+            return result
+        for pause, piece in self._simulated_stream(result[0], call.seconds):
+            if pause:
+                time.sleep(pause)
+            tracker.feed(piece)
+        return result
+
+    async def _asimulate(self, model: str, system_prompt: str, prompt: str, simulator: Simulator,
+                         latency: Optional[LatencyRange], tracker: Optional[DecisionTracker] = None):
+        attempt = 0
+        while True:
+            call = self.simulation.plan(model, system_prompt, prompt, attempt, latency)
+            if call.error is None:
+                break
+            await asyncio.sleep(call.seconds + self._simulated_failure(model, call.error, attempt))
+            attempt += 1
+
+        result = simulator(prompt, call.rng)
+        if tracker is None:
+            if call.seconds:
+                await asyncio.sleep(call.seconds)
+            return result
+        for pause, piece in self._simulated_stream(result[0], call.seconds):
+            if pause:
+                await asyncio.sleep(pause)
+            tracker.feed(piece)
+        return result
+
+    def close(self):
+        """Close pooled sync connections; the next call reopens them."""
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+    async def aclose(self):
+        """Close the running loop's async client now instead of at loop shutdown."""
+        with self._lock:
+            entry = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if entry is not None:
+            await entry[1].aclose()  # runs the closer's finally: client.close()
+
+
+async def _client_closer(client):
+    """Async generator that closes `client` when it is finalized."""
+    try:
+        yield
+    finally:
+        await client.close()
+
+
+def _close_at_loop_shutdown(client):
+    """
+    Tie `client` to the running loop: the loop's shutdown_asyncgens() (run by
+    asyncio.run() before it closes the loop) finalizes the started generator,
+    closing the client while the loop can still run its transports.
+    """
+    closer = _client_closer(client)
+    try:
+        closer.asend(None).send(None)  # first step registers it with the running loop
+    except StopIteration:
+        pass
+    return closer
+
+
+# Singleton instance
+_gateway: Optional[LLMGateway] = None
+_gateway_lock = threading.Lock()
+
+def get_llm_gateway() -> LLMGateway:
+    """Get or create the process-wide LLMGateway."""
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = LLMGateway()
+    return _gateway
@@ -0,0 +1,212 @@
+"""
+InsureOps AI — LLM Simulation Backend
+What the gateway does instead of calling a model when no API key is set:
+how long a simulated call takes, which random numbers the agent's simulator
+draws, and whether the call fails.
+
+Latency models (LLM_SIM_LATENCY):
+- zero                  no delay — load tests run as fast as the non-LLM code allows
+- fixed:<ms>            the same delay every call
+- uniform:<lo>,<hi>     uniform between lo and hi ms
+- lognormal:<median>,<sigma>
+                        log-normal around a median in ms (a long right tail, like real models)
+- empirical:<path>      replay recorded latencies: a JSON list of ms values or of
+                        objects with "latency_ms" (e.g. exported llm_calls), or one value per line
+Unset, each agent keeps its own uniform range (SIMULATED_LATENCY).
+
+Every call gets its own RNG seeded from (LLM_SIM_SEED, model, prompts,
+attempt), so a run is reproducible regardless of concurrency or ordering:
+the same seed gives the same latencies, answers and injected failures.
+Without LLM_SIM_SEED a random seed is picked and kept in `seed`.
+
+LLM_SIM_ERROR_RATE and LLM_SIM_RATE_LIMIT_RATE inject 500 and 429
+responses (with LLM_SIM_RETRY_AFTER_MS as Retry-After), which go through
+the gateway's retry policy like real failures.
+
+Usage:
+    gateway = get_llm_gateway()
+    gateway.simulation = LLMSimulation(ZeroLatency(), seed=42, rate_limit_rate=0.02)
+"""
+
+import hashlib
+import json
+import math
+import os
+import random
+import threading
+from dataclasses import dataclass
+from typing import NamedTuple, Optional
+
+
+# ─── Latency Models ─────────────────────────────────
+
+class ZeroLatency:
+    def sample(self, rng: random.Random) -> float:
+        return 0.0
+
+
+@dataclass(frozen=True)
+class FixedLatency:
+    ms: float
+
+    def sample(self, rng: random.Random) -> float:
+        return self.ms / 1000.0
+
+
+@dataclass(frozen=True)
+class UniformLatency:
+    low_ms: float
+    high_ms: float
+
+    def sample(self, rng: random.Random) -> float:
+        return rng.uniform(self.low_ms, self.high_ms) / 1000.0
+
+
+@dataclass(frozen=True)
+class LogNormalLatency:
+    median_ms: float
+    sigma: float = 0.5
+
+    def sample(self, rng: random.Random) -> float:
+        return self.median_ms * math.exp(self.sigma * rng.gauss(0.0, 1.0)) / 1000.0
+
+
+class EmpiricalLatency:
+    """Resamples recorded latencies (ms) with replacement."""
+
+    def __init__(self, samples_ms: list[float]):
+        if not samples_ms:
+            raise ValueError("EmpiricalLatency needs at least one recorded latency")
+        self.samples_ms = list(samples_ms)
+
+    @classmethod
+    def from_file(cls, path: str) -> "EmpiricalLatency":
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read()
+        try:
+            rows = json.loads(text)
+        except json.JSONDecodeError:
+            rows = [line.split(",")[0] for line in text.splitlines() if line.strip()]
+        return cls([float(r["latency_ms"] if isinstance(r, dict) else r) for r in rows])
+
+    def sample(self, rng: random.Random) -> float:
+        return rng.choice(self.samples_ms) / 1000.0
+
+
+def parse_latency_model(spec: str):
+    """A latency model from an LLM_SIM_LATENCY spec (see the module docstring)."""
+    kind, _, args = spec.strip().partition(":")
+    kind = kind.lower()
+    if kind == "empirical":
+        return EmpiricalLatency.from_file(args)
+    values = [float(v) for v in args.split(",") if v.strip()]
+    if kind == "zero":
+        return ZeroLatency()
+    if kind == "fixed" and len(values) == 1:
+        return FixedLatency(*values)
+    if kind == "uniform" and len(values) == 2:
+        return UniformLatency(*values)
+    if kind == "lognormal" and len(values) in (1, 2):
+        return LogNormalLatency(*values)
+    raise ValueError(f"Invalid LLM_SIM_LATENCY '{spec}'")
+
+
+# ─── Injected Failures ──────────────────────────────
+
+class _SimulatedResponse:
+    def __init__(self, status_code: int, headers: dict):
+        self.status_code = status_code
+        self.headers = headers
+
+
+class SimulatedAPIError(Exception):
+    """
+    An injected provider error. Carries status_code and response headers
+    like the SDK's APIStatusError, so rate_limiter.is_retryable() and
+    retry_after_seconds() treat it the same way.
+    """
+
+    def __init__(self, status_code: int, retry_after_s: Optional[float] = None):
+        headers = {"retry-after-ms": str(int(retry_after_s * 1000))} if retry_after_s is not None else {}
+        self.status_code = status_code
+        self.response = _SimulatedResponse(status_code, headers)
+        super().__init__(f"Simulated {status_code} response")
+
+
+class SimulatedCall(NamedTuple):
+    rng: random.Random
+    seconds: float                     # latency of this attempt
+    error: Optional[SimulatedAPIError]
+
+
+# ─── Simulation Backend ─────────────────────────────
+
+# (min_seconds, max_seconds) — an agent's default latency range
+LatencyRange = tuple[float, float]
+
+
+class LLMSimulation:
+    """Latency model, seed and failure rates for simulated LLM calls."""
+
+    def __init__(
+        self,
+        latency=None,
+        seed: Optional[int] = None,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        retry_after_s: Optional[float] = None
+    ):
+        self.latency = latency  # None = each agent's own uniform range
+        self.seed = seed if seed is not None else random.SystemRandom().randrange(2 ** 32)
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after_s = retry_after_s
+
+    @classmethod
+    def from_env(cls) -> "LLMSimulation":
+        latency = os.getenv("LLM_SIM_LATENCY")
+        seed = os.getenv("LLM_SIM_SEED")
+        retry_after_ms = os.getenv("LLM_SIM_RETRY_AFTER_MS")
+        return cls(
+            latency=parse_latency_model(latency) if latency else None,
+            seed=int(seed) if seed else None,
+            error_rate=float(os.getenv("LLM_SIM_ERROR_RATE", "0")),
+            rate_limit_rate=float(os.getenv("LLM_SIM_RATE_LIMIT_RATE", "0")),
+            retry_after_s=float(retry_after_ms) / 1000.0 if retry_after_ms else None,
+        )
+
+    def rng(self, model: str, system_prompt: str, prompt: str, attempt: int = 0) -> random.Random:
+        """The RNG for one attempt of one request — identical requests draw identical numbers."""
+        digest = hashlib.sha256(f"{model}\x00{system_prompt}\x00{prompt}".encode("utf-8")).hexdigest()
+        return random.Random(f"{self.seed}:{digest}:{attempt}")
+
+    def plan(self, model: str, system_prompt: str, prompt: str, attempt: int = 0,
+             default_latency: Optional[LatencyRange] = None) -> SimulatedCall:
+        """Latency and outcome of one simulated attempt."""
+        rng = self.rng(model, system_prompt, prompt, attempt)
+        if self.latency is not None:
+            seconds = self.latency.sample(rng)
+        else:
+            seconds = rng.uniform(*default_latency) if default_latency else 0.0
+
+        error = None
+        roll = rng.random()
+        if roll < self.rate_limit_rate:
+            error = SimulatedAPIError(429, self.retry_after_s)
+            seconds = 0.0  # throttled requests are turned away immediately
+        elif roll < self.rate_limit_rate + self.error_rate:
+            error = SimulatedAPIError(500)
+        return SimulatedCall(rng, seconds, error)
+
+
+_simulation: Optional[LLMSimulation] = None
+_simulation_lock = threading.Lock()
+
+def get_llm_simulation() -> LLMSimulation:
+    """Get or create the process-wide LLMSimulation (LLM_SIM_* settings)."""
+    global _simulation
+    if _simulation is None:
+        with _simulation_lock:
+            if _simulation is None:
+                _simulation = LLMSimulation.from_env()
+    return _simulation
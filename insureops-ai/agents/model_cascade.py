@@ -0,0 +1,200 @@
+"""
+InsureOps AI — Confidence-Based Model Cascade
+Runs an agent's LLM step on the cheapest model first and re-runs it on the
+next, stronger model only when the answer isn't good enough:
+
+- the response isn't a parseable JSON object
+- a guardrail check fails on the parsed analysis
+- the parsed confidence is under the policy's threshold
+
+Every hop is its own LLMCallRecord on the trace; escalated hops carry the
+reason in cascade_escalation. The last model's answer is always used.
+
+Policies come from the environment, per agent type:
+    LLM_CASCADE_MODELS_CLAIMS=openai/gpt-4.1-nano,openai/gpt-4o-mini,openai/gpt-4o
+    LLM_CASCADE_CONFIDENCE_CLAIMS=0.75
+(LLM_CASCADE_MODELS / LLM_CASCADE_CONFIDENCE apply to every agent.) With no
+models configured the step makes one call on the gateway's default model.
+
+cascade_report() compares results run with a cascade against the same
+records run on one big model (see benchmarks/bench_model_cascade.py).
+
+Usage:
+    with model_cascade(CascadePolicy(("openai/gpt-4.1-nano", "openai/gpt-4o"), 0.8)):
+        run_claims_agent(claim)
+"""
+
+import contextlib
+import contextvars
+import os
+import statistics
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional
+
+from agents.base_agent import GuardrailResult, LLMCallRecord, parse_llm_json
+
+
+DEFAULT_CONFIDENCE_THRESHOLD = 0.75
+DEFAULT_CASCADE_MODELS = ("openai/gpt-4.1-nano", "openai/gpt-4o-mini", "openai/gpt-4o")
+
+# model (None = gateway default) -> (response_text, LLMCallRecord)
+CallFn = Callable[[Optional[str]], tuple[str, LLMCallRecord]]
+AsyncCallFn = Callable[[Optional[str]], Awaitable[tuple[str, LLMCallRecord]]]
+# parsed analysis -> guardrail results
+GuardrailFn = Callable[[dict], list[GuardrailResult]]
+
+
+@dataclass(frozen=True)
+class CascadePolicy:
+    """Models to try, cheapest first (None = the gateway default), and the confidence to accept."""
+    models: tuple[Optional[str], ...] = (None,)
+    confidence_threshold: float = DEFAULT_CONFIDENCE_THRESHOLD
+
+    @classmethod
+    def from_env(cls, agent_type: str) -> "CascadePolicy":
+        suffix = agent_type.upper()
+        models = os.getenv(f"LLM_CASCADE_MODELS_{suffix}") or os.getenv("LLM_CASCADE_MODELS", "")
+        threshold = (os.getenv(f"LLM_CASCADE_CONFIDENCE_{suffix}")
+                     or os.getenv("LLM_CASCADE_CONFIDENCE", str(DEFAULT_CONFIDENCE_THRESHOLD)))
+        return cls(
+            models=tuple(m.strip() for m in models.split(",") if m.strip()) or (None,),
+            confidence_threshold=float(threshold),
+        )
+
+
+_policy_override: contextvars.ContextVar[Optional[CascadePolicy]] = contextvars.ContextVar(
+    "model_cascade", default=None
+)
+
+
+@contextlib.contextmanager
+def model_cascade(policy: CascadePolicy):
+    """Override the cascade policy for agents run inside this block (thread/task local)."""
+    token = _policy_override.set(policy)
+    try:
+        yield
+    finally:
+        _policy_override.reset(token)
+
+
+def resolve_cascade(agent_type: str) -> CascadePolicy:
+    """model_cascade() block, then LLM_CASCADE_* environment variables."""
+    return _policy_override.get() or CascadePolicy.from_env(agent_type)
+
+
+# ─── Escalation Rules ───────────────────────────────
+
+def escalation_reason(analysis: Optional[dict], guardrails: list[GuardrailResult],
+                      confidence_threshold: float) -> Optional[str]:
+    """Why an answer should go to the next model, or None to accept it."""
+    if analysis is None:
+        return "parse_failure"
+    failed = [g.check_type for g in guardrails if not g.passed]
+    if failed:
+        return f"guardrail_failed:{','.join(failed)}"
+    try:
+        confidence = float(analysis.get("confidence"))
+    except (TypeError, ValueError):
+        return "low_confidence"
+    if confidence < confidence_threshold:
+        return "low_confidence"
+    return None
+
+
+def _check_hop(policy: CascadePolicy, hop: int, response_text: str, guardrails: GuardrailFn) -> Optional[str]:
+    if hop == len(policy.models) - 1:
+        return None  # nothing stronger to escalate to
+    analysis = parse_llm_json(response_text)
+    return escalation_reason(
+        analysis, guardrails(analysis) if analysis is not None else [], policy.confidence_threshold
+    )
+
+
+def run_cascade(policy: CascadePolicy, call: CallFn, guardrails: GuardrailFn) -> tuple[str, list[LLMCallRecord]]:
+    """Call each model in turn until an answer is accepted; returns (final response, every hop's record)."""
+    records = []
+    for hop, model in enumerate(policy.models):
+        response_text, record = call(model)
+        records.append(record)
+        record.cascade_escalation = _check_hop(policy, hop, response_text, guardrails)
+        if record.cascade_escalation is None:
+            break
+    return response_text, records
+
+
+async def arun_cascade(policy: CascadePolicy, acall: AsyncCallFn,
+                       guardrails: GuardrailFn) -> tuple[str, list[LLMCallRecord]]:
+    """Async run_cascade()."""
+    records = []
+    for hop, model in enumerate(policy.models):
+        response_text, record = await acall(model)
+        records.append(record)
+        record.cascade_escalation = _check_hop(policy, hop, response_text, guardrails)
+        if record.cascade_escalation is None:
+            break
+    return response_text, records
+
+
+def record_escalated_hops(trace, records: list[LLMCallRecord], prompt_tokens_saved: int = 0) -> LLMCallRecord:
+    """Append every escalated hop to the trace; returns the final hop's record."""
+    for record in records:
+        record.prompt_tokens_saved = prompt_tokens_saved
+    trace.llm_calls.extend(records[:-1])
+    return records[-1]
+
+
+# ─── Savings Report ─────────────────────────────────
+
+def _llm_calls(result: dict) -> list[dict]:
+    return result["trace"]["llm_calls"]
+
+
+def _p50(values: list) -> float:
+    return round(statistics.median(values), 1) if values else 0.0
+
+
+def cascade_report(cascade_results: list[dict], baseline_results: list[dict]) -> dict:
+    """
+    Compare agent results run with a cascade against the same records run on
+    one (big) model: LLM spend, p50 LLM latency per record, hop counts and how
+    often the two runs reached the same decision.
+    """
+    pairs = list(zip(cascade_results, baseline_results))
+    hops: dict[int, int] = {}
+    reasons: dict[str, int] = {}
+    for result in cascade_results:
+        calls = _llm_calls(result)
+        hops[len(calls)] = hops.get(len(calls), 0) + 1
+        for call in calls:
+            if call.get("cascade_escalation"):
+                reason = call["cascade_escalation"].split(":")[0]
+                reasons[reason] = reasons.get(reason, 0) + 1
+
+    def _spend(results):
+        return sum(c["cost_usd"] for r in results for c in _llm_calls(r))
+
+    def _latencies(results):
+        return [sum(c["latency_ms"] for c in _llm_calls(r)) for r in results]
+
+    cascade_spend, baseline_spend = _spend(cascade_results), _spend(baseline_results)
+    cascade_p50, baseline_p50 = _p50(_latencies(cascade_results)), _p50(_latencies(baseline_results))
+    agreed = sum(
+        1 for c, b in pairs
+        if c["decision"].get("decision_type") == b["decision"].get("decision_type")
+    )
+    return {
+        "records": len(pairs),
+        "hops": dict(sorted(hops.items())),
+        "escalations": reasons,
+        "spend_usd": {
+            "cascade": round(cascade_spend, 6),
+            "baseline": round(baseline_spend, 6),
+            "saved_pct": round((1 - cascade_spend / baseline_spend) * 100, 1) if baseline_spend else 0.0,
+        },
+        "p50_llm_latency_ms": {
+            "cascade": cascade_p50,
+            "baseline": baseline_p50,
+            "saved_pct": round((1 - cascade_p50 / baseline_p50) * 100, 1) if baseline_p50 else 0.0,
+        },
+        "decision_agreement": round(agreed / len(pairs), 3) if pairs else 1.0,
+    }
@@ -0,0 +1,301 @@
+"""
+InsureOps AI — Stage-Pipelined Agent Runs
+Runs many records through a workflow as an assembly line instead of one
+whole run per worker. The workflow is split at its LLM step into stages,
+each with its own bounded input queue and worker threads:
+
+- tools:    the steps before the LLM step (lookups, RAG retrieval)
+- llm:      the LLM step, which mostly waits on the provider
+- finalize: the steps after it (guardrails, decision), then the
+            checkpoint, telemetry and the result dict
+
+Record N+1's tool lookups run while record N waits on the LLM. Because the
+queues are bounded, a slow stage stops the stages upstream of it, so the
+pipeline never holds more than queue_size records per stage.
+
+Each stage reports its queue depth (now and peak), utilization (busy time
+over workers × elapsed), mean service time and how long its workers sat
+blocked on a full downstream queue. That tells you which stage to give
+more workers: the one near 100% utilization with a full queue in front of it.
+Worker counts default to PIPELINE_TOOL_WORKERS / PIPELINE_LLM_WORKERS /
+PIPELINE_FINALIZE_WORKERS and queue sizes to PIPELINE_QUEUE_SIZE. The
+gateway's adaptive LLM concurrency limit still caps the calls actually in
+flight, so more LLM workers than LLM_CONCURRENCY_MAX only adds waiting.
+
+Usage:
+    pipeline = AgentPipeline("claims", workers={"llm": 32})
+    for item in pipeline.run(claims):
+        print(item.index, item.result["decision"])
+    print(pipeline.stats())
+
+    python -m agents.batch_runner --agent claims --input claims.jsonl --mode pipeline --stage-workers llm=32
+"""
+
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, Optional
+
+from agents.base_agent import send_telemetry_to_backend
+from agents.batch_runner import BatchResult, InvalidRecord
+from agents.workflow import AgentWorkflow, get_workflow
+
+
+PIPELINE_STAGES = ("tools", "llm", "finalize")
+_POLL_SECONDS = 0.1
+_DONE = object()  # end-of-stream marker, one per worker of the receiving stage
+
+
+def default_stage_workers() -> dict[str, int]:
+    return {
+        "tools": int(os.getenv("PIPELINE_TOOL_WORKERS", "2")),
+        "llm": int(os.getenv("PIPELINE_LLM_WORKERS", "16")),
+        "finalize": int(os.getenv("PIPELINE_FINALIZE_WORKERS", "2")),
+    }
+
+
+def get_queue_size() -> int:
+    return int(os.getenv("PIPELINE_QUEUE_SIZE", "64"))
+
+
+@dataclass
+class _Item:
+    """One record on its way through the stages."""
+    index: int
+    record: dict
+    started: float = 0.0  # when the first stage picked it up
+    state: Optional[dict] = None
+    completed: tuple[str, ...] = ()
+    error: Optional[str] = None
+    ran: bool = True      # False for an undecodable input line, which only passes through
+
+
+@dataclass
+class _Stage:
+    name: str
+    workers: int
+    inbox: queue.Queue
+    start_after: Optional[str]   # workflow.run() bounds for this stage's steps
+    stop_before: Optional[str]
+    step_names: tuple[str, ...]
+    processed: int = 0
+    busy_seconds: float = 0.0
+    blocked_seconds: float = 0.0  # waiting for room in the next stage's queue
+    depth: int = 0                # records in the inbox (end-of-stream markers excluded)
+    max_depth: int = 0
+    live_workers: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class AgentPipeline:
+    """
+    A workflow split into stages connected by bounded queues. One pipeline
+    runs one batch at a time; stats() can be polled while it runs.
+    """
+
+    def __init__(self, agent_type: str, workers: Optional[dict[str, int]] = None,
+                 queue_size: Optional[int] = None, send_telemetry: bool = False):
+        self.workflow: AgentWorkflow = get_workflow(agent_type)
+        self.send_telemetry = send_telemetry
+        self.queue_size = queue_size or get_queue_size()
+        counts = {**default_stage_workers(), **(workers or {})}
+        unknown = set(counts) - set(PIPELINE_STAGES)
+        if unknown:
+            raise ValueError(f"Unknown pipeline stage(s) {sorted(unknown)} (expected {PIPELINE_STAGES})")
+        self.stages = self._build_stages(counts)
+        self._outbox: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        self._stop = threading.Event()
+        self._feed_error: Optional[Exception] = None
+        self._started: Optional[float] = None
+        self._finished: Optional[float] = None
+
+    def _build_stages(self, counts: dict[str, int]) -> list[_Stage]:
+        """Cut the workflow's steps at its LLM step; a workflow without one is a single stage."""
+        names = [step.name for step in self.workflow.steps]
+        if self.workflow.llm is None or self.workflow.llm.step_name not in names:
+            bounds = {"tools": (None, None, names)}
+        else:
+            at = names.index(self.workflow.llm.step_name)
+            bounds = {
+                "tools": (None, names[at], names[:at]),
+                "llm": (names[at - 1] if at else None, names[at + 1] if at + 1 < len(names) else None,
+                        names[at:at + 1]),
+                "finalize": (names[at], None, names[at + 1:]),
+            }
+        return [
+            _Stage(name, max(1, counts[name]), queue.Queue(maxsize=self.queue_size),
+                   start_after, stop_before, tuple(step_names))
+            for name, (start_after, stop_before, step_names) in bounds.items()
+        ]
+
+    # ─── Queues ─────────────────────────────────────
+
+    def _put(self, q: queue.Queue, item) -> bool:
+        """Blocking put that gives up once the pipeline is stopped."""
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=_POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q: queue.Queue):
+        while not self._stop.is_set():
+            try:
+                return q.get(timeout=_POLL_SECONDS)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _enqueue(self, stage: _Stage, item: _Item) -> bool:
+        """Put a record into a stage's inbox, counting it towards the depth unless it only passes through."""
+        if not self._put(stage.inbox, item):
+            return False
+        if item.ran:
+            with stage.lock:
+                stage.depth += 1
+                stage.max_depth = max(stage.max_depth, stage.depth)
+        return True
+
+    # ─── Stage Workers ──────────────────────────────
+
+    def _feed(self, records: Iterable[dict]):
+        """
+        Pull records lazily into the first stage; blocks while its queue is
+        full. If `records` raises, the error is kept for run() to re-raise
+        once the records already fed have come out.
+        """
+        first = self.stages[0]
+        try:
+            for index, record in enumerate(records):
+                if isinstance(record, InvalidRecord):
+                    item = _Item(index, {}, error=f"line {record.line}: {record.error}", ran=False)
+                else:
+                    item = _Item(index, record)
+                if not self._enqueue(first, item):
+                    return
+        except Exception as e:
+            self._feed_error = e
+        finally:
+            for _ in range(first.workers):
+                self._put(first.inbox, _DONE)
+
+    def _process(self, stage: _Stage, item: _Item):
+        if item.state is None and item.error is None:
+            try:
+                item.state = self.workflow.initial_state(item.record)
+            except Exception as e:
+                item.error = str(e)
+        if item.error is not None or item.state["trace"].status == "error":
+            return  # a failed run skips to the end
+        save = self.workflow.checkpointer(item.state["trace"].trace_id)
+        item.state = self.workflow.run(
+            item.state, False, stage.start_after, stage.stop_before, item.completed, save
+        )
+        item.completed += tuple(name for name in stage.step_names if name not in item.completed)
+
+    def _finish(self, item: _Item) -> BatchResult:
+        """Last stage: settle the checkpoint, send telemetry and build the result."""
+        if not item.ran:
+            return BatchResult(item.index, item.record, None, 0.0, item.error, ran=False)
+        if item.error is not None:
+            return BatchResult(item.index, item.record, None, (time.perf_counter() - item.started) * 1000,
+                               item.error)
+        self.workflow.settle_checkpoint(item.state)
+        if self.send_telemetry:
+            send_telemetry_to_backend(item.state["trace"])
+        result = self.workflow.build_result(item.state)
+        return BatchResult(item.index, item.record, result, (time.perf_counter() - item.started) * 1000, None)
+
+    def _work(self, position: int):
+        stage = self.stages[position]
+        last = position == len(self.stages) - 1
+        downstream = None if last else self.stages[position + 1]
+        outbox = self._outbox if last else downstream.inbox
+        try:
+            while True:
+                item = self._get(stage.inbox)
+                if item is _DONE:
+                    break
+                if item.ran:
+                    with stage.lock:
+                        stage.depth -= 1
+                start = time.perf_counter()
+                if position == 0:
+                    item.started = start
+                try:
+                    self._process(stage, item)
+                    out = self._finish(item) if last else item
+                except Exception as e:  # reported on the record, as a whole-run worker would
+                    item.error = str(e)
+                    out = self._finish(item) if last else item
+                done = time.perf_counter()
+                delivered = self._put(outbox, out) if last else self._enqueue(downstream, out)
+                if item.ran:  # invalid input lines only pass through; keep them out of the timings
+                    with stage.lock:
+                        stage.processed += 1
+                        stage.busy_seconds += done - start
+                        stage.blocked_seconds += time.perf_counter() - done
+                if not delivered:
+                    break
+        finally:
+            with stage.lock:
+                stage.live_workers -= 1
+                closing = stage.live_workers == 0
+            if closing:  # the stage's last worker passes end-of-stream on
+                for _ in range(1 if last else self.stages[position + 1].workers):
+                    self._put(outbox, _DONE)
+
+    # ─── Running ────────────────────────────────────
+
+    def run(self, records: Iterable[dict]) -> Iterator[BatchResult]:
+        """
+        Stream a BatchResult per record in completion order (use .index to
+        restore input order). If `records` raises, the records fed before it
+        are still yielded, then the error is re-raised.
+        """
+        self._started, self._finished = time.perf_counter(), None
+        self._feed_error = None
+        self._stop.clear()
+        threads = [threading.Thread(target=self._feed, args=(records,), name="pipeline-feed", daemon=True)]
+        for position, stage in enumerate(self.stages):
+            stage.live_workers = stage.workers
+            stage.depth = stage.max_depth = 0
+            threads += [
+                threading.Thread(target=self._work, args=(position,), name=f"pipeline-{stage.name}-{n}", daemon=True)
+                for n in range(stage.workers)
+            ]
+        for thread in threads:
+            thread.start()
+        try:
+            while True:
+                item = self._get(self._outbox)
+                if item is _DONE:
+                    break
+                yield item
+            if self._feed_error is not None:
+                raise self._feed_error
+        finally:
+            self._finished = time.perf_counter()
+            self._stop.set()  # also unblocks the stages if the caller stopped early
+
+    def stats(self) -> dict:
+        """Per-stage queue depth, utilization and timings; safe to call while running."""
+        elapsed = ((self._finished or time.perf_counter()) - self._started) if self._started else 0.0
+        stages = {}
+        for stage in self.stages:
+            with stage.lock:
+                stages[stage.name] = {
+                    "steps": list(stage.step_names),
+                    "workers": stage.workers,
+                    "processed": stage.processed,
+                    "queue_depth": max(0, stage.depth),
+                    "max_queue_depth": stage.max_depth,
+                    "utilization": round(stage.busy_seconds / (stage.workers * elapsed), 3) if elapsed else 0.0,
+                    "mean_service_ms": round(stage.busy_seconds / stage.processed * 1000, 2) if stage.processed else 0.0,
+                    "blocked_seconds": round(stage.blocked_seconds, 2),
+                }
+        return {"queue_size": self.queue_size, "seconds": round(elapsed, 2), "stages": stages}
@@ -0,0 +1,375 @@
+"""
+InsureOps AI — LLM Rate Limiter
+Client-side admission control for real LLM calls, shared by every agent:
+
+- RPM / TPM token buckets per model, so a burst of claims queues locally
+  instead of tripping the provider's 429s
+- AIMD adaptive concurrency: the in-flight limit grows by ~1 per window of
+  fast successes and halves on a 429 or when latency exceeds the target
+- RetryPolicy: jittered exponential backoff that honors Retry-After
+
+The limiter state is exported as gauges via export_metrics().
+
+Usage:
+    limiter = get_rate_limiter("openai/gpt-4o-mini")
+    limiter.acquire(estimated_tokens)          # or: await limiter.aacquire(...)
+    ...call the model...
+    limiter.release(latency_ms, throttled=False, used_tokens=actual_tokens)
+"""
+
+import asyncio
+import os
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+from agents.tokenizer import count_tokens
+
+RETRYABLE_STATUS_CODES = frozenset({408, 409, 429, 500, 502, 503, 504})
+
+
+def estimate_tokens(*texts: str) -> int:
+    """Token count for budgeting before the real usage is known."""
+    return sum(count_tokens(t) for t in texts)
+
+
+# ─── Token Bucket ───────────────────────────────────
+
+class TokenBucket:
+    """
+    Refills `per_minute` units per minute up to one minute's worth.
+    reserve() always succeeds and returns how long the caller must wait, so
+    concurrent callers queue in arrival order instead of polling.
+    """
+
+    def __init__(self, per_minute: float):
+        self.per_minute = float(per_minute)
+        self.capacity = float(per_minute)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.per_minute / 60.0)
+        self._updated = now
+
+    def reserve(self, amount: float) -> float:
+        """Take `amount` units (capped at capacity); returns seconds to wait before using them."""
+        if self.per_minute <= 0:
+            return 0.0
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= min(amount, self.capacity)
+            return max(0.0, -self._tokens * 60.0 / self.per_minute)
+
+    def adjust(self, delta: float):
+        """Charge (positive) or refund (negative) units once the real usage is known."""
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens - delta)
+
+    @property
+    def available(self) -> float:
+        with self._lock:
+            self._refill(time.monotonic())
+            return self._tokens
+
+
+# ─── Adaptive Concurrency ───────────────────────────
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD limit on in-flight calls. Sync and async callers share one limit;
+    a released slot is handed straight to the oldest waiter. The limit is
+    cut at most once per smoothed round trip, so one burst of 429s from
+    calls already in flight counts as a single congestion signal.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 8,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        latency_target_ms: float = 10000.0,
+        backoff_ratio: float = 0.5
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target_ms = latency_target_ms
+        self.backoff_ratio = backoff_ratio
+        self._limit = float(min(max(initial_limit, min_limit), max_limit))
+        self._in_flight = 0
+        self._last_decrease = 0.0
+        self._latency_ewma_ms = 0.0
+        self._waiters: deque = deque()
+        self._lock = threading.Lock()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    def _try_enter(self) -> bool:
+        if self._in_flight < int(self._limit) and not self._waiters:
+            self._in_flight += 1
+            return True
+        return False
+
+    def _wake_waiters(self):
+        # Called with the lock held; each woken waiter already owns its slot
+        while self._waiters and self._in_flight < int(self._limit):
+            self._in_flight += 1
+            self._waiters.popleft()()
+
+    def _return_slot(self):
+        with self._lock:
+            self._in_flight -= 1
+            self._wake_waiters()
+
+    def acquire(self):
+        """Block until a slot is free."""
+        with self._lock:
+            if self._try_enter():
+                return
+            event = threading.Event()
+            self._waiters.append(event.set)
+        event.wait()
+
+    async def aacquire(self):
+        """Wait for a slot without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._try_enter():
+                return
+            future = loop.create_future()
+
+            def _grant(_future=future):
+                if _future.done():  # waiter was cancelled — pass the slot on
+                    self._return_slot()
+                else:
+                    _future.set_result(None)
+
+            self._waiters.append(lambda: loop.call_soon_threadsafe(_grant))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self._return_slot()
+            raise
+
+    def release(self, latency_ms: Optional[float] = None, throttled: bool = False):
+        """Free a slot and adapt the limit to how the call went."""
+        now = time.monotonic()
+        with self._lock:
+            self._in_flight -= 1
+            overloaded = throttled or (latency_ms is not None and latency_ms > self.latency_target_ms)
+            if overloaded:
+                if (now - self._last_decrease) * 1000 >= self._latency_ewma_ms:
+                    self._limit = max(float(self.min_limit), self._limit * self.backoff_ratio)
+                    self._last_decrease = now
+            elif latency_ms is not None:
+                self._latency_ewma_ms = latency_ms if not self._latency_ewma_ms else (
+                    0.8 * self._latency_ewma_ms + 0.2 * latency_ms
+                )
+                self._limit = min(float(self.max_limit), self._limit + 1.0 / self._limit)
+            self._wake_waiters()
+
+
+# ─── Retry Policy ───────────────────────────────────
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Jittered exponential backoff; a server's Retry-After wins when present."""
+    max_retries: int = 2
+    base_delay_s: float = 0.5
+    max_delay_s: float = 30.0
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Seconds to wait before retry number `attempt` (0-based)."""
+        if retry_after is not None:
+            return min(retry_after, self.max_delay_s) + random.uniform(0, self.base_delay_s)
+        return random.uniform(0, min(self.max_delay_s, self.base_delay_s * (2 ** attempt)))
+
+
+def error_status(error: Exception) -> Optional[int]:
+    """HTTP status of an API error, if it carries one."""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status
+
+
+def is_retryable(error: Exception) -> bool:
+    """Throttling, timeouts, connection failures and 5xx are worth retrying."""
+    status = error_status(error)
+    if status is not None:
+        return status in RETRYABLE_STATUS_CODES or status >= 500
+    return type(error).__name__ in ("APIConnectionError", "APITimeoutError", "TimeoutError", "ConnectionError")
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Parse Retry-After / retry-after-ms from an API error's response headers."""
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return float(value) / 1000.0
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+
+# ─── Per-Model Limiter ──────────────────────────────
+
+class ModelRateLimiter:
+    """RPM + TPM buckets and an adaptive concurrency limit for one model."""
+
+    def __init__(
+        self,
+        model: str,
+        rpm: float = 500,
+        tpm: float = 200000,
+        concurrency: Optional[AdaptiveConcurrencyLimiter] = None
+    ):
+        self.model = model
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.concurrency = concurrency or AdaptiveConcurrencyLimiter()
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "throttled": 0, "retries": 0, "failures": 0, "queued_seconds": 0.0}
+
+    def _reserve(self, estimated_tokens: int) -> float:
+        return max(self.requests.reserve(1), self.tokens.reserve(estimated_tokens))
+
+    def acquire(self, estimated_tokens: int):
+        """Wait for RPM/TPM budget, then for a concurrency slot."""
+        start = time.monotonic()
+        wait = self._reserve(estimated_tokens)
+        if wait:
+            time.sleep(wait)
+        self.concurrency.acquire()
+        self._count("queued_seconds", time.monotonic() - start)
+
+    async def aacquire(self, estimated_tokens: int):
+        start = time.monotonic()
+        wait = self._reserve(estimated_tokens)
+        if wait:
+            await asyncio.sleep(wait)
+        await self.concurrency.aacquire()
+        self._count("queued_seconds", time.monotonic() - start)
+
+    def release(
+        self,
+        latency_ms: Optional[float] = None,
+        throttled: bool = False,
+        estimated_tokens: int = 0,
+        used_tokens: Optional[int] = None
+    ):
+        """Free the slot; correct the TPM bucket once real usage is known."""
+        if used_tokens is not None:
+            self.tokens.adjust(used_tokens - estimated_tokens)
+        self.concurrency.release(latency_ms, throttled)
+        self._count("calls")
+        if throttled:
+            self._count("throttled")
+
+    def _count(self, name: str, value: float = 1):
+        with self._lock:
+            self._stats[name] += value
+
+    def record_retry(self):
+        self._count("retries")
+
+    def record_failure(self):
+        self._count("failures")
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        return {
+            "model": self.model,
+            "concurrency_limit": self.concurrency.limit,
+            "in_flight": self.concurrency.in_flight,
+            "waiting": self.concurrency.waiting,
+            "rpm_available": round(self.requests.available, 2),
+            "tpm_available": round(self.tokens.available, 2),
+            **stats,
+            "queued_seconds": round(stats["queued_seconds"], 3),
+        }
+
+
+# ─── Registry ───────────────────────────────────────
+
+_limiters: dict[str, ModelRateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+def get_rate_limiter(model: str) -> ModelRateLimiter:
+    """Get or create the process-wide limiter for a model (LLM_RPM_LIMIT, LLM_TPM_LIMIT, ...)."""
+    limiter = _limiters.get(model)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.get(model)
+            if limiter is None:
+                limiter = _limiters[model] = ModelRateLimiter(
+                    model,
+                    rpm=float(os.getenv("LLM_RPM_LIMIT", "500")),
+                    tpm=float(os.getenv("LLM_TPM_LIMIT", "200000")),
+                    concurrency=AdaptiveConcurrencyLimiter(
+                        initial_limit=int(os.getenv("LLM_CONCURRENCY_INITIAL", "8")),
+                        min_limit=int(os.getenv("LLM_CONCURRENCY_MIN", "1")),
+                        max_limit=int(os.getenv("LLM_CONCURRENCY_MAX", "64")),
+                        latency_target_ms=float(os.getenv("LLM_LATENCY_TARGET_MS", "10000")),
+                    ),
+                )
+    return limiter
+
+
+def get_retry_policy() -> RetryPolicy:
+    return RetryPolicy(
+        max_retries=int(os.getenv("LLM_MAX_RETRIES", "2")),
+        base_delay_s=float(os.getenv("LLM_RETRY_BASE_DELAY", "0.5")),
+        max_delay_s=float(os.getenv("LLM_RETRY_MAX_DELAY", "30")),
+    )
+
+
+def rate_limiter_snapshot() -> list[dict]:
+    """State of every model limiter created so far."""
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return [limiter.snapshot() for limiter in limiters]
+
+
+def export_metrics(metrics) -> list[dict]:
+    """
+    Record every limiter's state as gauges on an instrumentation
+    MetricsCollector (tagged by model). Returns the snapshots.
+    """
+    snapshots = rate_limiter_snapshot()
+    for snapshot in snapshots:
+        tags = {"model": snapshot["model"]}
+        for name in ("concurrency_limit", "in_flight", "waiting", "rpm_available", "tpm_available"):
+            metrics.record_gauge(f"llm_rate_limiter_{name}", snapshot[name], tags=tags)
+        for name in ("calls", "throttled", "retries", "failures"):
+            metrics.record_gauge(f"llm_rate_limiter_{name}_total", snapshot[name], unit="count", tags=tags)
+    return snapshots
@@ -0,0 +1,104 @@
+"""
+InsureOps AI — Offline Token Counter
+Counts prompt tokens without a network call, for prompt budgets, simulated
+usage and rate-limiter estimates.
+
+The default counter is bundled: a regex pre-tokenizer modelled on the GPT
+BPE split pattern (words with their leading space, digit groups of up to
+three, punctuation runs, newlines), with long words and punctuation runs
+costing extra pieces. It approximates BPE counts without shipping a
+vocabulary file.
+
+Counts are memoized for the most recent texts (TOKEN_COUNT_CACHE_SIZE,
+default 256): the same system prompt and built prompt are counted several
+times per call (budgeting, simulated usage, rate-limiter estimates).
+
+Set PROMPT_TOKENIZER=tiktoken to use tiktoken instead (optional
+dependency; its encoding file must already be cached locally, e.g. under
+TIKTOKEN_CACHE_DIR). PROMPT_TOKENIZER_ENCODING picks the encoding.
+
+Usage:
+    count_tokens('{"covered":true,"deductible":500}')
+"""
+
+import functools
+import os
+import re
+import threading
+from typing import Callable, Optional
+
+
+_PRETOKENIZE = re.compile(
+    r"""'(?:[sdmt]|ll|ve|re)"""   # contractions
+    r"""| ?[^\W\d_]+"""           # words, with their leading space
+    r"""| ?\d{1,3}"""             # digits, in groups of up to three
+    r"""| ?[^\s\w]+[\r\n]*"""     # punctuation runs
+    r"""|\s*[\r\n]+"""            # newlines
+    r"""|\s+""",                  # other whitespace
+    re.IGNORECASE,
+)
+_WORD_CHARS_PER_TOKEN = 5
+_WORD_SINGLE_TOKEN_MAX = 8
+_PUNCT_CHARS_PER_TOKEN = 3
+
+
+def _piece_tokens(piece: str) -> int:
+    core = piece.strip()
+    if not core:
+        return 1
+    if core[0].isalpha():
+        return 1 + max(0, len(core) - _WORD_SINGLE_TOKEN_MAX + _WORD_CHARS_PER_TOKEN - 1) // _WORD_CHARS_PER_TOKEN
+    if core[0].isdigit() or core[0] == "'":
+        return 1
+    return -(-len(core) // _PUNCT_CHARS_PER_TOKEN)
+
+
+def _regex_count(text: str) -> int:
+    pieces = _PRETOKENIZE.findall(text)
+    # Short pieces are one token; only the rest need a closer look
+    return len(pieces) + sum(
+        _piece_tokens(p) - 1 for p in pieces if len(p) > _PUNCT_CHARS_PER_TOKEN
+    )
+
+
+def _load_counter() -> Callable[[str], int]:
+    if os.getenv("PROMPT_TOKENIZER", "regex").lower() != "tiktoken":
+        return _regex_count
+    try:
+        import tiktoken
+
+        encoding = tiktoken.get_encoding(os.getenv("PROMPT_TOKENIZER_ENCODING", "o200k_base"))
+        return lambda text: len(encoding.encode(text, disallowed_special=()))
+    except Exception as e:
+        print(f"⚠️ tiktoken unavailable ({e}), using the bundled token counter")
+        return _regex_count
+
+
+def _load_cached_counter() -> Callable[[str], int]:
+    size = int(os.getenv("TOKEN_COUNT_CACHE_SIZE", "256"))
+    counter = _load_counter()
+    return functools.lru_cache(maxsize=size)(counter) if size > 0 else counter
+
+
+_counter: Optional[Callable[[str], int]] = None
+_counter_lock = threading.Lock()
+
+def count_tokens(text: str) -> int:
+    """Number of tokens in `text` (0 for empty text)."""
+    global _counter
+    if not text:
+        return 0
+    if _counter is None:
+        with _counter_lock:
+            if _counter is None:
+                _counter = _load_cached_counter()
+    return _counter(text)
+
+
+def count_cache_stats() -> dict:
+    """Hits/misses of the count_tokens() memo (empty until first use or when disabled)."""
+    info = getattr(_counter, "cache_info", None)
+    if info is None:
+        return {}
+    stats = info()
+    return {"hits": stats.hits, "misses": stats.misses, "size": stats.currsize, "max_size": stats.maxsize}
@@ -1,5 +1,5 @@
 """Underwriting Risk Agent — __init__.py"""
 
-from agents.underwriting_agent.agent import run_underwriting_agent
+from agents.underwriting_agent.agent import run_underwriting_agent, arun_underwriting_agent, run_underwriting_agent_batch
 
-__all__ = ['run_underwriting_agent']
+__all__ = ['run_underwriting_agent', 'arun_underwriting_agent', 'run_underwriting_agent_batch']
@@ -12,23 +12,30 @@ A multi-step agent that assesses insurance applicant risk using:
 import json
 import os
 import random
-import time
-from typing import TypedDict, Optional
+from typing import TYPE_CHECKING, Iterable, Iterator, TypedDict, Optional
 from dotenv import load_dotenv
 
 from agents.base_agent import (
     TraceRecord, LLMCallRecord, ToolCallRecord, GuardrailResult,
-    DecisionRecord, Timer, calculate_cost, calculate_prompt_quality,
-    send_telemetry_to_backend, load_json_data
+    DecisionRecord, load_json_data, parse_llm_json
 )
+from agents.llm_gateway import get_llm_gateway
+from agents.model_cascade import arun_cascade, record_escalated_hops, resolve_cascade, run_cascade
+from agents.prompt_builder import BuiltPrompt, ToolSection, build_prompt
+from agents.tokenizer import count_tokens
+from agents.workflow import AgentWorkflow, WorkflowStep, LLMStepSpec, provisional_decision_recorder
 from agents.underwriting_agent.tools import (
-    risk_score_calculator, medical_risk_lookup, historical_data_check
+    risk_score_calculator, medical_risk_lookup, historical_data_check,
+    calculate_monthly_premium
 )
 from agents.underwriting_agent.prompts import (
     UNDERWRITING_SYSTEM_PROMPT,
     RISK_ASSESSMENT_PROMPT
 )
 
+if TYPE_CHECKING:
+    from agents.batch_runner import BatchResult
+
 load_dotenv(os.path.join(os.path.dirname(__file__), '..', '..', '.env'))
 
 
@@ -41,85 +48,70 @@ class UnderwritingState(TypedDict):
     historical_data: Optional[dict]
     llm_analysis: Optional[dict]
     guardrail_results: list
+    provisional_decision: Optional[dict]
     decision: Optional[dict]
     trace: Optional[TraceRecord]
 
 
 # ─── LLM Wrapper ────────────────────────────────────
 
-def call_llm(prompt: str, system_prompt: str = "", model: str = None) -> tuple[str, LLMCallRecord]:
-    """Call LLM via OpenRouter (OpenAI-compatible API) or simulation fallback."""
-    api_key = os.getenv("OPENROUTER_API_KEY", "")
-    model = model or os.getenv("OPENROUTER_MODEL", "openai/gpt-4o-mini")
-
-    with Timer() as timer:
-        if api_key and api_key != "your_openrouter_api_key_here":
-            try:
-                from openai import OpenAI
-
-                client = OpenAI(
-                    base_url="https://openrouter.ai/api/v1",
-                    api_key=api_key
-                )
-
-                messages = []
-                if system_prompt:
-                    messages.append({"role": "system", "content": system_prompt})
-                messages.append({"role": "user", "content": prompt})
-
-                response = client.chat.completions.create(
-                    model=model, messages=messages, temperature=0.2,
-                    response_format={"type": "json_object"}
-                )
-
-                response_text = response.choices[0].message.content
-                prompt_tokens = response.usage.prompt_tokens if response.usage else len(prompt.split()) * 2
-                completion_tokens = response.usage.completion_tokens if response.usage else len(response_text.split()) * 2
-            except Exception as e:
-                print(f"⚠️ LLM call failed, using simulation: {e}")
-                response_text, prompt_tokens, completion_tokens = _simulate_llm_response(prompt)
-        else:
-            response_text, prompt_tokens, completion_tokens = _simulate_llm_response(prompt)
-
-    cost = calculate_cost(prompt_tokens, completion_tokens, model)
-    quality = calculate_prompt_quality(prompt)
-
-    record = LLMCallRecord(
-        model=model, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens,
-        latency_ms=timer.elapsed_ms, cost_usd=cost, status="success",
-        prompt_quality=quality, prompt_text=prompt[:500], response_text=response_text[:500]
+LLM_TEMPERATURE = 0.2
+SIMULATED_LATENCY = (0.4, 1.5)  # seconds, simulation mode only (unless LLM_SIM_LATENCY is set)
+
+
+def call_llm(prompt: str, system_prompt: str = "", model: str = None,
+             on_decision=None) -> tuple[str, LLMCallRecord]:
+    """Call LLM via the shared gateway (OpenRouter) or simulation fallback."""
+    return get_llm_gateway().complete(
+        prompt, system_prompt,
+        model=model,
+        temperature=LLM_TEMPERATURE,
+        simulator=_simulate_llm_response,
+        simulated_latency=SIMULATED_LATENCY,
+        on_decision=on_decision
     )
-    return response_text, record
 
 
-def _simulate_llm_response(prompt: str) -> tuple[str, int, int]:
-    """Simulate underwriting LLM response."""
-    time.sleep(random.uniform(0.4, 1.5))
+async def acall_llm(prompt: str, system_prompt: str = "", model: str = None,
+                    on_decision=None) -> tuple[str, LLMCallRecord]:
+    """Async call_llm — awaits the LLM (or simulated latency) without blocking the event loop."""
+    return await get_llm_gateway().acomplete(
+        prompt, system_prompt,
+        model=model,
+        temperature=LLM_TEMPERATURE,
+        simulator=_simulate_llm_response,
+        simulated_latency=SIMULATED_LATENCY,
+        on_decision=on_decision
+    )
+
 
-    prompt_tokens = len(prompt.split()) * 2
-    completion_tokens = random.randint(200, 450)
+def _simulate_llm_response(prompt: str, rng: Optional[random.Random] = None) -> tuple[str, int, int]:
+    """Simulate underwriting LLM response."""
+    rng = rng or random.Random()
+    prompt_tokens = count_tokens(prompt)
+    completion_tokens = rng.randint(200, 450)
     prompt_lower = prompt.lower()
 
     # Determine decision from risk score in prompt
     if "auto_reject" in prompt_lower or "very_high" in prompt_lower:
         decision = "rejected"
-        confidence = round(random.uniform(0.82, 0.95), 2)
+        confidence = round(rng.uniform(0.82, 0.95), 2)
         reasoning = "Applicant's composite risk score exceeds acceptable threshold. Multiple severe risk factors present."
         premium = 0
     elif "auto_approve" in prompt_lower:
         decision = "approved"
-        confidence = round(random.uniform(0.85, 0.95), 2)
+        confidence = round(rng.uniform(0.85, 0.95), 2)
         reasoning = "Low risk profile. All health, occupational, and demographic factors within acceptable ranges."
-        premium = random.randint(80, 200)
+        premium = rng.randint(80, 200)
     else:
         decision = "escalated"
-        confidence = round(random.uniform(0.60, 0.80), 2)
+        confidence = round(rng.uniform(0.60, 0.80), 2)
         reasoning = "Moderate risk factors require senior underwriter review. Special conditions may apply."
-        premium = random.randint(150, 400)
+        premium = rng.randint(150, 400)
 
     response = json.dumps({
         "decision": decision, "confidence": confidence, "reasoning": reasoning,
-        "risk_score": round(random.uniform(0.1, 0.9), 2),
+        "risk_score": round(rng.uniform(0.1, 0.9), 2),
         "premium_monthly": premium,
         "risk_factors": ["See tool analysis for complete breakdown"],
         "conditions": ["Standard medical exam required"] if decision == "escalated" else [],
@@ -159,37 +151,45 @@ def step_historical_data(state: UnderwritingState) -> UnderwritingState:
     return state
 
 
-def step_llm_assessment(state: UnderwritingState) -> UnderwritingState:
-    """Step 4: LLM performs comprehensive risk assessment."""
-    applicant = state["applicant_data"]
+# Tool result fields in the order they matter to the assessment (see prompt_builder.py)
+RISK_SCORE_FIELD_PRIORITY = ("risk_score", "recommendation", "breakdown")
+MEDICAL_RISK_FIELD_PRIORITY = (
+    "overall_medical_risk", "requires_medical_exam", "conditions_analyzed", "total_severity_score", "details"
+)
+HISTORICAL_FIELD_PRIORITY = (
+    "historical_risk", "demographic_claim_rate", "benchmark_rate", "above_benchmark", "recommendation", "lookup_key"
+)
 
-    prompt = RISK_ASSESSMENT_PROMPT.format(
-        applicant_id=applicant.get("id", "N/A"),
-        name=applicant.get("name", "N/A"),
-        age=applicant.get("age", 0),
-        gender=applicant.get("gender", "N/A"),
-        bmi=applicant.get("bmi", 0),
-        smoker="Yes" if applicant.get("smoker") else "No",
-        occupation=applicant.get("occupation", "N/A"),
-        occupation_risk_class=applicant.get("occupation_risk_class", "N/A"),
-        health_conditions=", ".join(applicant.get("health_conditions", [])) or "None",
-        coverage_amount=applicant.get("coverage_amount", 0),
-        risk_score_result=json.dumps(state.get("risk_score_data", {}), indent=2)[:400],
-        medical_risk_result=json.dumps(state.get("medical_risk_data", {}), indent=2)[:400],
-        historical_data_result=json.dumps(state.get("historical_data", {}), indent=2)[:300]
-    )
 
-    response_text, llm_record = call_llm(prompt, UNDERWRITING_SYSTEM_PROMPT)
+def _build_analysis_prompt(state: UnderwritingState) -> BuiltPrompt:
+    """Format the assessment prompt, fitting each tool result to its token budget."""
+    applicant = state["applicant_data"]
+
+    return build_prompt(RISK_ASSESSMENT_PROMPT, {
+        "applicant_id": applicant.get("id", "N/A"),
+        "name": applicant.get("name", "N/A"),
+        "age": applicant.get("age", 0),
+        "gender": applicant.get("gender", "N/A"),
+        "bmi": applicant.get("bmi", 0),
+        "smoker": "Yes" if applicant.get("smoker") else "No",
+        "occupation": applicant.get("occupation", "N/A"),
+        "occupation_risk_class": applicant.get("occupation_risk_class", "N/A"),
+        "health_conditions": ", ".join(applicant.get("health_conditions", [])) or "None",
+        "coverage_amount": applicant.get("coverage_amount", 0),
+    }, [
+        ToolSection("risk_score_result", state.get("risk_score_data"), 130, RISK_SCORE_FIELD_PRIORITY),
+        ToolSection("medical_risk_result", state.get("medical_risk_data"), 110, MEDICAL_RISK_FIELD_PRIORITY),
+        ToolSection("historical_data_result", state.get("historical_data"), 70, HISTORICAL_FIELD_PRIORITY,
+                    legacy_chars=300),
+    ], system_prompt=UNDERWRITING_SYSTEM_PROMPT)
+
+
+def _apply_analysis(state: UnderwritingState, response_text: str, llm_record: LLMCallRecord) -> UnderwritingState:
+    """Record the LLM call and parse its JSON analysis into state."""
     state["trace"].llm_calls.append(llm_record)
 
-    try:
-        json_match = response_text
-        if "```json" in response_text:
-            json_match = response_text.split("```json")[1].split("```")[0]
-        elif "```" in response_text:
-            json_match = response_text.split("```")[1].split("```")[0]
-        analysis = json.loads(json_match.strip())
-    except (json.JSONDecodeError, IndexError):
+    analysis = parse_llm_json(response_text)
+    if analysis is None:
         analysis = {
             "decision": "escalated", "confidence": 0.55, "risk_score": 0.5,
             "reasoning": "Unable to parse LLM response. Escalating for manual review.",
@@ -201,32 +201,62 @@ def step_llm_assessment(state: UnderwritingState) -> UnderwritingState:
     return state
 
 
-def step_guardrails(state: UnderwritingState) -> UnderwritingState:
-    """Step 5: Run bias and compliance guardrail checks."""
-    analysis = state.get("llm_analysis", {})
-    state["guardrail_results"] = []
+def step_llm_assessment(state: UnderwritingState) -> UnderwritingState:
+    """Step 4: LLM performs comprehensive risk assessment (via the model cascade)."""
+    prompt = _build_analysis_prompt(state)
+    response_text, hops = run_cascade(
+        resolve_cascade("underwriting"),
+        lambda model: call_llm(prompt.text, UNDERWRITING_SYSTEM_PROMPT, model,
+                               on_decision=provisional_decision_recorder(state)),
+        lambda analysis: check_guardrails(state["applicant_data"], analysis)
+    )
+    llm_record = record_escalated_hops(state["trace"], hops, prompt.tokens_saved)
+    return _apply_analysis(state, response_text, llm_record)
+
+
+async def astep_llm_assessment(state: UnderwritingState) -> UnderwritingState:
+    """Async step_llm_assessment: awaits the LLM call."""
+    prompt = _build_analysis_prompt(state)
+    response_text, hops = await arun_cascade(
+        resolve_cascade("underwriting"),
+        lambda model: acall_llm(prompt.text, UNDERWRITING_SYSTEM_PROMPT, model,
+                                on_decision=provisional_decision_recorder(state)),
+        lambda analysis: check_guardrails(state["applicant_data"], analysis)
+    )
+    llm_record = record_escalated_hops(state["trace"], hops, prompt.tokens_saved)
+    return _apply_analysis(state, response_text, llm_record)
+
+
+def check_guardrails(applicant: dict, analysis: dict) -> list[GuardrailResult]:
+    """Bias and compliance checks on an LLM assessment (also used by the model cascade)."""
+    results = []
 
     # Bias check
     reasoning = analysis.get("reasoning", "").lower()
     bias_detected = any(term in reasoning for term in [
         "gender", "race", "ethnicity", "religion", "orientation"
     ])
-    state["guardrail_results"].append(GuardrailResult(
+    results.append(GuardrailResult(
         check_type="bias", passed=not bias_detected,
         details="No bias indicators in underwriting decision" if not bias_detected else "Potential bias detected — review required"
     ))
-    state["trace"].guardrails.append(state["guardrail_results"][-1])
 
     # Compliance check
     compliance_passed = True
     if analysis.get("decision") == "rejected" and analysis.get("confidence", 0) < 0.7:
         compliance_passed = False
-    state["guardrail_results"].append(GuardrailResult(
+    results.append(GuardrailResult(
         check_type="compliance", passed=compliance_passed,
         details="Decision meets regulatory compliance standards" if compliance_passed else "Low-confidence rejection may require additional justification"
     ))
-    state["trace"].guardrails.append(state["guardrail_results"][-1])
 
+    return results
+
+
+def step_guardrails(state: UnderwritingState) -> UnderwritingState:
+    """Step 5: Run bias and compliance guardrail checks."""
+    state["guardrail_results"] = check_guardrails(state["applicant_data"], state.get("llm_analysis", {}))
+    state["trace"].guardrails.extend(state["guardrail_results"])
     return state
 
 
@@ -247,16 +277,11 @@ def step_finalize(state: UnderwritingState) -> UnderwritingState:
         reasoning = analysis.get("reasoning", "")
 
     # Calculate premium
-    guidelines = load_json_data("underwriting_guidelines.json")
-    premium_config = guidelines["premium_calculation"]
     coverage = applicant.get("coverage_amount", 0)
     risk_score = risk_data.get("risk_score", 0.5)
 
     if decision_type != "rejected":
-        base_premium = (coverage / 1000) * premium_config["base_rate_per_1000"]
-        adjusted_premium = base_premium * (1 + risk_score * premium_config["risk_premium_multiplier"])
-        monthly_premium = max(adjusted_premium / 12, premium_config["min_premium_monthly"])
-        monthly_premium = min(monthly_premium, base_premium / 12 * premium_config["max_premium_multiplier"])
+        monthly_premium = calculate_monthly_premium(coverage, risk_score)
     else:
         monthly_premium = 0
 
@@ -282,56 +307,96 @@ def step_finalize(state: UnderwritingState) -> UnderwritingState:
 
 # ─── Main Agent Runner ──────────────────────────────
 
-def run_underwriting_agent(applicant_data: dict, send_telemetry: bool = True) -> dict:
-    """Run the Underwriting Risk Agent on a single applicant."""
-    print(f"\n📋 Underwriting Agent — Assessing: {applicant_data.get('name', 'N/A')}")
-    print(f"   Age: {applicant_data.get('age')}, Occupation: {applicant_data.get('occupation')}")
-    print(f"   Coverage: ${applicant_data.get('coverage_amount', 0):,.2f}")
-
-    trace = TraceRecord(agent_type="underwriting")
-    state: UnderwritingState = {
+def _initial_state(applicant_data: dict) -> UnderwritingState:
+    return {
         "applicant_data": applicant_data, "risk_score_data": None,
         "medical_risk_data": None, "historical_data": None,
-        "llm_analysis": None, "guardrail_results": [], "decision": None,
-        "trace": trace
+        "llm_analysis": None, "guardrail_results": [],
+        "provisional_decision": None, "decision": None,
+        "trace": TraceRecord(agent_type="underwriting")
     }
 
-    steps = [
-        ("Risk Score Calculation", step_risk_score),
-        ("Medical Risk Lookup", step_medical_risk),
-        ("Historical Data Check", step_historical_data),
-        ("LLM Risk Assessment", step_llm_assessment),
-        ("Guardrail Checks", step_guardrails),
-        ("Finalize Decision", step_finalize),
-    ]
-
-    for step_name, step_fn in steps:
-        try:
-            print(f"   → {step_name}...")
-            state = step_fn(state)
-        except Exception as e:
-            print(f"   ❌ Error in {step_name}: {e}")
-            trace.status = "error"
-            trace.output_data = {"error": str(e), "failed_step": step_name}
-            break
-
-    decision = state.get("decision", {})
-    print(f"\n   ✅ Decision: {decision.get('decision_type', 'N/A').upper()}")
-    print(f"   📊 Confidence: {decision.get('confidence', 0):.0%}")
-    print(f"   ⏱️  Latency: {trace.total_latency_ms}ms")
-    print(f"   💰 Cost: ${trace.total_cost_usd:.6f}")
-
-    if send_telemetry:
-        send_telemetry_to_backend(trace)
 
+def _print_header(applicant_data: dict):
+    print(f"\n📋 Underwriting Agent — Assessing: {applicant_data.get('name', 'N/A')}")
+    print(f"   Age: {applicant_data.get('age')}, Occupation: {applicant_data.get('occupation')}")
+    print(f"   Coverage: ${applicant_data.get('coverage_amount', 0):,.2f}")
+
+
+def _build_result(state: UnderwritingState) -> dict:
+    trace = state["trace"]
     return {
-        "trace_id": trace.trace_id, "decision": decision,
+        "trace_id": trace.trace_id, "decision": state.get("decision") or {},
         "trace": trace.model_dump(), "risk_score": state.get("risk_score_data", {})
     }
 
 
+UNDERWRITING_WORKFLOW = AgentWorkflow(
+    "underwriting",
+    (
+        WorkflowStep("Risk Score Calculation", step_risk_score,
+                     inputs=("applicant_data",), outputs=("risk_score_data",)),
+        WorkflowStep("Medical Risk Lookup", step_medical_risk,
+                     inputs=("applicant_data",), outputs=("medical_risk_data",)),
+        WorkflowStep("Historical Data Check", step_historical_data,
+                     inputs=("applicant_data",), outputs=("historical_data",)),
+        WorkflowStep("LLM Risk Assessment", step_llm_assessment, astep_llm_assessment),
+        WorkflowStep("Guardrail Checks", step_guardrails),
+        WorkflowStep("Finalize Decision", step_finalize),
+    ),
+    initial_state=_initial_state,
+    build_result=_build_result,
+    llm=LLMStepSpec(
+        step_name="LLM Risk Assessment",
+        system_prompt=UNDERWRITING_SYSTEM_PROMPT,
+        temperature=LLM_TEMPERATURE,
+        build_prompt=_build_analysis_prompt,
+        apply_response=_apply_analysis,
+        simulator=_simulate_llm_response
+    )
+)
+
+
+def run_underwriting_agent(applicant_data: dict, send_telemetry: bool = True, verbose: bool = True) -> dict:
+    """Run the Underwriting Risk Agent on a single applicant."""
+    if verbose:
+        _print_header(applicant_data)
+    state = UNDERWRITING_WORKFLOW.execute(_initial_state(applicant_data), send_telemetry, verbose)
+    return _build_result(state)
+
+
+async def arun_underwriting_agent(applicant_data: dict, send_telemetry: bool = True, verbose: bool = False) -> dict:
+    """Async run_underwriting_agent — awaits the LLM call and telemetry."""
+    if verbose:
+        _print_header(applicant_data)
+    state = await UNDERWRITING_WORKFLOW.aexecute(_initial_state(applicant_data), send_telemetry, verbose)
+    return _build_result(state)
+
+
+def run_underwriting_agent_batch(
+    applicants: Iterable[dict],
+    workers: int = 4,
+    mode: str = "thread",
+    send_telemetry: bool = False,
+    max_pending: Optional[int] = None
+) -> Iterator["BatchResult"]:
+    """
+    Run the agent over many applicants on a thread or process pool, yielding
+    results as they complete (see agents.batch_runner.run_agent_batch).
+    """
+    from agents.batch_runner import run_agent_batch
+    return run_agent_batch("underwriting", applicants, workers, mode, send_telemetry, max_pending)
+
+
 if __name__ == "__main__":
-    applicants = load_json_data("sample_applicants.json")
-    result = run_underwriting_agent(applicants[0], send_telemetry=False)
-    print(f"\n📋 Full Result:")
-    print(json.dumps(result["decision"], indent=2))
+    import sys
+
+    # With arguments: JSONL batch mode (python -m agents.underwriting_agent.agent --input records.jsonl --workers 8)
+    if len(sys.argv) > 1:
+        from agents.batch_runner import batch_main
+        batch_main("underwriting")
+    else:
+        applicants = load_json_data("sample_applicants.json")
+        result = run_underwriting_agent(applicants[0], send_telemetry=False)
+        print(f"\n📋 Full Result:")
+        print(json.dumps(result["decision"], indent=2))
@@ -24,7 +24,23 @@ COMPLIANCE REQUIREMENTS:
 - Document all risk factors contributing to the decision
 - Justify premium adjustments with actuarial data"""
 
-RISK_ASSESSMENT_PROMPT = """Assess the following insurance applicant's risk profile and provide an underwriting decision.
+# Static instructions first and per-applicant data last, so every call
+# shares the same prompt prefix (provider prompt caching)
+RISK_ASSESSMENT_INSTRUCTIONS = """Assess the following insurance applicant's risk profile and provide an underwriting decision.
+
+Base your assessment on the applicant details and tool analysis results below, and respond in the following JSON format:
+{{
+    "decision": "approved" | "rejected" | "escalated",
+    "confidence": 0.0 to 1.0,
+    "reasoning": "Detailed explanation of the underwriting decision",
+    "risk_score": 0.0 to 1.0,
+    "premium_monthly": suggested monthly premium amount,
+    "risk_factors": ["list of significant risk factors"],
+    "conditions": ["any special conditions or riders"],
+    "compliance_notes": "regulatory compliance notes"
+}}"""
+
+RISK_ASSESSMENT_PROMPT = RISK_ASSESSMENT_INSTRUCTIONS + """
 
 APPLICANT DETAILS:
 - Applicant ID: {applicant_id}
@@ -41,19 +57,7 @@ APPLICANT DETAILS:
 TOOL ANALYSIS RESULTS:
 - Risk Score: {risk_score_result}
 - Medical Risk: {medical_risk_result}
-- Historical Data: {historical_data_result}
-
-Based on the above information, provide your assessment in the following JSON format:
-{{
-    "decision": "approved" | "rejected" | "escalated",
-    "confidence": 0.0 to 1.0,
-    "reasoning": "Detailed explanation of the underwriting decision",
-    "risk_score": 0.0 to 1.0,
-    "premium_monthly": suggested monthly premium amount,
-    "risk_factors": ["list of significant risk factors"],
-    "conditions": ["any special conditions or riders"],
-    "compliance_notes": "regulatory compliance notes"
-}}"""
+- Historical Data: {historical_data_result}"""
 
 GUARDRAIL_BIAS_PROMPT = """Review the following underwriting decision for potential bias.
 Check for discrimination based on: race, ethnicity, national origin, religion,
@@ -0,0 +1,170 @@
+"""
+Underwriting Risk Agent — Compiled Risk Model
+Compiles underwriting_guidelines.json once into an immutable RiskModel with
+bisect-ready age/BMI breakpoints, interned condition codes with precomputed
+multipliers and severity scores, and flattened decision/premium thresholds.
+All underwriting tools and the premium calculation share one instance.
+"""
+
+import sys
+import threading
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Mapping, Optional
+
+from agents.data_repository import FrozenDict, get_data_repository
+
+
+SEVERITY_SCORES = FrozenDict({"minimal": 1, "low": 2, "medium": 3, "high": 4, "very_high": 5})
+
+_DEFAULT_BASE_RISK = 0.20
+
+
+@dataclass(frozen=True)
+class ConditionRisk:
+    """Precomputed risk data for one medical condition code."""
+    code: str
+    description: str
+    severity: str
+    multiplier: float
+    severity_score: int
+
+
+@dataclass(frozen=True)
+class RiskModel:
+    """Immutable, table-driven view of the underwriting guidelines."""
+    # Age: bracket i covers [age_lower_bounds[i], age_lower_bounds[i+1])
+    age_lower_bounds: tuple
+    age_labels: tuple
+    age_base_risks: tuple
+    # BMI: category i covers [bmi_lower_bounds[i], bmi_upper_bounds[i])
+    bmi_lower_bounds: tuple
+    bmi_upper_bounds: tuple
+    bmi_categories: tuple
+    bmi_multipliers: tuple
+    conditions: Mapping[str, ConditionRisk]
+    occupation_multipliers: Mapping[str, float]
+    smoker_multiplier: float
+    high_value_threshold: float
+    auto_approve_max_risk: float
+    escalation_min_risk: float
+    auto_reject_min_risk: float
+    base_rate_per_1000: float
+    risk_premium_multiplier: float
+    min_premium_monthly: float
+    max_premium_multiplier: float
+    historical_claim_rates: Mapping[str, float]
+    default_claim_rate: float
+
+    # ─── Lookups ─────────────────────────────────────
+
+    def age_bracket(self, age: float) -> tuple[str, float]:
+        """Return (bracket label, base risk) for an age."""
+        idx = max(bisect_right(self.age_lower_bounds, age) - 1, 0)
+        return self.age_labels[idx], self.age_base_risks[idx]
+
+    def bmi_category(self, bmi: float) -> tuple[str, float]:
+        """Return (category, multiplier) for a BMI, defaulting to normal/1.0."""
+        idx = bisect_right(self.bmi_lower_bounds, bmi) - 1
+        if idx >= 0 and bmi < self.bmi_upper_bounds[idx]:
+            return self.bmi_categories[idx], self.bmi_multipliers[idx]
+        return "normal", 1.0
+
+    def condition(self, code: str) -> Optional[ConditionRisk]:
+        return self.conditions.get(code)
+
+    def occupation_multiplier(self, risk_class: str) -> float:
+        return self.occupation_multipliers.get(risk_class, 1.0)
+
+    def recommendation(self, risk_score: float) -> str:
+        if risk_score <= self.auto_approve_max_risk:
+            return "auto_approve"
+        elif risk_score >= self.auto_reject_min_risk:
+            return "auto_reject"
+        return "manual_review"
+
+    def historical_claim_rate(self, occupation: str, age_bracket: str) -> tuple[str, float]:
+        """Return (lookup key, demographic claim rate)."""
+        lookup_key = f"{occupation}_{age_bracket}"
+        return lookup_key, self.historical_claim_rates.get(lookup_key, self.default_claim_rate)
+
+    def monthly_premium(self, coverage_amount: float, risk_score: float) -> float:
+        """Monthly premium for an accepted applicant (unrounded)."""
+        base_premium = (coverage_amount / 1000) * self.base_rate_per_1000
+        adjusted_premium = base_premium * (1 + risk_score * self.risk_premium_multiplier)
+        monthly_premium = max(adjusted_premium / 12, self.min_premium_monthly)
+        return min(monthly_premium, base_premium / 12 * self.max_premium_multiplier)
+
+
+# ─── Compilation ─────────────────────────────────────
+
+def _age_lower_bound(label: str) -> float:
+    """Parse '18-25' -> 18 and '66+' -> 66."""
+    return float(label.rstrip("+").split("-")[0])
+
+
+def compile_risk_model(guidelines: Mapping) -> RiskModel:
+    """Compile a parsed underwriting_guidelines.json into a RiskModel."""
+    risk_factors = guidelines["risk_factors"]
+
+    brackets = sorted(risk_factors["age_brackets"].items(), key=lambda kv: _age_lower_bound(kv[0]))
+    bmi = sorted(risk_factors["bmi_thresholds"].items(), key=lambda kv: kv[1]["range"][0])
+
+    conditions = FrozenDict({
+        sys.intern(code): ConditionRisk(
+            code=sys.intern(code),
+            description=info["description"],
+            severity=info["severity"],
+            multiplier=info["risk_multiplier"],
+            severity_score=SEVERITY_SCORES.get(info["severity"], 2),
+        )
+        for code, info in risk_factors["medical_conditions"].items()
+    })
+
+    thresholds = guidelines["decision_thresholds"]
+    premium = guidelines["premium_calculation"]
+    historical = guidelines["historical_claim_rates"]
+
+    return RiskModel(
+        age_lower_bounds=tuple(_age_lower_bound(label) for label, _ in brackets),
+        age_labels=tuple(label for label, _ in brackets),
+        age_base_risks=tuple(info.get("base_risk", _DEFAULT_BASE_RISK) for _, info in brackets),
+        bmi_lower_bounds=tuple(info["range"][0] for _, info in bmi),
+        bmi_upper_bounds=tuple(info["range"][1] for _, info in bmi),
+        bmi_categories=tuple(category for category, _ in bmi),
+        bmi_multipliers=tuple(info["multiplier"] for _, info in bmi),
+        conditions=conditions,
+        occupation_multipliers=FrozenDict({
+            sys.intern(name): info["risk_multiplier"]
+            for name, info in risk_factors["occupation_risk_classes"].items()
+        }),
+        smoker_multiplier=risk_factors["smoker_multiplier"],
+        high_value_threshold=guidelines["coverage_limits"]["high_value_threshold"],
+        auto_approve_max_risk=thresholds["auto_approve_max_risk"],
+        escalation_min_risk=thresholds["escalation_min_risk"],
+        auto_reject_min_risk=thresholds["auto_reject_min_risk"],
+        base_rate_per_1000=premium["base_rate_per_1000"],
+        risk_premium_multiplier=premium["risk_premium_multiplier"],
+        min_premium_monthly=premium["min_premium_monthly"],
+        max_premium_multiplier=premium["max_premium_multiplier"],
+        historical_claim_rates=historical,
+        default_claim_rate=historical.get("default", 0.15),
+    )
+
+
+# Singleton instance — recompiled when the guidelines file changes on disk
+_model: Optional[RiskModel] = None
+_model_version = 0
+_model_lock = threading.Lock()
+
+def get_risk_model() -> RiskModel:
+    """Get the RiskModel compiled from the current underwriting guidelines."""
+    global _model, _model_version
+    repo = get_data_repository()
+    version = repo.version("underwriting_guidelines.json")
+    if _model is None or version != _model_version:
+        with _model_lock:
+            if _model is None or version != _model_version:
+                _model = compile_risk_model(repo.get("underwriting_guidelines.json"))
+                _model_version = version
+    return _model
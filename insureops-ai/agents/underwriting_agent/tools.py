@@ -1,38 +1,22 @@
 """
 Underwriting Risk Agent — Tools
 Deterministic tools: risk_score_calculator, medical_risk_lookup, historical_data_check.
+Batch variants (risk_score_calculator_batch, calculate_monthly_premium_batch)
+re-rate whole portfolios in vectorized NumPy form.
 """
 
-from agents.base_agent import load_json_data, ToolCallRecord, Timer
+from agents.base_agent import ToolCallRecord, Timer, round_values
+from agents.underwriting_agent.risk_model import get_risk_model
 
 
 def _get_age_bracket(age: int) -> str:
     """Map age to the correct bracket string."""
-    if age < 26:
-        return "18-25"
-    elif age < 36:
-        return "26-35"
-    elif age < 46:
-        return "36-45"
-    elif age < 56:
-        return "46-55"
-    elif age < 66:
-        return "56-65"
-    else:
-        return "66+"
+    return get_risk_model().age_bracket(age)[0]
 
 
 def _get_bmi_category(bmi: float) -> tuple[str, float]:
     """Get BMI category and multiplier."""
-    guidelines = load_json_data("underwriting_guidelines.json")
-    thresholds = guidelines["risk_factors"]["bmi_thresholds"]
-
-    for category, info in thresholds.items():
-        low, high = info["range"]
-        if low <= bmi < high:
-            return category, info["multiplier"]
-
-    return "normal", 1.0
+    return get_risk_model().bmi_category(bmi)
 
 
 def risk_score_calculator(applicant: dict) -> tuple[dict, ToolCallRecord]:
@@ -41,8 +25,7 @@ def risk_score_calculator(applicant: dict) -> tuple[dict, ToolCallRecord]:
     using the underwriting guidelines (age, health, occupation, BMI, smoker).
     """
     with Timer() as timer:
-        guidelines = load_json_data("underwriting_guidelines.json")
-        risk_factors = guidelines["risk_factors"]
+        model = get_risk_model()
 
         age = applicant.get("age", 30)
         health_conditions = applicant.get("health_conditions", [])
@@ -52,50 +35,41 @@ def risk_score_calculator(applicant: dict) -> tuple[dict, ToolCallRecord]:
         coverage_amount = applicant.get("coverage_amount", 0)
 
         # Base risk from age
-        age_bracket = _get_age_bracket(age)
-        age_info = risk_factors["age_brackets"].get(age_bracket, {"base_risk": 0.20})
-        base_risk = age_info["base_risk"]
+        age_bracket, base_risk = model.age_bracket(age)
 
         # Medical condition risk
         medical_multiplier = 1.0
         condition_details = []
         for condition in health_conditions:
-            if condition in risk_factors["medical_conditions"]:
-                cond = risk_factors["medical_conditions"][condition]
-                medical_multiplier *= cond["risk_multiplier"]
+            cond = model.condition(condition)
+            if cond is not None:
+                medical_multiplier *= cond.multiplier
                 condition_details.append({
-                    "condition": cond["description"],
-                    "severity": cond["severity"],
-                    "multiplier": cond["risk_multiplier"]
+                    "condition": cond.description,
+                    "severity": cond.severity,
+                    "multiplier": cond.multiplier
                 })
 
         # Occupation risk
-        occ_class = risk_factors["occupation_risk_classes"].get(occupation_risk_class, {"risk_multiplier": 1.0})
-        occupation_multiplier = occ_class["risk_multiplier"]
+        occupation_multiplier = model.occupation_multiplier(occupation_risk_class)
 
         # Smoker
-        smoker_multiplier = risk_factors["smoker_multiplier"] if smoker else 1.0
+        smoker_multiplier = model.smoker_multiplier if smoker else 1.0
 
         # BMI
-        bmi_category, bmi_multiplier = _get_bmi_category(bmi)
+        bmi_category, bmi_multiplier = model.bmi_category(bmi)
 
         # Calculate composite score (capped at 1.0)
         composite_risk = base_risk * medical_multiplier * occupation_multiplier * smoker_multiplier * bmi_multiplier
         risk_score = min(composite_risk, 1.0)
 
         # High coverage increases risk assessment
-        high_value = guidelines["coverage_limits"]["high_value_threshold"]
+        high_value = model.high_value_threshold
         if coverage_amount > high_value:
             risk_score = min(risk_score * 1.15, 1.0)
 
         # Decision thresholds
-        thresholds = guidelines["decision_thresholds"]
-        if risk_score <= thresholds["auto_approve_max_risk"]:
-            recommendation = "auto_approve"
-        elif risk_score >= thresholds["auto_reject_min_risk"]:
-            recommendation = "auto_reject"
-        else:
-            recommendation = "manual_review"
+        recommendation = model.recommendation(risk_score)
 
         result = {
             "risk_score": round(risk_score, 4),
@@ -130,17 +104,15 @@ def medical_risk_lookup(health_conditions: list, age: int) -> tuple[dict, ToolCa
     Provides age-adjusted risk notes and recommendations.
     """
     with Timer() as timer:
-        guidelines = load_json_data("underwriting_guidelines.json")
-        conditions_db = guidelines["risk_factors"]["medical_conditions"]
+        model = get_risk_model()
 
         results = []
         total_severity_score = 0
 
         for condition in health_conditions:
-            if condition in conditions_db:
-                cond = conditions_db[condition]
-                severity_scores = {"minimal": 1, "low": 2, "medium": 3, "high": 4, "very_high": 5}
-                sev_score = severity_scores.get(cond["severity"], 2)
+            cond = model.condition(condition)
+            if cond is not None:
+                sev_score = cond.severity_score
 
                 # Age adjustment — older applicants with conditions get higher risk
                 if age > 50:
@@ -151,9 +123,9 @@ def medical_risk_lookup(health_conditions: list, age: int) -> tuple[dict, ToolCa
                 total_severity_score += sev_score
 
                 results.append({
-                    "condition": cond["description"],
-                    "severity": cond["severity"],
-                    "risk_multiplier": cond["risk_multiplier"],
+                    "condition": cond.description,
+                    "severity": cond.severity,
+                    "risk_multiplier": cond.multiplier,
                     "age_adjusted_severity": min(sev_score, 7),
                     "notes": f"{'Elevated concern' if sev_score >= 4 else 'Manageable'} for age {age}"
                 })
@@ -185,16 +157,14 @@ def historical_data_check(applicant: dict) -> tuple[dict, ToolCallRecord]:
     Simulates actuarial database lookup.
     """
     with Timer() as timer:
-        guidelines = load_json_data("underwriting_guidelines.json")
-        historical_rates = guidelines["historical_claim_rates"]
+        model = get_risk_model()
 
         age = applicant.get("age", 30)
         age_bracket = _get_age_bracket(age)
         occupation = applicant.get("occupation", "default")
 
         # Look up matching historical rate
-        lookup_key = f"{occupation}_{age_bracket}"
-        claim_rate = historical_rates.get(lookup_key, historical_rates.get("default", 0.15))
+        lookup_key, claim_rate = model.historical_claim_rate(occupation, age_bracket)
 
         # Risk assessment based on claim rate
         if claim_rate < 0.12:
@@ -224,3 +194,159 @@ def historical_data_check(applicant: dict) -> tuple[dict, ToolCallRecord]:
     )
 
     return result, record
+
+
+def calculate_monthly_premium(coverage_amount: float, risk_score: float) -> float:
+    """Risk-adjusted monthly premium, clamped to the guideline min/max."""
+    return get_risk_model().monthly_premium(coverage_amount, risk_score)
+
+
+# ─── Batch (Portfolio) Scoring ───────────────────────
+
+def _batch_column(applicants, name: str, default, size: int):
+    """Pull one column from a dict of arrays or an Arrow table as a NumPy array."""
+    import numpy as np
+
+    if hasattr(applicants, "column_names"):  # pyarrow.Table
+        if name not in applicants.column_names:
+            return np.full(size, default)
+        return applicants.column(name).to_numpy(zero_copy_only=False)
+    if name not in applicants:
+        return np.full(size, default)
+    return np.asarray(applicants[name])
+
+
+def _batch_conditions(applicants, size: int):
+    """Return (offsets, flat condition codes) for the health_conditions column."""
+    import numpy as np
+
+    if hasattr(applicants, "column_names") and "health_conditions" in applicants.column_names:
+        column = applicants.column("health_conditions").combine_chunks()
+        return column.offsets.to_numpy(), column.values.to_pylist()
+
+    rows = None if hasattr(applicants, "column_names") else applicants.get("health_conditions")
+    if rows is None:
+        return np.zeros(size + 1, dtype=np.int64), []
+    lengths = [len(r) if r is not None else 0 for r in rows]
+    offsets = np.zeros(size + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    return offsets, [code for r in rows if r is not None for code in r]
+
+
+def _batch_size(applicants) -> int:
+    if hasattr(applicants, "num_rows"):
+        return applicants.num_rows
+    return len(next(iter(applicants.values())))
+
+
+def risk_score_calculator_batch(applicants) -> tuple[dict, ToolCallRecord]:
+    """
+    Vectorized risk_score_calculator over columnar applicant data.
+
+    Args:
+        applicants: dict of equal-length arrays (age, health_conditions,
+            occupation_risk_class, smoker, bmi, coverage_amount, id) or a
+            pyarrow.Table with the same columns. Missing columns use the
+            scalar tool's defaults.
+
+    Returns:
+        (columns, record) — a dict of NumPy arrays whose values match the
+        scalar function row for row, and one ToolCallRecord for the batch.
+    """
+    import numpy as np
+
+    with Timer() as timer:
+        model = get_risk_model()
+        size = _batch_size(applicants)
+
+        age = _batch_column(applicants, "age", 30, size).astype(float)
+        bmi = _batch_column(applicants, "bmi", 25.0, size).astype(float)
+        smoker = _batch_column(applicants, "smoker", False, size).astype(bool)
+        coverage_amount = _batch_column(applicants, "coverage_amount", 0, size).astype(float)
+        occupation_class = _batch_column(applicants, "occupation_risk_class", "low", size)
+
+        # Age brackets — searchsorted over the compiled lower bounds
+        age_idx = np.maximum(np.searchsorted(model.age_lower_bounds, age, side="right") - 1, 0)
+        base_risk = np.asarray(model.age_base_risks)[age_idx]
+        age_bracket = np.asarray(model.age_labels, dtype=object)[age_idx]
+
+        # Medical conditions — multiply position by position, in list order like the scalar loop
+        offsets, codes = _batch_conditions(applicants, size)
+        multiplier_table = {code: cond.multiplier for code, cond in model.conditions.items()}
+        code_multipliers = np.array([multiplier_table.get(code, 1.0) for code in codes], dtype=float)
+        lengths = np.diff(offsets)
+        medical_multiplier = np.ones(size)
+        for position in range(int(lengths.max()) if size else 0):
+            has_condition = lengths > position
+            medical_multiplier[has_condition] *= code_multipliers[offsets[:-1][has_condition] + position]
+
+        # Occupation class — map each distinct class once
+        classes, class_idx = np.unique(occupation_class.astype(str), return_inverse=True)
+        occupation_multiplier = np.array([model.occupation_multiplier(c) for c in classes])[class_idx]
+
+        smoker_multiplier = np.where(smoker, model.smoker_multiplier, 1.0)
+
+        # BMI categories — half-open ranges, default normal/1.0 outside them
+        bmi_idx = np.searchsorted(model.bmi_lower_bounds, bmi, side="right") - 1
+        safe_idx = np.clip(bmi_idx, 0, len(model.bmi_lower_bounds) - 1)
+        in_range = (bmi_idx >= 0) & (bmi < np.asarray(model.bmi_upper_bounds)[safe_idx])
+        bmi_multiplier = np.where(in_range, np.asarray(model.bmi_multipliers)[safe_idx], 1.0)
+        bmi_category = np.where(in_range, np.asarray(model.bmi_categories, dtype=object)[safe_idx], "normal")
+
+        # Composite score — same operation order as the scalar tool
+        composite_risk = base_risk * medical_multiplier * occupation_multiplier * smoker_multiplier * bmi_multiplier
+        risk_score = np.minimum(composite_risk, 1.0)
+
+        high_value_adjustment = coverage_amount > model.high_value_threshold
+        risk_score = np.where(high_value_adjustment, np.minimum(risk_score * 1.15, 1.0), risk_score)
+
+        recommendation = np.where(
+            risk_score <= model.auto_approve_max_risk, "auto_approve",
+            np.where(risk_score >= model.auto_reject_min_risk, "auto_reject", "manual_review")
+        ).astype(object)
+
+        result = {
+            "id": _batch_column(applicants, "id", "N/A", size),
+            "risk_score": round_values(risk_score, 4),
+            "recommendation": recommendation,
+            "age_bracket": age_bracket,
+            "base_risk": base_risk,
+            "medical_multiplier": round_values(medical_multiplier, 2),
+            "occupation_multiplier": occupation_multiplier,
+            "smoker_multiplier": smoker_multiplier,
+            "bmi_category": bmi_category,
+            "bmi_multiplier": bmi_multiplier,
+            "high_value_adjustment": high_value_adjustment,
+        }
+
+    counts = {r: int((recommendation == r).sum()) for r in ("auto_approve", "manual_review", "auto_reject")}
+    record = ToolCallRecord(
+        tool_name="risk_score_calculator_batch",
+        parameters={"applicants": size},
+        result_summary=f"Scored {size} applicants — " + ", ".join(f"{k}: {v}" for k, v in counts.items()),
+        duration_ms=timer.elapsed_ms,
+        success=True
+    )
+
+    return result, record
+
+
+def calculate_monthly_premium_batch(coverage_amounts, risk_scores, rejected=None):
+    """
+    Vectorized calculate_monthly_premium. Rows flagged in `rejected` get 0,
+    matching step_finalize. Returns an unrounded float array.
+    """
+    import numpy as np
+
+    model = get_risk_model()
+    coverage_amounts = np.asarray(coverage_amounts, dtype=float)
+    risk_scores = np.asarray(risk_scores, dtype=float)
+
+    base_premium = (coverage_amounts / 1000) * model.base_rate_per_1000
+    adjusted_premium = base_premium * (1 + risk_scores * model.risk_premium_multiplier)
+    monthly_premium = np.maximum(adjusted_premium / 12, model.min_premium_monthly)
+    monthly_premium = np.minimum(monthly_premium, base_premium / 12 * model.max_premium_multiplier)
+
+    if rejected is not None:
+        monthly_premium = np.where(np.asarray(rejected, dtype=bool), 0.0, monthly_premium)
+    return monthly_premium
@@ -0,0 +1,562 @@
+"""
+InsureOps AI — Agent Workflow Executor
+Shared LangGraph-style step runner for the Claims, Fraud and Underwriting
+agents. Steps run against a state dict; a failing step marks the trace as
+errored and no further steps start. Steps after it that were already
+running in parallel are discarded, so the trace ends at the failing step.
+
+Steps that declare the state keys they read (inputs) and write (outputs)
+form a dependency graph: a step waits only for earlier steps whose outputs
+it reads (or whose keys it overwrites), so independent tool steps run
+concurrently on a shared thread pool (AGENT_STEP_WORKERS). Each runs
+against its own view of the state; its outputs and trace records are
+merged back in declared step order, so traces look the same as a serial
+run apart from the wall-clock started_at/ended_at on each tool call.
+Undeclared steps (the LLM step, guardrails, finalize) run alone on the
+shared state, after every earlier step. AGENT_PARALLEL_STEPS=false runs
+everything serially in declared order.
+
+run() blocks until every step is done. arun() awaits the async variant of
+I/O-bound steps (the LLM call) and runs deterministic tool steps inline, so
+one event loop can keep many workflows in flight — see arun_many().
+
+A workflow also describes its LLM step (LLMStepSpec), and state_to_dict() /
+state_from_dict() make state JSON-serializable, so a workflow can stop
+before the LLM call and resume later (see batch_llm.py).
+
+execute() / aexecute() checkpoint the state just before and just after the
+LLM step (see checkpoint.py, AgentWorkflow.checkpoint_steps()); resume_run()
+picks a failed or interrupted run back up after its last checkpointed step,
+under the same trace_id.
+"""
+
+import asyncio
+import json
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Optional
+
+from pydantic import BaseModel
+
+from agents.base_agent import (
+    TraceRecord, LLMCallRecord, ToolCallRecord, GuardrailResult, DecisionRecord,
+    send_telemetry_to_backend, asend_telemetry_to_backend
+)
+
+
+StepFn = Callable[[dict], dict]
+AsyncStepFn = Callable[[dict], Awaitable[dict]]
+# (state, names of the steps completed so far) — called as steps complete
+ProgressFn = Callable[[dict, tuple[str, ...]], None]
+
+
+@dataclass(frozen=True)
+class WorkflowStep:
+    """
+    A named workflow step, with an optional async variant for I/O-bound work.
+    `inputs` / `outputs` are the state keys it reads and writes; a step
+    without them (inputs=None) depends on every step before it.
+    """
+    name: str
+    fn: StepFn
+    afn: Optional[AsyncStepFn] = None
+    inputs: Optional[tuple[str, ...]] = None
+    outputs: tuple[str, ...] = ()
+
+    @property
+    def declared(self) -> bool:
+        return self.inputs is not None
+
+
+def step_dependencies(steps: tuple[WorkflowStep, ...]) -> list[set[int]]:
+    """For each step, the indexes of the earlier steps it has to wait for."""
+    dependencies = []
+    for i, step in enumerate(steps):
+        needs = set()
+        for j, earlier in enumerate(steps[:i]):
+            if not (step.declared and earlier.declared):
+                needs.add(j)
+            elif (set(step.inputs) & set(earlier.outputs)
+                  or set(step.outputs) & (set(earlier.inputs) | set(earlier.outputs))):
+                needs.add(j)
+        dependencies.append(needs)
+    return dependencies
+
+
+@dataclass(frozen=True)
+class LLMStepSpec:
+    """
+    How a workflow's LLM step builds its request and applies the response,
+    so the call can be made somewhere else (e.g. an offline batch).
+    """
+    step_name: str
+    system_prompt: str
+    temperature: float
+    build_prompt: Callable[[dict], Any]  # state -> prompt_builder.BuiltPrompt
+    apply_response: Callable[[dict, str, LLMCallRecord], dict]
+    simulator: Callable[..., tuple[str, int, int]]  # (prompt, rng=None) -> (text, prompt_tokens, completion_tokens)
+
+
+@dataclass(frozen=True)
+class AgentWorkflow:
+    """Ordered steps for one agent type, plus how to create state and results."""
+    agent_type: str
+    steps: tuple[WorkflowStep, ...]
+    initial_state: Optional[Callable[[dict], dict]] = None
+    build_result: Optional[Callable[[dict], dict]] = None
+    llm: Optional[LLMStepSpec] = None
+
+    def _select(self, start_after: Optional[str], stop_before: Optional[str]) -> tuple[WorkflowStep, ...]:
+        names = [step.name for step in self.steps]
+        start = names.index(start_after) + 1 if start_after else 0
+        stop = names.index(stop_before) if stop_before else len(names)
+        return self.steps[start:stop]
+
+    def _fail(self, state: dict, step: WorkflowStep, error: Exception):
+        print(f"   ❌ Error in {step.name}: {error}")
+        trace = state["trace"]
+        trace.status = "error"
+        trace.output_data = {"error": str(error), "failed_step": step.name}
+
+    def _finish(self, graph: "_StepGraph") -> dict:
+        graph.flush_all()
+        if graph.failure is not None:
+            index, error = graph.failure
+            self._fail(graph.state, graph.steps[index], error)
+        return graph.state
+
+    def run(
+        self,
+        state: dict,
+        verbose: bool = True,
+        start_after: Optional[str] = None,
+        stop_before: Optional[str] = None,
+        completed: tuple[str, ...] = (),
+        on_progress: Optional[ProgressFn] = None
+    ) -> dict:
+        """
+        Execute steps — all of them, or only those after `start_after`
+        and/or before `stop_before`, skipping the `completed` ones.
+        Independent declared steps run on the step thread pool; the first
+        ready step runs on the calling thread.
+        """
+        graph = _StepGraph(state, self._select(start_after, stop_before), completed, on_progress)
+        parallel = parallel_steps_enabled()
+        running = {}
+        while True:
+            ready = graph.ready() if parallel else graph.ready()[:1]
+            if not ready and not running:
+                break
+            views = [(index, graph.prepare(index, verbose)) for index in ready]
+            for index, view in views[1:]:
+                running[get_step_executor().submit(_timed_call, graph.steps[index].fn, view)] = (index, view)
+            if views:
+                index, view = views[0]
+                graph.complete(index, view, *_timed_call(graph.steps[index].fn, view))
+            if running:
+                finished, _ = wait(running, timeout=0 if ready else None, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    graph.complete(*running.pop(future), *future.result())
+        return self._finish(graph)
+
+    async def arun(self, state: dict, verbose: bool = False, completed: tuple[str, ...] = (),
+                   on_progress: Optional[ProgressFn] = None) -> dict:
+        """
+        Execute all steps (but the `completed` ones), awaiting async variants
+        where a step has one. Independent sync steps beyond the first go to
+        the step thread pool.
+        """
+        graph = _StepGraph(state, self.steps, completed, on_progress)
+        parallel = parallel_steps_enabled()
+        loop = asyncio.get_running_loop()
+        running = {}
+        while True:
+            ready = graph.ready() if parallel else graph.ready()[:1]
+            if not ready and not running:
+                break
+            inline = None
+            for index in ready:
+                step = graph.steps[index]
+                view = graph.prepare(index, verbose)
+                if step.afn:
+                    running[asyncio.ensure_future(_atimed_call(step.afn, view))] = (index, view)
+                elif inline is None:
+                    inline = (index, view)
+                else:
+                    running[loop.run_in_executor(get_step_executor(), _timed_call, step.fn, view)] = (index, view)
+            if inline is not None:
+                graph.complete(*inline, *_timed_call(graph.steps[inline[0]].fn, inline[1]))
+            if running:
+                finished, _ = await asyncio.wait(
+                    running, timeout=0 if inline else None, return_when=asyncio.FIRST_COMPLETED
+                )
+                for future in finished:
+                    graph.complete(*running.pop(future), *future.result())
+        return self._finish(graph)
+
+    def checkpointer(self, trace_id: str) -> Optional[ProgressFn]:
+        """
+        on_progress callback for run() that saves the run's checkpoint after
+        each of checkpoint_steps(), or None when checkpoints are disabled.
+        Pair it with settle_checkpoint() once the run is over.
+        """
+        from agents.checkpoint import checkpoints_enabled, get_checkpoint_store
+
+        if not checkpoints_enabled():
+            return None
+        store = get_checkpoint_store()
+        save_after = self.checkpoint_steps()
+
+        def _save(state: dict, completed: tuple[str, ...]):
+            if completed and completed[-1] in save_after:
+                store.save(trace_id, self.agent_type, state_to_json(state), completed)
+        return _save
+
+    def checkpoint_steps(self) -> set[str]:
+        """
+        Steps after which execute() checkpoints: on either side of each step
+        with an async variant (the I/O-bound LLM call), never after the last
+        step. Deterministic tool steps are cheap to redo, so a run that fails
+        before its LLM step leaves no checkpoint and is simply re-run.
+        """
+        names = set()
+        for i, step in enumerate(self.steps):
+            if step.afn is not None:
+                if i > 0:
+                    names.add(self.steps[i - 1].name)
+                names.add(step.name)
+        names.discard(self.steps[-1].name)  # a finished run's checkpoint is dropped anyway
+        return names
+
+    def settle_checkpoint(self, state: dict):
+        """Drop a finished run's checkpoint, or mark the failed step on it."""
+        from agents.checkpoint import checkpoints_enabled, get_checkpoint_store
+
+        if not checkpoints_enabled():
+            return
+        trace = state["trace"]
+        if trace.status == "error":
+            get_checkpoint_store().mark_failed(
+                trace.trace_id, trace.output_data.get("failed_step", ""), trace.output_data.get("error", "")
+            )
+        else:
+            get_checkpoint_store().finish(trace.trace_id)
+
+    def execute(self, state: dict, send_telemetry: bool = True, verbose: bool = True,
+                completed: tuple[str, ...] = ()) -> dict:
+        """run() with checkpoints, then print the decision summary and send telemetry."""
+        state = self.run(state, verbose, completed=completed,
+                         on_progress=self.checkpointer(state["trace"].trace_id))
+        self.settle_checkpoint(state)
+        if verbose:
+            print_decision_summary(state)
+        if send_telemetry:
+            send_telemetry_to_backend(state["trace"])
+        return state
+
+    async def aexecute(self, state: dict, send_telemetry: bool = True, verbose: bool = False,
+                       completed: tuple[str, ...] = ()) -> dict:
+        """arun() with checkpoints, then print the decision summary and send telemetry without blocking."""
+        state = await self.arun(state, verbose, completed, self.checkpointer(state["trace"].trace_id))
+        self.settle_checkpoint(state)
+        if verbose:
+            print_decision_summary(state)
+        if send_telemetry:
+            await asend_telemetry_to_backend(state["trace"])
+        return state
+
+
+# ─── Step Scheduling ────────────────────────────────
+
+def _now() -> str:
+    return datetime.utcnow().isoformat()
+
+
+def _timed_call(fn: StepFn, state: dict) -> tuple[Optional[dict], str, str, Optional[Exception]]:
+    """Run one step: (result state, started_at, ended_at, error)."""
+    started_at = _now()
+    try:
+        result, error = fn(state), None
+    except Exception as e:
+        result, error = None, e
+    return result, started_at, _now(), error
+
+
+async def _atimed_call(afn: AsyncStepFn, state: dict) -> tuple[Optional[dict], str, str, Optional[Exception]]:
+    """Async _timed_call()."""
+    started_at = _now()
+    try:
+        result, error = await afn(state), None
+    except Exception as e:
+        result, error = None, e
+    return result, started_at, _now(), error
+
+
+def _stamp(tool_calls: list[ToolCallRecord], started_at: str, ended_at: str):
+    """Give tool calls made by a step that step's wall-clock window."""
+    for record in tool_calls:
+        if record.started_at is None:
+            record.started_at, record.ended_at = started_at, ended_at
+
+
+_MISSING = object()
+
+
+class _StepGraph:
+    """
+    Scheduling state for one run over a selection of steps. Only the
+    thread driving the run touches it; steps on the pool see their own view.
+    """
+
+    def __init__(self, state: dict, steps: tuple[WorkflowStep, ...], completed: tuple[str, ...] = (),
+                 on_progress: Optional[ProgressFn] = None):
+        self.state = state
+        self.steps = steps
+        self.dependencies = step_dependencies(steps)
+        self.completed = tuple(completed)
+        self.on_progress = on_progress
+        self.done: set[int] = {i for i, step in enumerate(steps) if step.name in self.completed}
+        self.started: set[int] = set(self.done)
+        self.failure: Optional[tuple[int, Exception]] = None
+        self._records: dict[int, TraceRecord] = {}  # finished views' trace records, not merged yet
+        self._replaced: dict[int, dict] = {}         # state values a declared step's outputs overwrote
+        self._merged = 0                             # steps before this index are merged
+        self._tool_calls_before = 0                  # trace length when an undeclared step started
+        while self._merged in self.done:             # resumed: completed steps are already in the trace
+            self._merged += 1
+
+    def ready(self) -> list[int]:
+        """Steps whose dependencies are done, in declared order (none once a step has failed)."""
+        if self.failure is not None:
+            return []
+        return [
+            i for i in range(len(self.steps))
+            if i not in self.started and self.dependencies[i] <= self.done
+        ]
+
+    def prepare(self, index: int, verbose: bool) -> dict:
+        """The state a step runs against: its own view if declared, else the shared state."""
+        self.started.add(index)
+        step = self.steps[index]
+        if verbose:
+            print(f"   → {step.name}...")
+        if not step.declared:
+            self._flush()  # every earlier step is done
+            self._tool_calls_before = len(self.state["trace"].tool_calls)
+            return self.state
+        return {**self.state, "trace": TraceRecord(agent_type=self.state["trace"].agent_type)}
+
+    def complete(self, index: int, view: dict, result: Optional[dict],
+                 started_at: str, ended_at: str, error: Optional[Exception]):
+        """Merge a finished step back into the shared state, or record its failure."""
+        self.done.add(index)
+        step = self.steps[index]
+        if not step.declared:
+            if result is not None:
+                self.state = result
+            _stamp(self.state["trace"].tool_calls[self._tool_calls_before:], started_at, ended_at)
+        else:
+            _stamp(view["trace"].tool_calls, started_at, ended_at)
+            self._records[index] = view["trace"]
+            for key in step.outputs if result is not None else ():
+                if key in result:
+                    self._replaced.setdefault(index, {})[key] = self.state.get(key, _MISSING)
+                    self.state[key] = result[key]
+        if error is not None and (self.failure is None or index < self.failure[0]):
+            self.failure = (index, error)
+        self._flush()
+
+    def _merge(self, index: int):
+        records = self._records.pop(index, None)
+        if records is not None:
+            trace = self.state["trace"]
+            trace.tool_calls.extend(records.tool_calls)
+            trace.llm_calls.extend(records.llm_calls)
+            trace.guardrails.extend(records.guardrails)
+
+    def _flush(self):
+        """Merge trace records of finished steps, in declared order, and report progress."""
+        merged = self._merged
+        last = self.failure[0] if self.failure is not None else len(self.steps)
+        while self._merged in self.done and self._merged <= last:
+            self._merge(self._merged)
+            self._merged += 1
+        if self._merged == merged or self.on_progress is None:
+            return
+        # Every step before _merged is done and merged; a failed one never counts
+        if self.failure is not None and self.failure[0] < self._merged:
+            return
+        names = [step.name for step in self.steps[merged:self._merged]]
+        self.completed += tuple(name for name in names if name not in self.completed)
+        self.on_progress(self.state, self.completed)
+
+    def flush_all(self):
+        """
+        Merge whatever finished up to a failed step. Steps after it that were
+        already running are discarded — their trace records and outputs — so
+        the trace ends at the failed step, as in a serial run.
+        """
+        last = self.failure[0] if self.failure is not None else len(self.steps)
+        for index in sorted(self._records):
+            if index <= last:
+                self._merge(index)
+        for index in sorted(self._replaced, reverse=True):
+            if index > last:
+                for key, value in self._replaced[index].items():
+                    if value is _MISSING:
+                        self.state.pop(key, None)
+                    else:
+                        self.state[key] = value
+
+
+def parallel_steps_enabled() -> bool:
+    return os.getenv("AGENT_PARALLEL_STEPS", "true").lower() in ("1", "true", "yes")
+
+
+_step_executor: Optional[ThreadPoolExecutor] = None
+_step_executor_lock = threading.Lock()
+
+def get_step_executor() -> ThreadPoolExecutor:
+    """Get or create the thread pool independent workflow steps run on (AGENT_STEP_WORKERS)."""
+    global _step_executor
+    if _step_executor is None:
+        with _step_executor_lock:
+            if _step_executor is None:
+                _step_executor = ThreadPoolExecutor(
+                    max_workers=int(os.getenv("AGENT_STEP_WORKERS", "8")),
+                    thread_name_prefix="workflow-step"
+                )
+    return _step_executor
+
+
+def resume_run(trace_id: str, send_telemetry: bool = True, verbose: bool = True) -> dict:
+    """
+    Resume a failed or interrupted run from its last checkpoint: the steps it
+    completed are skipped, the rest run under the same trace_id. Returns the
+    agent's result dict.
+    """
+    workflow, state, completed = _load_checkpoint(trace_id)
+    if verbose:
+        print(f"\n♻️  Resuming {workflow.agent_type} run {trace_id} after: {completed[-1] if completed else '(start)'}")
+    state = workflow.execute(state, send_telemetry, verbose, completed)
+    return workflow.build_result(state)
+
+
+async def aresume_run(trace_id: str, send_telemetry: bool = True, verbose: bool = False) -> dict:
+    """Async resume_run()."""
+    workflow, state, completed = _load_checkpoint(trace_id)
+    state = await workflow.aexecute(state, send_telemetry, verbose, completed)
+    return workflow.build_result(state)
+
+
+def _load_checkpoint(trace_id: str) -> tuple["AgentWorkflow", dict, tuple[str, ...]]:
+    from agents.checkpoint import get_checkpoint_store
+
+    checkpoint = get_checkpoint_store().load(trace_id)
+    if checkpoint is None:
+        raise KeyError(f"No checkpoint for trace_id '{trace_id}'")
+    return get_workflow(checkpoint.agent_type), state_from_dict(checkpoint.state), checkpoint.completed_steps
+
+
+def provisional_decision_recorder(state: dict) -> Callable[[dict], None]:
+    """
+    on_decision callback for an LLM step: stores the decision and confidence
+    in state["provisional_decision"] as soon as they are parsed — with
+    streaming, before the rest of the response (e.g. reasoning) arrives.
+    """
+    def _record(fields: dict):
+        state["provisional_decision"] = dict(fields)
+    return _record
+
+
+def get_workflow(agent_type: str) -> AgentWorkflow:
+    """The AgentWorkflow for an agent type (imported lazily)."""
+    if agent_type == "claims":
+        from agents.claims_agent.agent import CLAIMS_WORKFLOW
+        return CLAIMS_WORKFLOW
+    if agent_type == "fraud":
+        from agents.fraud_agent.agent import FRAUD_WORKFLOW
+        return FRAUD_WORKFLOW
+    if agent_type == "underwriting":
+        from agents.underwriting_agent.agent import UNDERWRITING_WORKFLOW
+        return UNDERWRITING_WORKFLOW
+    raise ValueError(f"Unknown agent type '{agent_type}'")
+
+
+# ─── State Serialization ────────────────────────────
+
+_STATE_MODELS = {
+    model.__name__: model
+    for model in (TraceRecord, LLMCallRecord, ToolCallRecord, GuardrailResult, DecisionRecord)
+}
+
+
+def state_to_dict(value: Any) -> Any:
+    """JSON-safe copy of workflow state; pydantic records are tagged with their type."""
+    if isinstance(value, BaseModel):
+        return {"__model__": type(value).__name__, "data": value.model_dump()}
+    if isinstance(value, dict):
+        return {k: state_to_dict(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [state_to_dict(v) for v in value]
+    return value
+
+
+def _encode_model(value: Any) -> dict:
+    if isinstance(value, BaseModel):
+        return {"__model__": type(value).__name__, "data": value.model_dump()}
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def state_to_json(state: dict) -> str:
+    """json.dumps(state_to_dict(state)), without first copying the state in Python."""
+    return json.dumps(state, default=_encode_model)
+
+
+def state_from_dict(value: Any) -> Any:
+    """Inverse of state_to_dict."""
+    if isinstance(value, dict):
+        if "__model__" in value and value.keys() == {"__model__", "data"}:
+            return _STATE_MODELS[value["__model__"]].model_validate(value["data"])
+        return {k: state_from_dict(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [state_from_dict(v) for v in value]
+    return value
+
+
+def print_decision_summary(state: dict):
+    trace = state["trace"]
+    decision = state.get("decision") or {}
+    print(f"\n   ✅ Decision: {decision.get('decision_type', 'N/A').upper()}")
+    print(f"   📊 Confidence: {decision.get('confidence', 0):.0%}")
+    print(f"   ⏱️  Latency: {trace.total_latency_ms}ms")
+    print(f"   💰 Cost: ${trace.total_cost_usd:.6f}")
+
+
+def get_max_concurrency() -> int:
+    return int(os.getenv("AGENT_MAX_CONCURRENCY", "100"))
+
+
+async def arun_many(
+    arunner: Callable[..., Awaitable[dict]],
+    records: list[dict],
+    concurrency: Optional[int] = None,
+    **kwargs
+) -> list[dict]:
+    """
+    Run an async agent runner over many records with at most `concurrency`
+    in flight (default AGENT_MAX_CONCURRENCY). Results keep input order.
+
+    Usage:
+        results = asyncio.run(arun_many(arun_claims_agent, claims, concurrency=200))
+    """
+    semaphore = asyncio.Semaphore(concurrency or get_max_concurrency())
+
+    async def _run(record: dict) -> dict:
+        async with semaphore:
+            return await arunner(record, **kwargs)
+
+    return await asyncio.gather(*(_run(record) for record in records))
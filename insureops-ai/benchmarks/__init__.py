@@ -0,0 +1 @@
+"""InsureOps AI — Microbenchmarks for agent tools and infrastructure."""
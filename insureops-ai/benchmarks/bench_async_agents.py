@@ -0,0 +1,60 @@
+"""
+Async Agent Runner Benchmark
+Claims-per-second of run_claims_agent in a loop versus arun_claims_agent
+under arun_many, in simulation mode (no API key) with telemetry disabled.
+
+Usage:
+    python -m benchmarks.bench_async_agents --claims 500 --concurrency 200
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+
+# Ensure agents package is importable
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from agents.base_agent import load_json_data
+from agents.claims_agent.agent import run_claims_agent, arun_claims_agent
+from agents.workflow import arun_many
+
+
+def run_benchmark(claim_count: int = 500, concurrency: int = 200, sync_claims: int = 5) -> dict:
+    sample = load_json_data("sample_claims.json")
+    claims = (sample * (claim_count // len(sample) + 1))[:claim_count]
+
+    start = time.perf_counter()
+    for claim in claims[:sync_claims]:
+        run_claims_agent(claim, send_telemetry=False, verbose=False)
+    sync_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = asyncio.run(arun_many(arun_claims_agent, claims, concurrency, send_telemetry=False))
+    async_seconds = time.perf_counter() - start
+
+    sync_rate = sync_claims / sync_seconds
+    async_rate = len(results) / async_seconds
+    return {
+        "sync": {"claims": sync_claims, "seconds": round(sync_seconds, 2), "claims_per_sec": round(sync_rate, 2)},
+        "async": {
+            "claims": len(results),
+            "concurrency": concurrency,
+            "seconds": round(async_seconds, 2),
+            "claims_per_sec": round(async_rate, 2),
+            "errors": sum(1 for r in results if r["trace"]["status"] != "success"),
+        },
+        "speedup": round(async_rate / sync_rate, 1),
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Benchmark sync vs async claims agent runners")
+    parser.add_argument("--claims", type=int, default=500, help="Claims for the async run")
+    parser.add_argument("--concurrency", type=int, default=200, help="Max claims in flight")
+    parser.add_argument("--sync-claims", type=int, default=5, help="Claims for the sync baseline")
+    args = parser.parse_args()
+
+    print(json.dumps(run_benchmark(args.claims, args.concurrency, args.sync_claims), indent=2))
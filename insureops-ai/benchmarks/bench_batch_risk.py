@@ -0,0 +1,85 @@
+"""
+Portfolio Re-rate Benchmark
+Times risk_score_calculator_batch + calculate_monthly_premium_batch over a
+synthetic in-force book and checks every sampled row against the scalar
+risk_score_calculator / calculate_monthly_premium path.
+
+Usage:
+    python -m benchmarks.bench_batch_risk --rows 1000000 --verify 20000
+"""
+
+import json
+import os
+import sys
+import time
+
+# Ensure agents package is importable
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+
+from agents.base_agent import round_values
+from agents.underwriting_agent.tools import (
+    risk_score_calculator, risk_score_calculator_batch,
+    calculate_monthly_premium, calculate_monthly_premium_batch
+)
+from benchmarks.bench_risk_model import generate_applicants
+
+
+def _to_columns(applicants: list[dict]) -> dict:
+    return {
+        key: np.array([a[key] for a in applicants], dtype=object if key == "health_conditions" else None)
+        for key in applicants[0]
+    }
+
+
+def run_benchmark(rows: int = 1_000_000, verify: int = 20_000) -> dict:
+    # Tile a pool of distinct applicants up to the requested book size
+    pool = generate_applicants(min(rows, 50_000))
+    repeats = -(-rows // len(pool))
+    columns = {key: np.tile(values, repeats)[:rows] for key, values in _to_columns(pool).items()}
+
+    start = time.perf_counter()
+    scored, record = risk_score_calculator_batch(columns)
+    premiums = calculate_monthly_premium_batch(
+        columns["coverage_amount"], scored["risk_score"],
+        rejected=scored["recommendation"] == "auto_reject"
+    )
+    monthly_premium = round_values(premiums, 2)
+    batch_seconds = time.perf_counter() - start
+
+    mismatches = 0
+    start = time.perf_counter()
+    for i in range(min(verify, rows)):
+        applicant = pool[i % len(pool)]
+        scalar, _ = risk_score_calculator(applicant)
+        premium = 0 if scalar["recommendation"] == "auto_reject" else calculate_monthly_premium(
+            applicant["coverage_amount"], scalar["risk_score"])
+        if (scalar["risk_score"] != scored["risk_score"][i]
+                or scalar["recommendation"] != scored["recommendation"][i]
+                or scalar["breakdown"]["bmi_category"] != scored["bmi_category"][i]
+                or scalar["breakdown"]["medical_multiplier"] != scored["medical_multiplier"][i]
+                or round(premium, 2) != monthly_premium[i]):
+            mismatches += 1
+    scalar_seconds = time.perf_counter() - start
+    checked = min(verify, rows)
+
+    return {
+        "rows": rows,
+        "batch_seconds": round(batch_seconds, 3),
+        "batch_rows_per_second": int(rows / batch_seconds),
+        "scalar_rows_per_second": int(checked / scalar_seconds),
+        "verified_rows": checked,
+        "mismatches": mismatches,
+        "trace": record.result_summary,
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Benchmark vectorized portfolio re-rating")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Book size to re-rate")
+    parser.add_argument("--verify", type=int, default=20_000, help="Rows to check against the scalar path")
+    args = parser.parse_args()
+
+    print(json.dumps(run_benchmark(args.rows, args.verify), indent=2))
@@ -0,0 +1,153 @@
+"""
+LLM Gateway Benchmark
+Sequential chat completions against a local mock OpenAI-compatible server:
+a new OpenAI() client per call (the old call_llm) versus the pooled,
+keep-alive LLMGateway. The server counts TCP connections it accepted.
+
+--handshake-ms adds a delay to every new connection on the server side, to
+stand in for the TCP + TLS setup a remote endpoint costs.
+
+Usage:
+    python -m benchmarks.bench_llm_gateway --calls 200 --handshake-ms 30
+"""
+
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Ensure agents package is importable
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from agents.llm_gateway import LLMGateway, LLMSettings
+
+
+MOCK_RESPONSE = {
+    "id": "chatcmpl-mock",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "openai/gpt-4o-mini",
+    "choices": [{
+        "index": 0,
+        "finish_reason": "stop",
+        "message": {"role": "assistant", "content": json.dumps({"decision": "approved", "confidence": 0.9})},
+    }],
+    "usage": {"prompt_tokens": 420, "completion_tokens": 180, "total_tokens": 600},
+}
+
+
+class MockOpenAIServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+    def __init__(self, handshake_ms: float = 0.0):
+        super().__init__(("127.0.0.1", 0), _MockHandler)
+        self.handshake_ms = handshake_ms
+        self.connections = 0
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+
+class _MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    disable_nagle_algorithm = True  # avoid 40ms delayed-ACK stalls on reused connections
+
+    def setup(self):
+        super().setup()
+        with self.server._lock:
+            self.server.connections += 1
+        if self.server.handshake_ms:
+            time.sleep(self.server.handshake_ms / 1000)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = json.dumps(MOCK_RESPONSE).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _no_simulation(prompt: str):
+    raise RuntimeError("benchmark must not fall back to simulation")
+
+
+def _per_call_client(settings: LLMSettings, prompt: str):
+    """The pre-gateway call_llm: build a client, call, drop it."""
+    from openai import OpenAI
+
+    client = OpenAI(base_url=settings.base_url, api_key=settings.api_key)
+    response = client.chat.completions.create(
+        model=settings.model,
+        messages=[{"role": "user", "content": prompt}],
+        temperature=0.2,
+        response_format={"type": "json_object"}
+    )
+    return response.choices[0].message.content
+
+
+def _measure(fn, calls: int) -> dict:
+    samples = []
+    start = time.perf_counter()
+    for _ in range(calls):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    total = time.perf_counter() - start
+    samples.sort()
+    return {
+        "calls_per_sec": round(calls / total, 1),
+        "p50_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(samples[int(len(samples) * 0.95) - 1], 3),
+    }
+
+
+def run_benchmark(calls: int = 200, handshake_ms: float = 0.0) -> dict:
+    server = MockOpenAIServer(handshake_ms)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    settings = LLMSettings(api_key="sk-benchmark", base_url=server.base_url, max_retries=0)
+    prompt = "Analyze claim CLM-2026-001: water damage from burst pipe, $8,500."
+
+    try:
+        server.connections = 0
+        per_call = _measure(lambda: _per_call_client(settings, prompt), calls)
+        per_call["connections"] = server.connections
+
+        gateway = LLMGateway(settings)
+        server.connections = 0
+        pooled = _measure(
+            lambda: gateway.complete(prompt, temperature=0.2, simulator=_no_simulation, cache_mode="bypass"), calls
+        )
+        pooled["connections"] = server.connections
+        gateway.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    return {
+        "calls": calls,
+        "handshake_ms": handshake_ms,
+        "per_call_client": per_call,
+        "pooled_gateway": pooled,
+        "speedup_p50": round(per_call["p50_ms"] / pooled["p50_ms"], 1),
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Benchmark pooled LLM gateway vs per-call clients")
+    parser.add_argument("--calls", type=int, default=200, help="Sequential calls per variant")
+    parser.add_argument("--handshake-ms", type=float, default=0.0, help="Simulated per-connection setup cost")
+    args = parser.parse_args()
+
+    print(json.dumps(run_benchmark(args.calls, args.handshake_ms), indent=2))
@@ -0,0 +1,121 @@
+"""
+LLM Simulation Benchmark
+Pushes many agent runs through the full workflow (tools, prompt building,
+gateway, guardrails, finalize — telemetry off) with the LLM simulated,
+then repeats the run with the same seed to check it is reproducible.
+
+Usage:
+    python -m benchmarks.bench_llm_simulation --runs 3000 --latency zero --seed 42
+    python -m benchmarks.bench_llm_simulation --latency lognormal:600,0.5 --async --concurrency 500
+    python -m benchmarks.bench_llm_simulation --distinct   # no two runs share a prompt
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+
+# Ensure agents package is importable
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+# Simulated calls only — never reach a real provider from a load test
+os.environ["OPENROUTER_API_KEY"] = ""
+
+from agents.base_agent import load_json_data
+from agents.llm_gateway import get_llm_gateway
+from agents.llm_simulation import LLMSimulation, parse_latency_model
+from agents.rate_limiter import RetryPolicy
+from agents.tokenizer import count_cache_stats
+from agents.workflow import arun_many
+from agents import (
+    run_claims_agent, run_fraud_agent, run_underwriting_agent,
+    arun_claims_agent, arun_fraud_agent, arun_underwriting_agent
+)
+
+
+# agent -> (runner, async runner, sample file, free-text field that only reaches the prompt)
+AGENTS = {
+    "claims": (run_claims_agent, arun_claims_agent, "sample_claims.json", "description"),
+    "fraud": (run_fraud_agent, arun_fraud_agent, "sample_claims.json", "description"),
+    "underwriting": (run_underwriting_agent, arun_underwriting_agent, "sample_applicants.json", "name"),
+}
+
+
+def _records(agent_type: str, runs: int, distinct: bool) -> list[dict]:
+    samples = load_json_data(AGENTS[agent_type][2])
+    records = [samples[i % len(samples)] for i in range(runs)]
+    if not distinct:
+        return records
+    # Tag each run so prompts (and token counts) are never repeated across runs
+    field = AGENTS[agent_type][3]
+    return [{**r, field: f"{r.get(field, '')} (run {i})"} for i, r in enumerate(records)]
+
+
+def _fingerprint(result: dict) -> tuple:
+    decision = result["decision"]
+    return decision.get("decision_type", "error"), decision.get("confidence")
+
+
+def _run_once(agent_type: str, records: list, use_async: bool, concurrency: int) -> tuple[list, float]:
+    run, arun = AGENTS[agent_type][:2]
+    start = time.perf_counter()
+    if use_async:
+        results = asyncio.run(arun_many(arun, records, concurrency=concurrency, send_telemetry=False))
+    else:
+        results = [run(record, send_telemetry=False, verbose=False) for record in records]
+    return results, time.perf_counter() - start
+
+
+def run_benchmark(agent_type: str = "claims", runs: int = 3000, latency: str = "zero", seed: int = 42,
+                  error_rate: float = 0.0, rate_limit_rate: float = 0.0,
+                  use_async: bool = False, concurrency: int = 100, distinct: bool = False) -> dict:
+    gateway = get_llm_gateway()
+    gateway.retry_policy = RetryPolicy(max_retries=gateway.retry_policy.max_retries, base_delay_s=0.0)
+    records = _records(agent_type, runs, distinct)
+
+    passes = []
+    for _ in range(2):
+        gateway.simulation = LLMSimulation(parse_latency_model(latency), seed, error_rate, rate_limit_rate)
+        passes.append(_run_once(agent_type, records, use_async, concurrency))
+
+    (results, seconds), (repeat, _) = passes
+    decisions: dict[str, int] = {}
+    for result in results:
+        decision_type = _fingerprint(result)[0]
+        decisions[decision_type] = decisions.get(decision_type, 0) + 1
+
+    return {
+        "agent_type": agent_type,
+        "runs": runs,
+        "latency_model": latency,
+        "seed": seed,
+        "mode": "async" if use_async else "sync",
+        "distinct_records": distinct,
+        "seconds": round(seconds, 2),
+        "runs_per_sec": round(runs / seconds, 1),
+        "decisions": decisions,
+        "errored_runs": sum(1 for r in results if r["trace"]["status"] == "error"),
+        "reproducible": [_fingerprint(r) for r in results] == [_fingerprint(r) for r in repeat],
+        # Without --distinct the sample records repeat, so counts are also reused across runs
+        "token_count_cache": count_cache_stats(),
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Benchmark agent throughput with the simulated LLM backend")
+    parser.add_argument("--agent", choices=sorted(AGENTS), default="claims")
+    parser.add_argument("--runs", type=int, default=3000, help="Agent runs per pass")
+    parser.add_argument("--latency", default="zero", help="LLM_SIM_LATENCY-style latency model")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of calls answered with a 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of calls answered with a 429")
+    parser.add_argument("--async", dest="use_async", action="store_true", help="Run on one event loop")
+    parser.add_argument("--concurrency", type=int, default=100, help="Runs in flight with --async")
+    parser.add_argument("--distinct", action="store_true", help="Make every run's record (and prompt) unique")
+    args = parser.parse_args()
+
+    print(json.dumps(run_benchmark(args.agent, args.runs, args.latency, args.seed, args.error_rate,
+                                   args.rate_limit_rate, args.use_async, args.concurrency,
+                                   args.distinct), indent=2))
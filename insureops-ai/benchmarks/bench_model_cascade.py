@@ -0,0 +1,132 @@
+"""
+Model Cascade Benchmark
+Runs an agent's sample records through the real workflow twice, against a
+local mock server: once with a confidence-based cascade (cheap model
+first) and once always on the big model. Reports LLM spend, p50 LLM
+latency, hop counts and decision agreement (see model_cascade.cascade_report).
+
+The mock answers with the agent's simulated analysis. Models differ only in
+speed and confidence (MODEL_PROFILES): cheaper models are faster and less
+sure of themselves, so the low-confidence answers get escalated.
+
+Usage:
+    python -m benchmarks.bench_model_cascade --agent claims --confidence 0.75
+"""
+
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+
+# Ensure agents package is importable
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from benchmarks.bench_llm_gateway import MockOpenAIServer
+from agents.base_agent import load_json_data
+from agents.llm_cache import llm_cache_mode
+from agents.model_cascade import DEFAULT_CASCADE_MODELS, CascadePolicy, cascade_report, model_cascade
+from agents.workflow import get_workflow
+
+
+SAMPLE_FILES = {
+    "claims": "sample_claims.json",
+    "fraud": "sample_claims.json",
+    "underwriting": "sample_applicants.json",
+}
+# model -> (base latency ms, ms per completion token, confidence offset)
+MODEL_PROFILES = {
+    "openai/gpt-4.1-nano": (150, 1.0, -0.12),
+    "openai/gpt-4o-mini": (250, 2.0, -0.05),
+    "openai/gpt-4o": (400, 5.0, 0.0),
+}
+
+
+class CascadeServer(MockOpenAIServer):
+    def __init__(self, simulators: dict):
+        super().__init__()
+        self.RequestHandlerClass = _CascadeHandler
+        self.simulators = simulators
+
+
+class _CascadeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        messages = request["messages"]
+        system_prompt = next((m["content"] for m in messages if m["role"] == "system"), "")
+        text, prompt_tokens, completion_tokens = self.server.simulators[system_prompt](messages[-1]["content"])
+        base_ms, per_token_ms, offset = MODEL_PROFILES.get(request["model"], MODEL_PROFILES["openai/gpt-4o"])
+
+        analysis = json.loads(text)
+        analysis["confidence"] = round(min(max(analysis["confidence"] + offset, 0.0), 1.0), 2)
+        time.sleep((base_ms + per_token_ms * completion_tokens) / 1000)
+
+        body = json.dumps({
+            "id": "chatcmpl-mock", "object": "chat.completion", "created": 0, "model": request["model"],
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": json.dumps(analysis)}}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens},
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+async def _run_all(workflow, records: list, policy: CascadePolicy) -> list[dict]:
+    with model_cascade(policy), llm_cache_mode("bypass"):
+        states = await asyncio.gather(*(workflow.arun(workflow.initial_state(r)) for r in records))
+    return [workflow.build_result(state) for state in states]
+
+
+def run_benchmark(agent_type: str = "claims", models: tuple = DEFAULT_CASCADE_MODELS,
+                  confidence: float = 0.75, baseline: str = DEFAULT_CASCADE_MODELS[-1]) -> dict:
+    workflow = get_workflow(agent_type)
+    simulators = {
+        wf.llm.system_prompt: wf.llm.simulator
+        for wf in map(get_workflow, SAMPLE_FILES)
+    }
+    server = CascadeServer(simulators)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    # The agents use the process-wide gateway, which reads these on first use
+    os.environ["OPENROUTER_API_KEY"] = "sk-benchmark"
+    os.environ["OPENROUTER_BASE_URL"] = server.base_url
+
+    records = load_json_data(SAMPLE_FILES[agent_type])
+    try:
+        cascade = asyncio.run(_run_all(workflow, records, CascadePolicy(tuple(models), confidence)))
+        big_model = asyncio.run(_run_all(workflow, records, CascadePolicy((baseline,))))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    return {
+        "agent_type": agent_type,
+        "models": list(models),
+        "confidence_threshold": confidence,
+        "baseline_model": baseline,
+        **cascade_report(cascade, big_model),
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Benchmark a model cascade against always using the big model")
+    parser.add_argument("--agent", choices=sorted(SAMPLE_FILES), default="claims")
+    parser.add_argument("--models", default=",".join(DEFAULT_CASCADE_MODELS), help="Cascade, cheapest first")
+    parser.add_argument("--confidence", type=float, default=0.75, help="Confidence threshold to accept an answer")
+    parser.add_argument("--baseline", default=DEFAULT_CASCADE_MODELS[-1], help="Model to compare against")
+    args = parser.parse_args()
+
+    models = tuple(m.strip() for m in args.models.split(",") if m.strip())
+    print(json.dumps(run_benchmark(args.agent, models, args.confidence, args.baseline), indent=2))
@@ -0,0 +1,87 @@
+"""
+Stage-Pipelined Runs Benchmark
+Runs the same records through an agent twice with the same thread budget:
+whole runs on a thread pool (batch_runner mode="thread") and the stage
+pipeline (agents.pipeline), where tools, LLM and finalize each get their
+own queue and workers. Reports throughput, latency percentiles and, for the
+pipeline, each stage's utilization and peak queue depth, to show which
+stage is the bottleneck.
+
+The LLM is simulated with --llm-latency (an LLM_SIM_LATENCY model).
+
+Usage:
+    python -m benchmarks.bench_pipeline --agent claims --records 2000 --llm-latency fixed:50 --threads 20
+"""
+
+import json
+import os
+import sys
+
+# Ensure agents package is importable
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+os.environ["OPENROUTER_API_KEY"] = ""
+
+from agents.base_agent import load_json_data
+from agents.batch_runner import BatchStats, run_agent_batch
+from agents.pipeline import AgentPipeline
+
+
+SAMPLE_FILES = {
+    "claims": "sample_claims.json",
+    "fraud": "sample_claims.json",
+    "underwriting": "sample_applicants.json",
+}
+
+
+def _records(agent_type: str, count: int):
+    samples = load_json_data(SAMPLE_FILES[agent_type])
+    for i in range(count):
+        record = dict(samples[i % len(samples)])
+        record["id"] = f"{record['id']}-{i}"
+        yield record
+
+
+def _measure(results) -> tuple[dict, list]:
+    stats = BatchStats()
+    decisions = []
+    for item in results:
+        stats.add(item)
+        decisions.append((item.index, (item.result or {}).get("decision", {}).get("decision_type")))
+    summary = stats.summary()
+    return {k: summary[k] for k in ("records", "errors", "records_per_sec", "latency_ms")}, sorted(decisions)
+
+
+def run_benchmark(agent_type: str = "claims", records: int = 2000, llm_latency: str = "fixed:50",
+                  threads: int = 20) -> dict:
+    os.environ["LLM_SIM_LATENCY"] = llm_latency
+    os.environ.setdefault("LLM_SIM_SEED", "42")
+    stage_workers = {"tools": 1, "llm": max(1, threads - 2), "finalize": 1}
+
+    _measure(run_agent_batch(agent_type, _records(agent_type, 50), workers=threads))  # warm up
+    pooled, pooled_decisions = _measure(run_agent_batch(agent_type, _records(agent_type, records), workers=threads))
+
+    pipeline = AgentPipeline(agent_type, stage_workers)
+    piped, piped_decisions = _measure(pipeline.run(_records(agent_type, records)))
+
+    return {
+        "agent_type": agent_type,
+        "llm_latency": llm_latency,
+        "threads": threads,
+        "thread_pool": pooled,
+        "pipeline": {**piped, "stage_workers": stage_workers, "stages": pipeline.stats()["stages"]},
+        "throughput_gain_pct": round((piped["records_per_sec"] / pooled["records_per_sec"] - 1) * 100, 1),
+        "same_decisions": pooled_decisions == piped_decisions,
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Benchmark whole-run thread pool vs stage pipeline")
+    parser.add_argument("--agent", choices=sorted(SAMPLE_FILES), default="claims")
+    parser.add_argument("--records", type=int, default=2000)
+    parser.add_argument("--llm-latency", default="fixed:50", help="LLM_SIM_LATENCY model for the simulated LLM")
+    parser.add_argument("--threads", type=int, default=20, help="Threads for each mode (pipeline: 1 tools, 1 finalize, rest LLM)")
+    args = parser.parse_args()
+
+    print(json.dumps(run_benchmark(args.agent, args.records, args.llm_latency, args.threads), indent=2))
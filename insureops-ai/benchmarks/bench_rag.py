@@ -0,0 +1,115 @@
+"""
+Policy Retrieval Benchmark
+Per-query latency of PolicyRAG retrieval at 10k and 100k chunks: the BM25
+inverted index versus the previous score-every-chunk keyword scan.
+
+Usage:
+    python -m benchmarks.bench_rag --sizes 10000 100000 --queries 200
+"""
+
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+# Ensure agents package is importable
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from agents.base_agent import load_json_data
+from agents.claims_agent.bm25 import BM25Index, tokenize
+from agents.claims_agent.rag import PolicyRAG
+
+
+def build_corpus(size: int, seed: int = 11) -> list[dict]:
+    """Synthetic chunks: real policy chunks with shuffled sentences and filler vocabulary."""
+    rng = random.Random(seed)
+    base = PolicyRAG()
+    filler = [f"term{i}" for i in range(20000)]
+    chunks = []
+    for i in range(size):
+        source = base.chunks[i % len(base.chunks)]
+        words = source["content"].split()
+        rng.shuffle(words)
+        content = " ".join(words[:80] + rng.sample(filler, 20))
+        chunks.append({
+            "title": f"{source['title']} #{i}",
+            "content": content,
+            "keywords": base._extract_keywords(content),
+        })
+    return chunks
+
+
+def _legacy_retrieve(rag: PolicyRAG, chunks: list[dict], claim_type: str, description: str, top_k: int = 3):
+    """The pre-BM25 scan: every chunk, and content.lower() once per query keyword."""
+    query_keywords = rag._extract_keywords(f"{claim_type} {description}".lower())
+    query_keywords.extend(claim_type.lower().replace("_", " ").split())
+    scored = []
+    for i, chunk in enumerate(chunks):
+        score = 0
+        for kw in query_keywords:
+            if kw in chunk["keywords"]:
+                score += 2
+            if kw in chunk["content"].lower():
+                score += 1
+        if score > 0:
+            scored.append((score, i))
+    scored.sort(key=lambda x: x[0], reverse=True)
+    return scored[:top_k]
+
+
+def _latency_ms(fn, queries) -> dict:
+    samples = []
+    for claim_type, description in queries:
+        start = time.perf_counter()
+        fn(claim_type, description)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "p50_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(samples[int(len(samples) * 0.95) - 1], 3),
+    }
+
+
+def run_benchmark(sizes=(10_000, 100_000), query_count: int = 200, legacy_queries: int = 10) -> list[dict]:
+    claims = load_json_data("sample_claims.json")
+    queries = [(c["claim_type"], c["description"]) for c in claims]
+    queries = (queries * (query_count // len(queries) + 1))[:query_count]
+    rag = PolicyRAG()
+
+    results = []
+    for size in sizes:
+        chunks = build_corpus(size)
+
+        start = time.perf_counter()
+        index = BM25Index()
+        for chunk in chunks:
+            index.add(f"{chunk['title']} {chunk['content']}")
+        build_seconds = time.perf_counter() - start
+
+        bm25 = _latency_ms(
+            lambda t, d: index.search(tokenize(t.replace("_", " ")) + tokenize(d), top_k=3), queries
+        )
+        legacy = _latency_ms(
+            lambda t, d: _legacy_retrieve(rag, chunks, t, d), queries[:legacy_queries]
+        )
+        results.append({
+            "chunks": size,
+            "index_build_seconds": round(build_seconds, 2),
+            "bm25": bm25,
+            "legacy_scan": legacy,
+            "speedup_p50": round(legacy["p50_ms"] / bm25["p50_ms"], 1) if bm25["p50_ms"] else None,
+        })
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Benchmark PolicyRAG retrieval latency")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000], help="Corpus sizes in chunks")
+    parser.add_argument("--queries", type=int, default=200, help="BM25 queries per size")
+    parser.add_argument("--legacy-queries", type=int, default=10, help="Legacy scan queries per size")
+    args = parser.parse_args()
+
+    print(json.dumps(run_benchmark(args.sizes, args.queries, args.legacy_queries), indent=2))
@@ -0,0 +1,166 @@
+"""
+LLM Rate Limiter Benchmark
+A burst of concurrent chat completions against a local mock server that
+only admits --capacity requests at a time and answers the rest with
+429 + Retry-After. Compares plain AsyncOpenAI calls with the SDK's own
+retries (the old path, which fell back to simulation on failure) against
+the gateway's rate limiter with adaptive concurrency.
+
+Usage:
+    python -m benchmarks.bench_rate_limiter --calls 300 --capacity 8
+"""
+
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+
+# Ensure agents package is importable
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from benchmarks.bench_llm_gateway import MOCK_RESPONSE, MockOpenAIServer
+from agents.llm_gateway import LLMGateway, LLMSettings
+from agents.rate_limiter import get_rate_limiter
+
+
+class ThrottlingServer(MockOpenAIServer):
+    def __init__(self, capacity: int, service_ms: float, retry_after: float):
+        super().__init__()
+        self.RequestHandlerClass = _ThrottlingHandler
+        self.capacity = capacity
+        self.service_ms = service_ms
+        self.retry_after = retry_after
+        self.active = 0
+        self.throttled = 0
+        self.served = 0
+
+
+class _ThrottlingHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        server = self.server
+        with server._lock:
+            server.active += 1
+            admitted = server.active <= server.capacity
+            if not admitted:
+                server.throttled += 1
+        try:
+            if admitted:
+                time.sleep(server.service_ms / 1000)
+                self._reply(200, MOCK_RESPONSE)
+                with server._lock:
+                    server.served += 1
+            else:
+                self._reply(429, {"error": {"message": "Rate limit exceeded"}},
+                            {"Retry-After": str(server.retry_after)})
+        finally:
+            with server._lock:
+                server.active -= 1
+
+    def _reply(self, status: int, payload: dict, headers: dict = None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _no_simulation(prompt: str):
+    raise RuntimeError("benchmark must not fall back to simulation")
+
+
+async def _sdk_retries(settings: LLMSettings, calls: int) -> list:
+    """The pre-limiter path: every call fires at once, the SDK retries 429s."""
+    from openai import AsyncOpenAI
+
+    client = AsyncOpenAI(base_url=settings.base_url, api_key=settings.api_key, max_retries=settings.max_retries)
+
+    async def _call(i: int):
+        response = await client.chat.completions.create(
+            model=settings.model,
+            messages=[{"role": "user", "content": f"claim {i}"}],
+            temperature=0.2,
+        )
+        return response.choices[0].message.content
+
+    try:
+        return await asyncio.gather(*(_call(i) for i in range(calls)), return_exceptions=True)
+    finally:
+        await client.close()
+
+
+async def _gateway(settings: LLMSettings, calls: int) -> list:
+    gateway = LLMGateway(settings)
+    try:
+        return await asyncio.gather(*(
+            gateway.acomplete(f"claim {i}", temperature=0.2, simulator=_no_simulation, cache_mode="bypass")
+            for i in range(calls)
+        ), return_exceptions=True)
+    finally:
+        await gateway.aclose()
+
+
+def _measure(server: ThrottlingServer, runner, settings: LLMSettings, calls: int) -> dict:
+    server.throttled = server.served = 0
+    start = time.perf_counter()
+    results = asyncio.run(runner(settings, calls))
+    seconds = time.perf_counter() - start
+    return {
+        "seconds": round(seconds, 2),
+        "succeeded": sum(1 for r in results if not isinstance(r, Exception)),
+        "failed": sum(1 for r in results if isinstance(r, Exception)),
+        "server_429s": server.throttled,
+    }
+
+
+def run_benchmark(calls: int = 300, capacity: int = 8, service_ms: float = 50.0,
+                  retry_after: float = 0.2, max_retries: int = 2, rpm: int = 10000) -> dict:
+    # The limiter registry reads its budgets on first use
+    os.environ["LLM_RPM_LIMIT"] = str(rpm)
+    server = ThrottlingServer(capacity, service_ms, retry_after)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    settings = LLMSettings(api_key="sk-benchmark", base_url=server.base_url, max_retries=max_retries)
+
+    try:
+        sdk = _measure(server, _sdk_retries, settings, calls)
+        limited = _measure(server, _gateway, settings, calls)
+        limited["limiter"] = get_rate_limiter(settings.model).snapshot()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    return {
+        "calls": calls,
+        "server_capacity": capacity,
+        "max_retries": max_retries,
+        "rpm_limit": rpm,
+        "sdk_retries": sdk,
+        "rate_limited_gateway": limited,
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Benchmark the LLM rate limiter against a throttling server")
+    parser.add_argument("--calls", type=int, default=300, help="Concurrent calls per variant")
+    parser.add_argument("--capacity", type=int, default=8, help="Requests the server admits at once")
+    parser.add_argument("--service-ms", type=float, default=50.0, help="Server time per admitted request")
+    parser.add_argument("--retry-after", type=float, default=0.2, help="Retry-After seconds on a 429")
+    parser.add_argument("--max-retries", type=int, default=2, help="Retries per call for both variants")
+    parser.add_argument("--rpm", type=int, default=10000, help="Gateway requests-per-minute budget")
+    args = parser.parse_args()
+
+    print(json.dumps(run_benchmark(args.calls, args.capacity, args.service_ms, args.retry_after,
+                                   args.max_retries, args.rpm), indent=2))
@@ -0,0 +1,157 @@
+"""
+Risk Model Microbenchmark
+Per-applicant cost of the underwriting tools before (guidelines JSON parsed
+and walked as dicts on every call) and after (shared compiled RiskModel).
+
+Usage:
+    python -m benchmarks.bench_risk_model --applicants 2000
+"""
+
+import json
+import os
+import random
+import sys
+import time
+
+# Ensure agents package is importable
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from agents.base_agent import get_data_path, load_json_data
+from agents.underwriting_agent.tools import risk_score_calculator, medical_risk_lookup, historical_data_check
+
+
+# ─── Legacy Implementation (pre-RiskModel) ───────────
+
+def _legacy_guidelines() -> dict:
+    with open(get_data_path("underwriting_guidelines.json"), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _legacy_age_bracket(age: int) -> str:
+    if age < 26:
+        return "18-25"
+    elif age < 36:
+        return "26-35"
+    elif age < 46:
+        return "36-45"
+    elif age < 56:
+        return "46-55"
+    elif age < 66:
+        return "56-65"
+    return "66+"
+
+
+def _legacy_risk_score(applicant: dict) -> dict:
+    guidelines = _legacy_guidelines()
+    risk_factors = guidelines["risk_factors"]
+
+    age_bracket = _legacy_age_bracket(applicant.get("age", 30))
+    base_risk = risk_factors["age_brackets"].get(age_bracket, {"base_risk": 0.20})["base_risk"]
+
+    medical_multiplier = 1.0
+    for condition in applicant.get("health_conditions", []):
+        if condition in risk_factors["medical_conditions"]:
+            medical_multiplier *= risk_factors["medical_conditions"][condition]["risk_multiplier"]
+
+    occupation_multiplier = risk_factors["occupation_risk_classes"].get(
+        applicant.get("occupation_risk_class", "low"), {"risk_multiplier": 1.0})["risk_multiplier"]
+    smoker_multiplier = risk_factors["smoker_multiplier"] if applicant.get("smoker") else 1.0
+
+    bmi = applicant.get("bmi", 25.0)
+    bmi_multiplier = 1.0
+    for info in _legacy_guidelines()["risk_factors"]["bmi_thresholds"].values():
+        low, high = info["range"]
+        if low <= bmi < high:
+            bmi_multiplier = info["multiplier"]
+            break
+
+    risk_score = min(base_risk * medical_multiplier * occupation_multiplier * smoker_multiplier * bmi_multiplier, 1.0)
+    if applicant.get("coverage_amount", 0) > guidelines["coverage_limits"]["high_value_threshold"]:
+        risk_score = min(risk_score * 1.15, 1.0)
+
+    thresholds = guidelines["decision_thresholds"]
+    if risk_score <= thresholds["auto_approve_max_risk"]:
+        recommendation = "auto_approve"
+    elif risk_score >= thresholds["auto_reject_min_risk"]:
+        recommendation = "auto_reject"
+    else:
+        recommendation = "manual_review"
+    return {"risk_score": round(risk_score, 4), "recommendation": recommendation}
+
+
+def _legacy_applicant_run(applicant: dict):
+    _legacy_risk_score(applicant)
+    # medical_risk_lookup, historical_data_check and step_finalize each re-parsed the file too
+    conditions_db = _legacy_guidelines()["risk_factors"]["medical_conditions"]
+    for condition in applicant.get("health_conditions", []):
+        conditions_db.get(condition)
+    _legacy_guidelines()["historical_claim_rates"].get("default")
+    _legacy_guidelines()["premium_calculation"]
+
+
+def _current_applicant_run(applicant: dict):
+    risk_score_calculator(applicant)
+    medical_risk_lookup(applicant.get("health_conditions", []), applicant.get("age", 30))
+    historical_data_check(applicant)
+
+
+# ─── Benchmark ───────────────────────────────────────
+
+def generate_applicants(count: int, seed: int = 7) -> list[dict]:
+    """Synthetic applicants spanning every bracket, condition and class."""
+    rng = random.Random(seed)
+    guidelines = load_json_data("underwriting_guidelines.json")
+    conditions = list(guidelines["risk_factors"]["medical_conditions"])
+    classes = list(guidelines["risk_factors"]["occupation_risk_classes"])
+    return [
+        {
+            "id": f"APP-B{i}",
+            "age": rng.randint(18, 80),
+            "health_conditions": rng.sample(conditions, rng.randint(0, 3)),
+            "occupation": rng.choice(["teacher", "pilot", "mining", "nurse", "lawyer"]),
+            "occupation_risk_class": rng.choice(classes),
+            "coverage_amount": rng.choice([100000, 250000, 500000, 750000, 1000000]),
+            "smoker": rng.random() < 0.2,
+            "bmi": round(rng.uniform(16, 42), 1),
+        }
+        for i in range(count)
+    ]
+
+
+def _time_per_applicant(fn, applicants: list[dict]) -> float:
+    start = time.perf_counter()
+    for applicant in applicants:
+        fn(applicant)
+    return (time.perf_counter() - start) / len(applicants) * 1e6
+
+
+def run_benchmark(count: int = 2000) -> dict:
+    applicants = generate_applicants(count)
+
+    # Correctness: compiled model must agree with the legacy dict walk
+    mismatches = 0
+    for applicant in applicants:
+        current, _ = risk_score_calculator(applicant)
+        legacy = _legacy_risk_score(applicant)
+        if (current["risk_score"], current["recommendation"]) != (legacy["risk_score"], legacy["recommendation"]):
+            mismatches += 1
+
+    before_us = _time_per_applicant(_legacy_applicant_run, applicants)
+    after_us = _time_per_applicant(_current_applicant_run, applicants)
+
+    return {
+        "applicants": count,
+        "mismatches": mismatches,
+        "before_us_per_applicant": round(before_us, 2),
+        "after_us_per_applicant": round(after_us, 2),
+        "speedup": round(before_us / after_us, 1) if after_us else None,
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Benchmark the compiled underwriting RiskModel")
+    parser.add_argument("--applicants", type=int, default=2000, help="Number of synthetic applicants")
+    args = parser.parse_args()
+
+    print(json.dumps(run_benchmark(args.applicants), indent=2))
@@ -0,0 +1,148 @@
+"""
+Streaming LLM Benchmark
+Time until a claims decision is available: a buffered chat completion
+versus a streamed one parsed incrementally. A local mock server emits a
+claims-style JSON response at --tokens-per-sec, decision and confidence
+first, then a long reasoning field.
+
+Usage:
+    python -m benchmarks.bench_streaming --calls 20 --tokens-per-sec 80
+"""
+
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+
+# Ensure agents package is importable
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from benchmarks.bench_llm_gateway import MockOpenAIServer
+from agents.llm_cache import LLMResponseCache
+from agents.llm_gateway import LLMGateway, LLMSettings
+
+
+RESPONSE_TEXT = json.dumps({
+    "decision": "approved",
+    "confidence": 0.88,
+    "reasoning": " ".join(["Water damage from a burst pipe is a covered peril under Section I."] * 12),
+    "payout_amount": 8000,
+    "conditions": ["Standard documentation verification required"],
+    "risk_flags": [],
+    "compliance_notes": "Decision compliant with state insurance regulations."
+}, indent=2)
+CHARS_PER_TOKEN = 4
+
+
+class StreamingServer(MockOpenAIServer):
+    def __init__(self, tokens_per_sec: float):
+        super().__init__()
+        self.RequestHandlerClass = _StreamingHandler
+        self.tokens_per_sec = tokens_per_sec
+
+
+class _StreamingHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        tokens = [RESPONSE_TEXT[i:i + CHARS_PER_TOKEN] for i in range(0, len(RESPONSE_TEXT), CHARS_PER_TOKEN)]
+        usage = {"prompt_tokens": 420, "completion_tokens": len(tokens), "total_tokens": 420 + len(tokens)}
+        delay = 1.0 / self.server.tokens_per_sec
+
+        if not request.get("stream"):
+            time.sleep(delay * len(tokens))
+            body = json.dumps({
+                "id": "chatcmpl-mock", "object": "chat.completion", "created": 0, "model": request["model"],
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": RESPONSE_TEXT}}],
+                "usage": usage,
+            }).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        chunk = {"id": "chatcmpl-mock", "object": "chat.completion.chunk", "created": 0, "model": request["model"]}
+        for token in tokens:
+            time.sleep(delay)
+            self._event({**chunk, "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}]})
+        self._event({**chunk, "choices": [], "usage": usage})
+        self._event("[DONE]")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _event(self, payload):
+        data = f"data: {payload if isinstance(payload, str) else json.dumps(payload)}\n\n".encode("utf-8")
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _no_simulation(prompt: str):
+    raise RuntimeError("benchmark must not fall back to simulation")
+
+
+def _p50(values: list) -> float:
+    return round(statistics.median(values), 1)
+
+
+def _measure(gateway: LLMGateway, calls: int, stream: bool) -> dict:
+    decision_ms, first_token_ms, total_ms = [], [], []
+    for i in range(calls):
+        _, record = gateway.complete(f"Analyze claim {i}", temperature=0.2, simulator=_no_simulation,
+                                     cache_mode="bypass", stream=stream)
+        decision_ms.append(record.time_to_decision_ms)
+        first_token_ms.append(record.time_to_first_token_ms)
+        total_ms.append(record.latency_ms)
+    return {
+        "p50_time_to_first_token_ms": _p50(first_token_ms),
+        "p50_time_to_decision_ms": _p50(decision_ms),
+        "p50_total_ms": _p50(total_ms),
+    }
+
+
+def run_benchmark(calls: int = 20, tokens_per_sec: float = 80.0) -> dict:
+    server = StreamingServer(tokens_per_sec)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    settings = LLMSettings(api_key="sk-benchmark", base_url=server.base_url, max_retries=0)
+    gateway = LLMGateway(settings, cache=LLMResponseCache())
+
+    try:
+        gateway.complete("warm-up", temperature=0.2, simulator=_no_simulation, cache_mode="bypass")
+        buffered = _measure(gateway, calls, stream=False)
+        streamed = _measure(gateway, calls, stream=True)
+    finally:
+        gateway.close()
+        server.shutdown()
+        server.server_close()
+
+    return {
+        "calls": calls,
+        "tokens_per_sec": tokens_per_sec,
+        "response_tokens": len(RESPONSE_TEXT) // CHARS_PER_TOKEN,
+        "buffered": buffered,
+        "streamed": streamed,
+        "decision_speedup": round(buffered["p50_time_to_decision_ms"] / streamed["p50_time_to_decision_ms"], 1),
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Benchmark time-to-decision with and without streaming")
+    parser.add_argument("--calls", type=int, default=20, help="Sequential calls per variant")
+    parser.add_argument("--tokens-per-sec", type=float, default=80.0, help="Mock model generation speed")
+    args = parser.parse_args()
+
+    print(json.dumps(run_benchmark(args.calls, args.tokens_per_sec), indent=2))
@@ -8,25 +8,42 @@ import json
 import random
 import sys
 import os
-import time
 from datetime import datetime, timedelta
 
 # Ensure agents package is importable
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from agents.claims_agent.agent import run_claims_agent
-from agents.underwriting_agent.agent import run_underwriting_agent
-from agents.fraud_agent.agent import run_fraud_agent
+from agents.claims_agent.agent import run_claims_agent_batch
+from agents.underwriting_agent.agent import run_underwriting_agent_batch
+from agents.fraud_agent.agent import run_fraud_agent_batch
 from simulator.customer_support_sim import run_support_simulator
 from agents.base_agent import load_json_data
 
 
+def _seed_batch(run_batch, records: list, id_key: str, workers: int, send_telemetry: bool) -> list:
+    """Run one agent's records on its worker pool; summaries come back in input order."""
+    seeded = []
+    for item in run_batch(records, workers=workers, send_telemetry=send_telemetry):
+        record_id = item.record["id"]
+        if item.error is not None:
+            print(f"   ❌ Error processing {record_id}: {item.error}")
+            continue
+        print(f"   ✅ {record_id}: {item.result['decision'].get('decision_type')} ({item.latency_ms:.0f}ms)")
+        seeded.append((item.index, {
+            id_key: record_id,
+            "decision": item.result["decision"].get("decision_type"),
+            "trace_id": item.result["trace_id"]
+        }))
+    return [summary for _, summary in sorted(seeded, key=lambda pair: pair[0])]
+
+
 def seed_all_agents(
     claims_count: int = 5,
     underwriting_count: int = 3,
     fraud_count: int = 3,
     support_count: int = 5,
-    send_telemetry: bool = True
+    send_telemetry: bool = True,
+    workers: int = 4
 ):
     """
     Run all agents on sample data to seed the database with traces.
@@ -37,6 +54,7 @@ def seed_all_agents(
         fraud_count: Number of claims to analyze for fraud
         support_count: Number of support interactions to simulate
         send_telemetry: Whether to send telemetry to the backend
+        workers: Concurrent agent runs per batch (see agents.batch_runner)
     """
     print("=" * 60)
     print("  InsureOps AI — Historical Data Seeder")
@@ -57,17 +75,7 @@ def seed_all_agents(
     print(f"📁 Running Claims Agent on {len(selected_claims)} claims...")
     print(f"{'─' * 40}")
 
-    for claim in selected_claims:
-        try:
-            result = run_claims_agent(claim, send_telemetry=send_telemetry)
-            all_results["claims"].append({
-                "claim_id": claim["id"],
-                "decision": result["decision"].get("decision_type"),
-                "trace_id": result["trace_id"]
-            })
-        except Exception as e:
-            print(f"   ❌ Error processing {claim['id']}: {e}")
-        time.sleep(0.5)  # Spacing between traces
+    all_results["claims"] = _seed_batch(run_claims_agent_batch, selected_claims, "claim_id", workers, send_telemetry)
 
     # ─── Underwriting Agent ──────────────────────
     applicants = load_json_data("sample_applicants.json")
@@ -77,17 +85,9 @@ def seed_all_agents(
     print(f"📋 Running Underwriting Agent on {len(selected_applicants)} applicants...")
     print(f"{'─' * 40}")
 
-    for applicant in selected_applicants:
-        try:
-            result = run_underwriting_agent(applicant, send_telemetry=send_telemetry)
-            all_results["underwriting"].append({
-                "applicant_id": applicant["id"],
-                "decision": result["decision"].get("decision_type"),
-                "trace_id": result["trace_id"]
-            })
-        except Exception as e:
-            print(f"   ❌ Error processing {applicant['id']}: {e}")
-        time.sleep(0.5)
+    all_results["underwriting"] = _seed_batch(
+        run_underwriting_agent_batch, selected_applicants, "applicant_id", workers, send_telemetry
+    )
 
     # ─── Fraud Detection Agent ───────────────────
     # Pick claims that are interesting for fraud analysis
@@ -99,17 +99,7 @@ def seed_all_agents(
     print(f"🔎 Running Fraud Agent on {len(selected_fraud)} claims...")
     print(f"{'─' * 40}")
 
-    for claim in selected_fraud:
-        try:
-            result = run_fraud_agent(claim, send_telemetry=send_telemetry)
-            all_results["fraud"].append({
-                "claim_id": claim["id"],
-                "decision": result["decision"].get("decision_type"),
-                "trace_id": result["trace_id"]
-            })
-        except Exception as e:
-            print(f"   ❌ Error processing {claim['id']}: {e}")
-        time.sleep(0.5)
+    all_results["fraud"] = _seed_batch(run_fraud_agent_batch, selected_fraud, "claim_id", workers, send_telemetry)
 
     # ─── Customer Support Simulator ──────────────
     print(f"\n{'─' * 40}")
@@ -144,6 +134,7 @@ if __name__ == "__main__":
     parser.add_argument("--underwriting", type=int, default=3, help="Number of underwriting assessments")
     parser.add_argument("--fraud", type=int, default=3, help="Number of fraud analyses")
     parser.add_argument("--support", type=int, default=5, help="Number of support interactions")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent agent runs per batch")
     parser.add_argument("--no-telemetry", action="store_true", help="Skip sending telemetry to backend")
 
     args = parser.parse_args()
@@ -153,5 +144,6 @@ if __name__ == "__main__":
         underwriting_count=args.underwriting,
         fraud_count=args.fraud,
         support_count=args.support,
-        send_telemetry=not args.no_telemetry
+        send_telemetry=not args.no_telemetry,
+        workers=args.workers
     )